@@ -5,6 +5,7 @@ from PIL import Image
 
 from .__version__ import __version__
 from .commands.completions import cmd_completions
+from .commands.db import grp_db
 from .commands.edit.edit import grp_edit
 from .commands.extract.extract import cmd_extract
 from .commands.finalize.finalize import grp_finalize
@@ -37,6 +38,7 @@ app.add_command(grp_search, grp_search.name)
 app.add_command(cmd_info, cmd_info.name)
 app.add_command(cmd_log, cmd_log.name)
 app.add_command(cmd_upgrade, cmd_upgrade.name)
+app.add_command(grp_db, grp_db.name)
 app.add_command(cmd_help, cmd_help.name)
 app.add_command(cmd_completions, cmd_completions.name)
 
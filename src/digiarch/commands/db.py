@@ -0,0 +1,219 @@
+from datetime import datetime
+from logging import ERROR
+from logging import INFO
+from pathlib import Path
+from sqlite3 import OperationalError
+
+from acacore.models.event import Event
+from acacore.utils.click import end_program
+from acacore.utils.click import start_program
+from acacore.utils.helpers import ExceptionManager
+from click import argument
+from click import Choice
+from click import ClickException
+from click import Context
+from click import group
+from click import IntRange
+from click import option
+from click import pass_context
+from click import Path as ClickPath
+
+from digiarch.__version__ import __version__
+from digiarch.common import get_avid
+from digiarch.common import open_database
+from digiarch.common import snapshot_progress
+from digiarch.database import create_fts
+from digiarch.database import database_tables
+from digiarch.database import drop_fts
+from digiarch.database import FTS_TABLES
+from digiarch.database import incremental_vacuum
+from digiarch.database import integrity_check
+from digiarch.database import rebuild_fts
+from digiarch.database import snapshot_database
+from digiarch.database import SNAPSHOT_STEP_PAGES
+
+
+@group("db", no_args_is_help=True, short_help="Manage the database.")
+def grp_db():
+    """Manage the structure and indices of the database."""
+
+
+@grp_db.command("fts", short_help="Manage path search indices.")
+@option(
+    "--table",
+    "tables",
+    type=Choice(["original", "master", "access", "statutory"]),
+    multiple=True,
+    help="The tables to index.  [default: all]",
+)
+@option("--drop", is_flag=True, default=False, help="Remove the indices instead of creating them.")
+@pass_context
+def cmd_db_fts(ctx: Context, tables: tuple[str, ...], drop: bool):
+    """
+    Create trigram indices for the path columns of the files tables.
+
+    The indices speed up searches of relative_path and original_path values with @like patterns that start with a
+    wildcard (e.g., %contract%) and substring matches of at least 3 characters. They are used automatically by the
+    QUERY argument of the edit, search, identify, and extract commands.
+
+    The indices are kept up to date when files are added, changed, or removed. To remove the indices, use the --drop
+    option.
+    """
+    avid = get_avid(ctx)
+    table_names: list[str] = [f"files_{t}" for t in tables] or list(FTS_TABLES)
+
+    with open_database(ctx, avid) as database:
+        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, False)
+
+        with ExceptionManager(BaseException) as exception:
+            for table in table_names:
+                if drop:
+                    Event.from_command(ctx, "drop", data=drop_fts(database.connection, table)).log(INFO, log_stdout)
+                    continue
+
+                try:
+                    fts: str = create_fts(database.connection, table)
+                except OperationalError as err:
+                    raise ClickException(f"Cannot create trigram index for {table}: {err.args[0]}")
+
+                Event.from_command(ctx, "create", data=fts).log(INFO, log_stdout, columns=FTS_TABLES[table])
+
+            database.commit()
+
+        end_program(ctx, database, exception, False, log_file, log_stdout)
+
+
+@grp_db.command("maintain", short_help="Check and optimize the database.")
+@option("--check/--no-check", is_flag=True, default=True, show_default=True, help="Check the integrity of the tables.")
+@option("--analyze", is_flag=True, default=False, help="Update the statistics of all tables.")
+@option(
+    "--vacuum-step",
+    type=IntRange(1),
+    default=1000,
+    show_default=True,
+    help="The number of free pages to remove in each vacuum step.",
+)
+@option("--vacuum-limit", type=IntRange(0), default=None, help="The maximum number of free pages to remove.")
+@option("--full", is_flag=True, default=False, help="Enable incremental vacuum with a full vacuum.")
+@pass_context
+def cmd_db_maintain(
+    ctx: Context,
+    check: bool,
+    analyze: bool,
+    vacuum_step: int,
+    vacuum_limit: int | None,
+    full: bool,
+):
+    """
+    Check the integrity of the database, update its statistics, and remove its free pages.
+
+    The integrity of the tables and their indices is checked one table at a time. If a table has errors, the command
+    stops before making any changes. Use --no-check to skip the integrity check.
+
+    The statistics used to plan queries are updated with PRAGMA optimize, which only analyzes the tables that changed
+    significantly since the last run. Use --analyze to update the statistics of all tables.
+
+    The pages left free by removed files are removed with an incremental vacuum, --vacuum-step pages at a time and up
+    to --vacuum-limit pages in total. Each step is committed separately, so other commands are not locked out of the
+    database for long.
+
+    Databases that do not use incremental vacuum yet must be converted once with the --full option, which runs a full
+    VACUUM. The full vacuum rewrites the whole database and locks it until it is done.
+    """
+    avid = get_avid(ctx)
+
+    with open_database(ctx, avid) as database:
+        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, False)
+
+        with ExceptionManager(BaseException) as exception:
+            database.commit()
+
+            if check:
+                tables: list[str] = database_tables(database.connection)
+
+                for table in tables:
+                    if errors := integrity_check(database.connection, table):
+                        Event.from_command(ctx, "integrity", data=errors).log(ERROR, log_stdout, table=table)
+                        raise ClickException(f"Integrity check failed for {table} with {len(errors)} errors.")
+
+                Event.from_command(ctx, "integrity", data=tables).log(INFO, log_stdout, tables=len(tables))
+
+            if analyze or not database.execute("select 1 from sqlite_master where name = 'sqlite_stat1'").fetchone():
+                database.execute("analyze")
+                Event.from_command(ctx, "analyze").log(INFO, log_stdout)
+            else:
+                database.execute("pragma optimize")
+                Event.from_command(ctx, "optimize").log(INFO, log_stdout)
+
+            database.commit()
+
+            if full:
+                database.execute("pragma auto_vacuum = incremental")
+                database.execute("vacuum")
+                rebuilt: list[str] = rebuild_fts(database.connection)
+                database.commit()
+                Event.from_command(ctx, "vacuum", data=rebuilt).log(INFO, log_stdout, auto_vacuum="incremental")
+            elif database.execute("pragma auto_vacuum").fetchone()[0] != 2:
+                Event.from_command(
+                    ctx,
+                    "skip",
+                    reason="Incremental vacuum is not enabled, use --full to enable it",
+                ).log(INFO, log_stdout)
+            else:
+                free: int = database.execute("pragma freelist_count").fetchone()[0]
+                limit: int = free if vacuum_limit is None else min(free, vacuum_limit)
+                removed: int = 0
+
+                while removed < limit:
+                    if not (pages := incremental_vacuum(database.connection, min(vacuum_step, limit - removed))):
+                        break
+                    database.commit()
+                    removed += pages
+
+                event = Event.from_command(ctx, "vacuum", data=removed)
+                event.log(INFO, log_stdout, removed=removed, free=free - removed)
+
+        end_program(ctx, database, exception, False, log_file, log_stdout)
+
+
+@grp_db.command("snapshot", short_help="Back up the database.")
+@argument(
+    "output",
+    type=ClickPath(dir_okay=False, writable=True, resolve_path=True, path_type=Path),
+    required=False,
+)
+@option(
+    "--pages",
+    type=IntRange(1),
+    default=SNAPSHOT_STEP_PAGES,
+    show_default=True,
+    help="The number of pages to copy in each step.",
+)
+@option("--compress", is_flag=True, default=False, help="Compress the snapshot with gzip.")
+@pass_context
+def cmd_db_snapshot(ctx: Context, output: Path | None, pages: int, compress: bool):
+    """
+    Save a consistent copy of the database to OUTPUT while other commands are using it.
+
+    The database is copied with the SQLite online backup API, --pages pages at a time, pausing between steps so other
+    commands can keep reading from and writing to it. If the database is changed by another command during the copy,
+    the copy restarts to make sure the snapshot is consistent. The snapshot fails if the copy restarts more than 10
+    times; use a larger --pages value to copy busy databases in fewer steps.
+
+    If OUTPUT is not given, the snapshot is saved in the same folder as the database with the name
+    "avid-{timestamp}.db", or "avid-{timestamp}.db.gz" when using --compress.
+    """
+    avid = get_avid(ctx)
+
+    with open_database(ctx, avid, query_only=True) as database:
+        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, True)
+
+        with ExceptionManager(BaseException) as exception:
+            if not output:
+                output = database.path.with_stem(f"{database.path.stem}-{datetime.now():%Y%m%d%H%M%S}")
+                output = output.with_name(output.name + ".gz") if compress else output
+
+            snapshot_database(database.connection, output, pages, compress, snapshot_progress(ctx, log_stdout))
+            Event.from_command(ctx, "snapshot", data=str(output)).log(INFO, log_stdout, show_args=False)
+
+        end_program(ctx, database, exception, True, log_file, log_stdout)
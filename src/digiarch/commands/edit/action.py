@@ -17,7 +17,6 @@ from acacore.models.reference_files import TemplateTypeEnum
 from acacore.models.reference_files import TTemplateType
 from acacore.utils.click import end_program
 from acacore.utils.click import param_callback_regex
-from acacore.utils.click import start_program
 from acacore.utils.decorators import docstring_format
 from acacore.utils.helpers import ExceptionManager
 from click import argument
@@ -39,8 +38,10 @@ from digiarch.common import ctx_params
 from digiarch.common import fetch_actions
 from digiarch.common import get_avid
 from digiarch.common import open_database
+from digiarch.common import option_db_profile
 from digiarch.common import option_dry_run
 from digiarch.common import rollback
+from digiarch.common import start_program_profile
 from digiarch.query import argument_query
 from digiarch.query import query_table
 from digiarch.query import TQuery
@@ -175,7 +176,11 @@ def grp_action_original():
 
 @rollback("edit", rollback_set_action)
 @grp_action_original.command("convert", no_args_is_help=True, short_help="Set convert action.", cls=CommandWithRollback)
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed", "lock"])
+@argument_query(
+    True,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "action", "action_data", "warning", "processed", "lock"],
+)
 @argument("reason", nargs=1, type=str, required=True)
 @option("--tool", type=str, required=True, help="The tool to use for conversion.")
 @option(
@@ -186,6 +191,7 @@ def grp_action_original():
     help='The output of the converter.  [required for tools other than "copy"]',
 )
 @option("--lock", is_flag=True, default=False, help="Lock the edited files.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_action_original_convert(
@@ -195,6 +201,7 @@ def cmd_action_original_convert(
     tool: str,
     output: str | None,
     lock: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -215,8 +222,8 @@ def cmd_action_original_convert(
 
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             for file in query_table(database.original_files, query, [("lower(relative_path)", "asc")]):
@@ -231,7 +238,11 @@ def cmd_action_original_convert(
 
 @rollback("edit", rollback_set_action)
 @grp_action_original.command("extract", no_args_is_help=True, short_help="Set extract action.", cls=CommandWithRollback)
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed", "lock"])
+@argument_query(
+    True,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "action", "action_data", "warning", "processed", "lock"],
+)
 @argument("reason", nargs=1, type=str, required=True)
 @option("--tool", type=str, required=True, help="The tool to use for extraction.")
 @option(
@@ -241,6 +252,7 @@ def cmd_action_original_convert(
     help="The extension the file must have for extraction to succeed.",
 )
 @option("--lock", is_flag=True, default=False, help="Lock the edited files.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_action_original_extract(
@@ -250,6 +262,7 @@ def cmd_action_original_extract(
     tool: str,
     extension: str | None,
     lock: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -265,8 +278,8 @@ def cmd_action_original_extract(
 
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             for file in query_table(database.original_files, query, [("lower(relative_path)", "asc")]):
@@ -281,7 +294,11 @@ def cmd_action_original_extract(
 
 @rollback("edit", rollback_set_action)
 @grp_action_original.command("manual", no_args_is_help=True, short_help="Set manual action.", cls=CommandWithRollback)
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed", "lock"])
+@argument_query(
+    True,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "action", "action_data", "warning", "processed", "lock"],
+)
 @argument("reason", nargs=1, type=str, required=True)
 @option(
     "--reason",
@@ -299,6 +316,7 @@ def cmd_action_original_extract(
     help="The steps to take to process the file.",
 )
 @option("--lock", is_flag=True, default=False, help="Lock the edited files.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_action_original_manual(
@@ -308,6 +326,7 @@ def cmd_action_original_manual(
     data_reason: str | None,
     process: str,
     lock: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -323,8 +342,8 @@ def cmd_action_original_manual(
 
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             for file in query_table(database.original_files, query, [("lower(relative_path)", "asc")]):
@@ -339,7 +358,11 @@ def cmd_action_original_manual(
 
 @rollback("edit", rollback_set_action)
 @grp_action_original.command("ignore", no_args_is_help=True, short_help="Set ignore action.", cls=CommandWithRollback)
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed", "lock"])
+@argument_query(
+    True,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "action", "action_data", "warning", "processed", "lock"],
+)
 @argument("reason", nargs=1, type=str, required=True)
 @option(
     "--template",
@@ -356,6 +379,7 @@ def cmd_action_original_manual(
     help='The reason why the file is ignored.  [required for "text" template]',
 )
 @option("--lock", is_flag=True, default=False, help="Lock the edited files.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 @docstring_format(templates="\n".join(f"* {t}" for t in TemplateTypeEnum))
@@ -366,6 +390,7 @@ def cmd_action_original_ignore(
     template: TTemplateType,
     data_reason: str | None,
     lock: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -390,8 +415,8 @@ def cmd_action_original_ignore(
 
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             for file in query_table(database.original_files, query, [("lower(relative_path)", "asc")]):
@@ -411,7 +436,11 @@ def cmd_action_original_ignore(
     short_help="Copy action from a format.",
     cls=CommandWithRollback,
 )
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed", "lock"])
+@argument_query(
+    True,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "action", "action_data", "warning", "processed", "lock"],
+)
 @argument("puid", nargs=1, type=str, required=True)
 @argument("action", type=Choice(["convert", "extract", "manual", "ignore"]))
 @argument("reason", nargs=1, type=str, required=True)
@@ -425,6 +454,7 @@ def cmd_action_original_ignore(
     help="Path to a YAML file containing file format actions.",
 )
 @option("--lock", is_flag=True, default=False, help="Lock the edited files.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_action_original_copy(
@@ -435,6 +465,7 @@ def cmd_action_original_copy(
     query: TQuery,
     actions_file: str | None,
     lock: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -457,7 +488,7 @@ def cmd_action_original_copy(
     """  # noqa: D301
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
+    with open_database(ctx, avid, db_profile) as database:
         actions = fetch_actions(ctx, "actions_file", actions_file)
 
         if not (action_model := actions.get(puid)):
@@ -468,7 +499,7 @@ def cmd_action_original_copy(
         if not (data := action_data.get(action)):
             raise BadParameter(f"Action {action} not found in {puid}.", ctx, ctx_params(ctx)["puid"])
 
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             for file in query_table(database.original_files, query, [("lower(relative_path)", "asc")]):
@@ -484,7 +515,7 @@ def cmd_action_original_copy(
 @rollback("edit", rollback_set_master_convert)
 @command("convert", no_args_is_help=True, short_help="Set access convert action.", cls=CommandWithRollback)
 @argument("action_type", type=Choice(["access", "statutory"]), required=True)
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed"])
+@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "size", "action", "warning", "processed"])
 @argument("reason", nargs=1, type=str, required=True)
 @option("--tool", type=str, required=True, help="The tool to use for conversion.")
 @option(
@@ -495,6 +526,7 @@ def cmd_action_original_copy(
     help='The output of the converter.  [required for tools other than "copy"]',
 )
 @option("--lock", is_flag=True, default=False, help="Lock the edited files.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_action_master_convert(
@@ -504,6 +536,7 @@ def cmd_action_master_convert(
     reason: str,
     tool: str,
     output: str | None,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -524,8 +557,8 @@ def cmd_action_master_convert(
 
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             for file in query_table(database.master_files, query, [("lower(relative_path)", "asc")]):
@@ -23,14 +23,19 @@ def grp_edit():
     \b
     The QUERY argument uses a simple search syntax.
     @<field> will match a specific field, the following are supported: uuid,
-    checksum, puid, relative_path, action, warning, processed, lock.
+    checksum, puid, relative_path, size, action, action_data, warning, processed, lock.
+    @action_data.<path> will match a value inside the action data, e.g. @action_data.convert.tool.
+    @size values are sizes in bytes with an optional K, M, G, or T suffix; they can be prefixed
+    with >, >=, <, or <=, or given as an inclusive start..end range.
     @null and @notnull will match columns with null and not null values respectively.
     @true and @false will match columns with true and false values respectively.
     @like toggles LIKE syntax for the values following it in the same column.
+    @has toggles matching the values following it in the same column against the
+    members of a list, e.g. the warnings of a file.
     @file toggles file reading for the values following it in the same column: each
     value will be considered as a file path and values will be read from the lines
     in the given file (@null, @notnull, @true, @false, and @like are not supported when using @file).
-    Changing to a new @<field> resets like and file toggles. Values for the same
+    Changing to a new @<field> resets like, has, and file toggles. Values for the same
     column will be matched with OR logic, while values from different columns will
     be matched with AND logic.
 
@@ -46,6 +51,10 @@ def grp_edit():
     @relative_path @like %.pdf @lock @true = (relative_path like ?) and (lock is true)
 
     @action convert @relative_path @like %.pdf %.msg = (action = ?) and (relative_path like ? or relative_path like ?)
+
+    @action_data.convert.tool libreoffice @warning @has "extension mismatch" = (convert tool = ?) and (? in warning)
+
+    @size >2G 0 = (size > ? or size = ?)
     """  # noqa: D301
 
 
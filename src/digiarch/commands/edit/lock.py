@@ -1,5 +1,4 @@
 from acacore.utils.click import end_program
-from acacore.utils.click import start_program
 from acacore.utils.helpers import ExceptionManager
 from click import argument
 from click import command
@@ -11,8 +10,10 @@ from digiarch.__version__ import __version__
 from digiarch.common import CommandWithRollback
 from digiarch.common import get_avid
 from digiarch.common import open_database
+from digiarch.common import option_db_profile
 from digiarch.common import option_dry_run
 from digiarch.common import rollback
+from digiarch.common import start_program_profile
 from digiarch.query import argument_query
 from digiarch.query import TQuery
 
@@ -23,9 +24,14 @@ from .common import rollback_file_value
 # noinspection DuplicatedCode
 @rollback("edit", rollback_file_value("lock"))
 @command("lock", no_args_is_help=True, short_help="Lock files.", cls=CommandWithRollback)
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed", "lock"])
+@argument_query(
+    True,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "action", "action_data", "warning", "processed", "lock"],
+)
 @argument("reason", nargs=1, type=str, required=True)
 @option("--lock/--unlock", is_flag=True, default=True, show_default=True, help="Lock or unlock files.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_lock_original(
@@ -33,6 +39,7 @@ def cmd_lock_original(
     query: TQuery,
     reason: str,
     lock: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -46,8 +53,8 @@ def cmd_lock_original(
     """
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             edit_file_value(
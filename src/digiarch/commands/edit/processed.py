@@ -1,5 +1,4 @@
 from acacore.utils.click import end_program
-from acacore.utils.click import start_program
 from acacore.utils.helpers import ExceptionManager
 from click import argument
 from click import Choice
@@ -12,8 +11,10 @@ from digiarch.__version__ import __version__
 from digiarch.common import CommandWithRollback
 from digiarch.common import get_avid
 from digiarch.common import open_database
+from digiarch.common import option_db_profile
 from digiarch.common import option_dry_run
 from digiarch.common import rollback
+from digiarch.common import start_program_profile
 from digiarch.query import argument_query
 from digiarch.query import TQuery
 
@@ -24,7 +25,11 @@ from .common import rollback_file_value
 # noinspection DuplicatedCode
 @rollback("edit", rollback_file_value("processed"))
 @command("processed", no_args_is_help=True, short_help="Set original files as processed.", cls=CommandWithRollback)
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed", "lock"])
+@argument_query(
+    True,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "action", "action_data", "warning", "processed", "lock"],
+)
 @argument("reason", nargs=1, type=str, required=True)
 @option(
     "--processed/--unprocessed",
@@ -33,9 +38,10 @@ from .common import rollback_file_value
     show_default=True,
     help="Set files as processed or unprocessed.",
 )
+@option_db_profile()
 @option_dry_run()
 @pass_context
-def cmd_processed_original(ctx: Context, query: TQuery, reason: str, processed: bool, dry_run: bool):
+def cmd_processed_original(ctx: Context, query: TQuery, reason: str, processed: bool, db_profile: str, dry_run: bool):
     """
     Set original files matching the QUERY argument as processed.
 
@@ -47,8 +53,8 @@ def cmd_processed_original(ctx: Context, query: TQuery, reason: str, processed:
     """
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             edit_file_value(
@@ -69,7 +75,7 @@ def cmd_processed_original(ctx: Context, query: TQuery, reason: str, processed:
 
 @rollback("edit", rollback_file_value("processed"))
 @command("processed", no_args_is_help=True, short_help="Set master files as processed.", cls=CommandWithRollback)
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed"])
+@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "size", "action", "warning", "processed"])
 @argument("processed_type", type=Choice(["access", "statutory"]), nargs=1, required=True)
 @argument("reason", nargs=1, type=str, required=True)
 @option(
@@ -79,6 +85,7 @@ def cmd_processed_original(ctx: Context, query: TQuery, reason: str, processed:
     show_default=True,
     help="Set files as processed or unprocessed.",
 )
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_processed_master(
@@ -87,6 +94,7 @@ def cmd_processed_master(
     processed_type: tuple[str, ...],
     reason: str,
     processed: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -110,8 +118,8 @@ def cmd_processed_master(
     if not processed:
         mask ^= 0b11
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             edit_file_value(
@@ -1,5 +1,4 @@
 from acacore.utils.click import end_program
-from acacore.utils.click import start_program
 from acacore.utils.helpers import ExceptionManager
 from click import argument
 from click import command
@@ -13,8 +12,10 @@ from digiarch.commands.edit.common import rollback_file_value
 from digiarch.common import CommandWithRollback
 from digiarch.common import get_avid
 from digiarch.common import open_database
+from digiarch.common import option_db_profile
 from digiarch.common import option_dry_run
 from digiarch.common import rollback
+from digiarch.common import start_program_profile
 from digiarch.query import argument_query
 from digiarch.query import TQuery
 
@@ -22,9 +23,14 @@ from digiarch.query import TQuery
 @rollback("edit", rollback_file_value("puid"))
 @command("puid", no_args_is_help=True, short_help="Change PUID.", cls=CommandWithRollback)
 @argument("puid", nargs=1, type=str, required=True)
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed", "lock"])
+@argument_query(
+    True,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "action", "action_data", "warning", "processed", "lock"],
+)
 @argument("reason", nargs=1, type=str, required=True)
 @option("--lock", is_flag=True, default=False, help="Lock the edited files.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_puid_original(
@@ -33,6 +39,7 @@ def cmd_puid_original(
     query: TQuery,
     reason: str,
     lock: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -46,8 +53,8 @@ def cmd_puid_original(
     """
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             edit_file_value(
@@ -70,8 +77,9 @@ def cmd_puid_original(
 @rollback("edit", rollback_file_value("puid"))
 @command("puid", no_args_is_help=True, short_help="Change PUID.", cls=CommandWithRollback)
 @argument("puid", nargs=1, type=str, required=True)
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "warning", "processed"])
+@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "size", "warning", "processed"])
 @argument("reason", nargs=1, type=str, required=True)
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_puid_master(
@@ -79,6 +87,7 @@ def cmd_puid_master(
     puid: str,
     query: TQuery,
     reason: str,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -90,8 +99,8 @@ def cmd_puid_master(
     """
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             edit_file_value(
@@ -11,7 +11,6 @@ from acacore.models.file import BaseFile
 from acacore.models.file import MasterFile
 from acacore.models.file import OriginalFile
 from acacore.utils.click import end_program
-from acacore.utils.click import start_program
 from acacore.utils.helpers import ExceptionManager
 from click import argument
 from click import command
@@ -24,10 +23,12 @@ from digiarch.common import AVID
 from digiarch.common import CommandWithRollback
 from digiarch.common import get_avid
 from digiarch.common import open_database
+from digiarch.common import option_db_profile
 from digiarch.common import option_dry_run
 from digiarch.common import rollback
+from digiarch.common import start_program_profile
 from digiarch.query import argument_query
-from digiarch.query import query_table
+from digiarch.query import CompiledQuery
 from digiarch.query import TQuery
 
 
@@ -113,9 +114,7 @@ def remove_files(
     dry_run: bool,
     *loggers: Logger,
 ) -> None:
-    offset: int = 0
-
-    while files := list(query_table(table, query, [("lower(relative_path)", "asc")], 100, offset)):
+    for files in CompiledQuery(table, query).pages(100):
         for file in files:
             event = Event.from_command(
                 ctx,
@@ -128,7 +127,6 @@ def remove_files(
             event.log(INFO, *loggers, show_args=["uuid"], path=file.relative_path)
 
             if dry_run:
-                offset += 1
                 continue
 
             table.delete(file)
@@ -163,9 +161,14 @@ def rollback_remove_original(_ctx: Context, avid: AVID, database: FilesDB, event
 
 @rollback("remove", rollback_remove_original)
 @command("remove", no_args_is_help=True, short_help="Remove files.", cls=CommandWithRollback)
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed", "lock"])
+@argument_query(
+    True,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "action", "action_data", "warning", "processed", "lock"],
+)
 @argument("reason", nargs=1, type=str, required=True)
 @option("--delete", is_flag=True, default=False, help="Remove selected files from the disk.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_remove_original(
@@ -173,6 +176,7 @@ def cmd_remove_original(
     reason: str,
     query: TQuery,
     delete: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -188,8 +192,8 @@ def cmd_remove_original(
     """
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             remove_files(
@@ -210,9 +214,10 @@ def cmd_remove_original(
 
 
 @command("remove", no_args_is_help=True, short_help="Remove files.")
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed"])
+@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "size", "action", "warning", "processed"])
 @argument("reason", nargs=1, type=str, required=True)
 @option("--reset-processed", is_flag=True, default=False, help="Reset processed status of parent files.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_remove_master(
@@ -220,6 +225,7 @@ def cmd_remove_master(
     reason: str,
     query: TQuery,
     reset_processed: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -235,8 +241,8 @@ def cmd_remove_master(
     """
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             remove_files(
@@ -257,9 +263,10 @@ def cmd_remove_master(
 
 
 @command("remove", no_args_is_help=True, short_help="Remove files.")
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning"])
+@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "size", "action", "warning"])
 @argument("reason", nargs=1, type=str, required=True)
 @option("--reset-processed", is_flag=True, default=False, help="Reset processed status of parent files.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_remove_access(
@@ -267,6 +274,7 @@ def cmd_remove_access(
     reason: str,
     query: TQuery,
     reset_processed: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -282,8 +290,8 @@ def cmd_remove_access(
     """
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             remove_files(
@@ -304,9 +312,10 @@ def cmd_remove_access(
 
 
 @command("remove", no_args_is_help=True, short_help="Remove files.")
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning"])
+@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "size", "action", "warning"])
 @argument("reason", nargs=1, type=str, required=True)
 @option("--reset-processed", is_flag=True, default=False, help="Reset processed status of parent files.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_remove_statutory(
@@ -314,6 +323,7 @@ def cmd_remove_statutory(
     reason: str,
     query: TQuery,
     reset_processed: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -329,8 +339,8 @@ def cmd_remove_statutory(
     """
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             remove_files(
@@ -9,7 +9,6 @@ from acacore.models.file import BaseFile
 from acacore.models.file import OriginalFile
 from acacore.utils.click import end_program
 from acacore.utils.click import param_callback_regex
-from acacore.utils.click import start_program
 from acacore.utils.helpers import ExceptionManager
 from click import argument
 from click import command
@@ -22,8 +21,10 @@ from digiarch.common import AVID
 from digiarch.common import CommandWithRollback
 from digiarch.common import get_avid
 from digiarch.common import open_database
+from digiarch.common import option_db_profile
 from digiarch.common import option_dry_run
 from digiarch.common import rollback
+from digiarch.common import start_program_profile
 from digiarch.query import argument_query
 from digiarch.query import query_table
 from digiarch.query import TQuery
@@ -57,7 +58,11 @@ def rollback_rename_original(_ctx: Context, avid: AVID, database: FilesDB, event
 
 @rollback("edit", rollback_rename_original)
 @command("rename", no_args_is_help=True, short_help="Change file extensions.", cls=CommandWithRollback)
-@argument_query(True, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed", "lock"])
+@argument_query(
+    True,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "action", "action_data", "warning", "processed", "lock"],
+)
 @argument(
     "extension",
     nargs=1,
@@ -69,6 +74,7 @@ def rollback_rename_original(_ctx: Context, avid: AVID, database: FilesDB, event
 @option("--append", "replace_mode", flag_value="append", default=True, help="Append the new extension.  [default]")
 @option("--replace", "replace_mode", flag_value="last", help="Replace the last extension.")
 @option("--replace-all", "replace_mode", flag_value="all", help="Replace all extensions.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_rename_original(
@@ -77,6 +83,7 @@ def cmd_rename_original(
     reason: str,
     extension: str,
     replace_mode: str,
+    db_profile: str,
     dry_run: bool,
 ):
     r"""
@@ -92,8 +99,8 @@ def cmd_rename_original(
 
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             for file in query_table(database.original_files, query, [("lower(relative_path)", "asc")]):
@@ -12,7 +12,6 @@ from acacore.database import FilesDB
 from acacore.models.event import Event
 from acacore.models.file import BaseFile
 from acacore.utils.click import end_program
-from acacore.utils.click import start_program
 from acacore.utils.helpers import ExceptionManager
 from click import argument
 from click import BadParameter
@@ -29,7 +28,9 @@ from digiarch.common import AVID
 from digiarch.common import find_rollback_handlers
 from digiarch.common import get_avid
 from digiarch.common import open_database
+from digiarch.common import option_db_profile
 from digiarch.common import option_dry_run
+from digiarch.common import start_program_profile
 
 
 def callback_arg_run(ctx: Context, param: Parameter, value: str) -> tuple[int, int | None] | datetime:
@@ -185,9 +186,12 @@ def opt_list_commands(ctx: Context, _param: Parameter, value: bool):
     callback=opt_list_commands,
     expose_value=False,
 )
+@option_db_profile()
 @option_dry_run()
 @pass_context
-def cmd_rollback(ctx: Context, run: tuple[int, int | None] | datetime, resume_partial: bool, dry_run: bool):
+def cmd_rollback(
+    ctx: Context, run: tuple[int, int | None] | datetime, resume_partial: bool, db_profile: str, dry_run: bool
+):
     """
     Roll back changes.
 
@@ -206,8 +210,8 @@ def cmd_rollback(ctx: Context, run: tuple[int, int | None] | datetime, resume_pa
 
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        _, log_stdout, start_event = start_program(ctx, database, __version__, None, False, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        _, log_stdout, start_event = start_program_profile(ctx, database, __version__, db_profile, False, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             runs = fetch_runs(database, run, start_event.operation)
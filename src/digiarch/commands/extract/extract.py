@@ -1,80 +1,254 @@
+from collections import Counter
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from logging import ERROR
 from logging import INFO
 from logging import Logger
 from logging import WARNING
+from os import link
+from pathlib import Path
+from shutil import copy2
 from typing import get_args as get_type_args
+from uuid import UUID
+from uuid import uuid4
 
 from acacore.database import FilesDB
+from acacore.exceptions.files import IdentificationError
 from acacore.models.event import Event
 from acacore.models.file import BaseFile
 from acacore.models.file import OriginalFile
+from acacore.models.reference_files import Action
 from acacore.models.reference_files import IgnoreAction
 from acacore.models.reference_files import ManualAction
+from acacore.siegfried import Siegfried
+from acacore.siegfried.siegfried import SiegfriedResult
 from acacore.siegfried.siegfried import TSignaturesProvider
 from acacore.utils.click import end_program
-from acacore.utils.click import start_program
 from acacore.utils.functions import rm_tree
 from acacore.utils.helpers import ExceptionManager
+from acacore.utils.io import size_fmt
 from click import Choice
 from click import command
 from click import Context
+from click import FloatRange
+from click import IntRange
 from click import option
 from click import pass_context
 from click import Path as ClickPath
+from pydantic import ValidationError
 
 from digiarch.__version__ import __version__
-from digiarch.commands.edit.remove import remove_children
+from digiarch.commands.edit.remove import remove_empty_dir
 from digiarch.commands.identify import identify_original_file
 from digiarch.commands.identify import identify_requirements
 from digiarch.common import AVID
 from digiarch.common import CommandWithRollback
 from digiarch.common import get_avid
 from digiarch.common import open_database
+from digiarch.common import option_db_profile
 from digiarch.common import option_dry_run
 from digiarch.common import rollback
+from digiarch.common import start_program_profile
+from digiarch.database import temp_table_name
 from digiarch.query import argument_query
-from digiarch.query import query_to_where
+from digiarch.query import CompiledQuery
 from digiarch.query import TQuery
 
 from .extractors.base import ExtractError
 from .extractors.base import ExtractorBase
 from .extractors.base import NotPreservableFileError
 from .extractors.base import PasswordProtectedError
-from .extractors.extractor_msg import MsgExtractor
-from .extractors.extractor_patool import PatoolExtractor
-from .extractors.extractor_tnef import TNEFExtractor
-from .extractors.extractor_webarchive import WebarchiveExtractor
-from .extractors.extractor_zip import ZipExtractor
+from .extractors.registry import extractor_registry
+from .extractors.registry import load_extractor
+from .extractors.sandbox import extract_sandboxed
 
 
 def find_extractor(file: OriginalFile) -> tuple[type[ExtractorBase] | None, str | None]:
     """
     Match an extractor class to a file.
 
-    Matches the value at ``File.action_data.extract.tool`` to the ``ExtractorBase.tool_names`` of the various
-    converters. The first matching extractor is returned. If multiple extractors support the same tool, then priority is
-    given to the extractor matched first.
+    Matches the value at ``File.action_data.extract.tool`` to the tools in the extractor registry, and imports the
+    matching extractor only when it is first needed. If multiple extractors support the same tool, then priority is
+    given to the extractor registered first.
     :param file: The ``acacore.models.file.File`` object to find the extractor for.
     :return: An ``ExtractorBase`` class or ``None`` if an extractor could not be found, and the name of the tool.
     """
     if not file.action_data.extract:
         return None, None
 
-    for extractor in (
-        ZipExtractor,
-        TNEFExtractor,
-        MsgExtractor,
-        PatoolExtractor,
-        WebarchiveExtractor,
-    ):
-        if file.action_data.extract.tool in extractor.tool_names:
-            return extractor, file.action_data.extract.tool
+    if target := extractor_registry().get(file.action_data.extract.tool):
+        return load_extractor(target), file.action_data.extract.tool
 
     return None, file.action_data.extract.tool
 
 
-def next_archive_file(db: FilesDB, where: str, params: list[str], offset: int = 0) -> OriginalFile | None:
-    return db.original_files.select(where, params, [("lower(relative_path)", "asc")], 1, offset).fetchone()
+def run_extractor(extractor: ExtractorBase, timeout: int, memory_limit: int) -> list[tuple[Path, Path]]:
+    """Run an extractor, in a separate process if a time or memory limit (in MiB) is set."""
+    if timeout or memory_limit:
+        return extract_sandboxed(extractor, timeout or None, (memory_limit << 20) or None)
+    return extractor.extract()
+
+
+def discard_extraction(extractor: ExtractorBase, *_: object) -> None:
+    """Remove the manifest and the extracted files of an archive that was unpacked ahead but not identified."""
+    extractor.manifest.remove()
+    if extractor.extract_folder.is_dir():
+        rm_tree(extractor.extract_folder)
+
+
+def identify_archive_members(
+    siegfried: Siegfried,
+    actions: dict[str, Action],
+    path: Path,
+) -> list[tuple[str, str | None, str | None]]:
+    """
+    Identify the members of an archive in place using Siegfried's container scanning.
+
+    Only the containers supported by Siegfried (ZIP, TAR, gzip, WARC, and ARC) are scanned, other archives return no
+    members.
+    :param siegfried: The ``Siegfried`` instance to use.
+    :param actions: The actions to match the PUIDs against.
+    :param path: The path to the archive.
+    :return: A list of tuples containing the name, PUID, and action of each member.
+    """
+    process = siegfried.run("-json", "-multi", "1024", "-z", "-sig", siegfried.signature, str(path))
+    result: SiegfriedResult = SiegfriedResult.model_validate_json(process.stdout)
+    prefix: str = f"{path}#"
+    members: list[tuple[str, str | None, str | None]] = []
+
+    for sf_file in result.files:
+        if not str(sf_file.filename).startswith(prefix):
+            continue
+        puid: str | None = match.id if (match := sf_file.best_match()) else None
+        action: str | None = actions[puid].action if puid in actions else None
+        members.append((str(sf_file.filename).removeprefix(prefix), puid, action))
+
+    return members
+
+
+def next_archive_file(query: CompiledQuery[OriginalFile], after: OriginalFile | None = None) -> OriginalFile | None:
+    """
+    Fetch the next archive file matching the query.
+
+    Files are sorted by their relative path, and the next file is selected by its position relative to the ``after``
+    file rather than using an offset, so files that are added or changed in the meantime do not shift the results.
+    :param query: The compiled query.
+    :param after: The previous file, if any.
+    :return: The next ``OriginalFile`` or ``None`` if no more files match the query.
+    """
+    return next(iter(query.page(1, after)), None)
+
+
+def archive_depth(db: FilesDB, file: OriginalFile) -> int:
+    """Count the archives a file was extracted from, so nested archives keep their depth across runs."""
+    if not file.parent:
+        return 0
+    table: str = db.original_files.name
+    return db.execute(
+        f"with recursive ancestors(uuid) as (select ? union select f.parent from {table} f join ancestors a"
+        f" on f.uuid = a.uuid where f.parent is not null) select count(*) from ancestors",
+        [str(file.parent)],
+    ).fetchone()[0]
+
+
+def archive_children(db: FilesDB, file: OriginalFile) -> list[OriginalFile]:
+    """Fetch the children of a file that need to be extracted in reverse order, so they can be popped from a stack."""
+    return db.original_files.select(
+        "parent = ? and action = 'extract'",
+        [str(file.uuid)],
+        [("lower(relative_path)", "desc"), ("relative_path", "desc")],
+    ).fetchall()
+
+
+def find_extracted_duplicate(db: FilesDB, file: OriginalFile) -> OriginalFile | None:
+    """Find an archive with the same checksum as the given file that has already been extracted."""
+    table: str = db.original_files.name
+    return db.original_files.select(
+        f"checksum = ? and uuid != ? and action != 'extract'"
+        f" and exists (select 1 from {table} c where c.parent = {table}.uuid)",
+        [file.checksum, str(file.uuid)],
+        limit=1,
+    ).fetchone()
+
+
+def link_or_copy(src: Path, dst: Path) -> Path:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        link(src, dst)
+    except OSError:
+        copy2(src, dst)
+    return dst
+
+
+def copy_extracted_files(
+    avid: AVID,
+    db: FilesDB,
+    source: OriginalFile,
+    target: OriginalFile,
+    extract_folder: Path,
+) -> list[OriginalFile]:
+    """
+    Copy the files extracted from an archive to the extraction folder of an identical archive.
+
+    Files are hard-linked when possible and copied otherwise. Their database entries, including those of the files
+    extracted from nested archives, are copied with new UUIDs and parents.
+    :param avid: The AVID directory.
+    :param db: The database.
+    :param source: The archive that has already been extracted.
+    :param target: The archive to copy the extracted files to.
+    :param extract_folder: The extraction folder of the target archive.
+    :return: The new ``OriginalFile`` objects, or an empty list if the extracted files cannot be copied.
+    """
+    source_folder: Path = source.relative_path.parent
+    target_folder: Path = extract_folder.relative_to(avid.path)
+    folder_name: str | None = None
+    descendants: list[OriginalFile] = []
+    parents: list[OriginalFile] = [source]
+
+    while parents:
+        for child in db.original_files.select("parent = ?", [str(parents.pop().uuid)]).fetchall():
+            if not child.relative_path.is_relative_to(source_folder):
+                return []
+            child_folder_name: str = child.relative_path.relative_to(source_folder).parts[0]
+            if folder_name is None and child_folder_name.lstrip("_") != source.uuid.hex:
+                return []
+            if folder_name is not None and child_folder_name != folder_name:
+                return []
+            folder_name = child_folder_name
+            descendants.append(child)
+            parents.append(child)
+
+    if not folder_name:
+        return []
+
+    source_extract_folder: Path = source_folder / folder_name
+    uuids: dict[UUID, UUID] = {source.uuid: target.uuid}
+    new_files: list[OriginalFile] = []
+
+    try:
+        for child in descendants:
+            new_file = child.model_copy(deep=True)
+            new_file.uuid = uuids[child.uuid] = uuid4()
+            new_file.parent = uuids[child.parent]
+            new_file.root = avid.path
+            new_file.relative_path = target_folder.joinpath(child.relative_path.relative_to(source_extract_folder))
+            if child.original_path.is_relative_to(source_extract_folder):
+                new_file.original_path = target_folder.joinpath(child.original_path.relative_to(source_extract_folder))
+            else:
+                new_file.original_path = new_file.relative_path
+            new_file.processed = False
+            link_or_copy(child.get_absolute_path(avid.path), new_file.get_absolute_path())
+            db.original_files.insert(new_file)
+            new_files.append(new_file)
+    except BaseException:
+        for new_file in new_files:
+            db.original_files.delete(new_file)
+        rm_tree(extract_folder)
+        raise
+
+    return new_files
 
 
 def handle_extract_error(
@@ -110,12 +284,66 @@ def handle_extract_error(
         event.log(ERROR, *loggers, show_args=["uuid"], error=repr(err), path=file.relative_path)
 
 
-def rollback_extract_remove_child(ctx: Context, avid: AVID, database: FilesDB, file: OriginalFile):
-    for child in database.original_files.select("parent = ?", [str(file.uuid)]).fetchall():
-        rollback_extract_remove_child(ctx, avid, database, child)
-    remove_children(ctx, avid, database, file, log_removal=False)
-    file.get_absolute_path(avid.path).unlink(missing_ok=True)
-    database.original_files.delete(file)
+def rollback_extract_remove_descendants(avid: AVID, database: FilesDB, file: OriginalFile) -> int:
+    """
+    Remove all files extracted from an archive, and their master, access, and statutory files.
+
+    The descendants are collected with a single recursive query into a temporary table, the rows are deleted in bulk,
+    and the files are then removed from the disk in parallel.
+
+    :return: The number of removed files.
+    """
+    tables: list[str] = [
+        database.original_files.name,
+        database.master_files.name,
+        database.access_files.name,
+        database.statutory_files.name,
+    ]
+
+    temp_table: str = temp_table_name("rollback_extract")
+
+    try:
+        database.execute(f"create temporary table {temp_table} (tbl text not null, uuid text not null, path text)")
+        database.execute(
+            f"""
+            insert into temp.{temp_table} (tbl, uuid, path)
+            with recursive descendants(uuid) as (
+                select uuid from {tables[0]} where parent = ?
+                union
+                select f.uuid from {tables[0]} f join descendants d on f.parent = d.uuid
+            )
+            select '{tables[0]}', f.uuid, f.relative_path from {tables[0]} f
+            where f.uuid in (select uuid from descendants)
+            """,
+            [str(file.uuid)],
+        )
+        database.execute(f"create index temp.{temp_table}_tbl_uuid on {temp_table} (tbl, uuid)")
+
+        for table, parent_table in ((tables[1], tables[0]), (tables[2], tables[1]), (tables[3], tables[1])):
+            database.execute(f"""
+                insert into temp.{temp_table} (tbl, uuid, path)
+                select '{table}', uuid, relative_path from {table}
+                where original_uuid in (select uuid from temp.{temp_table} where tbl = '{parent_table}')
+            """)
+
+        for table in tables:
+            database.execute(
+                f"delete from {table} where uuid in (select uuid from temp.{temp_table} where tbl = '{table}')"
+            )
+
+        paths: list[Path] = [
+            avid.path / p for [p] in database.execute(f"select path from temp.{temp_table}").fetchall()
+        ]
+    finally:
+        database.execute(f"drop table if exists temp.{temp_table}")
+
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(lambda p: p.unlink(missing_ok=True), paths))
+
+    for folder in sorted({p.parent for p in paths}, key=lambda f: len(f.parts), reverse=True):
+        remove_empty_dir(avid.path, folder)
+
+    return len(paths)
 
 
 def rollback_extract(ctx: Context, avid: AVID, database: FilesDB, _event: Event, file: BaseFile | None):
@@ -124,8 +352,7 @@ def rollback_extract(ctx: Context, avid: AVID, database: FilesDB, _event: Event,
     if not isinstance(file, OriginalFile):
         raise TypeError(f"{type(file)} is not OriginalFile")
 
-    for child in database.original_files.select("parent = ?", [str(file.uuid)]).fetchall():
-        rollback_extract_remove_child(ctx, avid, database, child)
+    rollback_extract_remove_descendants(avid, database, file)
 
     if file.action_data.extract:
         file.action = "extract"
@@ -138,7 +365,7 @@ def rollback_extract(ctx: Context, avid: AVID, database: FilesDB, _event: Event,
 @rollback("error", rollback_extract)
 @rollback("unpacked", rollback_extract)
 @command("extract", short_help="Unpack archives.", cls=CommandWithRollback)
-@argument_query(False, "uuid", ["uuid", "checksum", "puid", "relative_path", "warning", "processed", "lock"])
+@argument_query(False, "uuid", ["uuid", "checksum", "puid", "relative_path", "size", "warning", "processed", "lock"])
 @option(
     "--siegfried-path",
     type=ClickPath(exists=True, dir_okay=False, resolve_path=True),
@@ -181,6 +408,69 @@ def rollback_extract(ctx: Context, avid: AVID, database: FilesDB, _event: Event,
     default=None,
     help="Path to a YAML file containing custom signature specifications.",
 )
+@option(
+    "--max-depth",
+    type=IntRange(0),
+    default=10,
+    show_default=True,
+    help="The maximum nesting level of archives within archives.",
+)
+@option(
+    "--max-ratio",
+    type=FloatRange(0),
+    default=1000,
+    show_default=True,
+    help="The maximum ratio between extracted data and archive size. Use 0 to disable.",
+)
+@option(
+    "--dedup/--no-dedup",
+    is_flag=True,
+    default=True,
+    show_default=True,
+    help="Copy the files of identical archives that have already been unpacked.",
+)
+@option(
+    "--timeout",
+    type=IntRange(0),
+    default=0,
+    show_default=True,
+    help="The maximum number of seconds the extraction of a single archive may take. Use 0 to disable.",
+)
+@option(
+    "--memory-limit",
+    type=IntRange(0),
+    default=0,
+    show_default=True,
+    help="The maximum memory in MiB the extraction of a single archive may use. Use 0 to disable.",
+)
+@option(
+    "--prefetch",
+    type=IntRange(0),
+    default=1,
+    show_default=True,
+    help="The number of archives to unpack ahead while the files of the current archive are identified.",
+)
+@option(
+    "--scratch-dir",
+    type=ClickPath(exists=True, file_okay=False, writable=True, resolve_path=True, path_type=Path),
+    envvar="DIGIARCH_SCRATCH",
+    show_envvar=True,
+    default=None,
+    help="A folder on local storage to use for temporary files during extraction.",
+)
+@option(
+    "--preview",
+    is_flag=True,
+    default=False,
+    help="Show the number and size of the files that would be unpacked without unpacking them.",
+)
+@option(
+    "--identify-members",
+    is_flag=True,
+    default=False,
+    help="Identify the files inside ZIP and TAR archives without unpacking them. Implies --preview.",
+)
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_extract(
@@ -191,17 +481,57 @@ def cmd_extract(
     siegfried_home: str | None,
     actions_file: str | None,
     custom_signatures_file: str | None,
+    max_depth: int,
+    max_ratio: float,
+    dedup: bool,
+    timeout: int,
+    memory_limit: int,
+    prefetch: int,
+    scratch_dir: Path | None,
+    preview: bool,
+    identify_members: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
     Unpack archives in OriginalDocuments and identify files therein.
 
     Files are unpacked recursively, i.e., if an archive contains another archive, this will be unpacked as well.
+    Archives found inside other archives are unpacked immediately after their parent. To limit how deep archives can be
+    nested, use the --max-depth option; archives beyond the limit are skipped and keep their extract action. The depth of
+    an archive is the number of archives it was extracted from, including those unpacked by previous runs.
+
+    Archives whose extracted data would exceed the size of the archive times the --max-ratio value are not unpacked and
+    are set to manual mode instead.
 
     Archives with unrecognized extraction tools will be set to manual mode.
 
+    The members of ZIP and TAR archives are recorded in a manifest as they are written. If the command is interrupted,
+    the next run resumes the extraction of the archive from the last completed member.
+
+    While the files of an archive are identified, the next archives are unpacked in the background. To change how many
+    archives are unpacked ahead, use the --prefetch option; use 0 to unpack and identify one archive at a time.
+
+    To limit the time and memory that the extraction of a single archive may use, use the --timeout and --memory-limit
+    options. Each archive is then unpacked in a separate process, and archives exceeding the limits are set to manual
+    mode.
+
+    If an archive with the same checksum has already been unpacked, its files and their identification are copied
+    instead of unpacking the archive again. To always unpack archives, use the --no-dedup option.
+
+    Archives are unpacked into temporary folders inside the AVID directory. To use a faster local folder instead, use
+    the --scratch-dir option; only the final files are then moved into the AVID directory.
+
     To see the which files will be unpacked (but not their contents) without unpacking them, use the --dry-run option.
 
+    To see how many files each archive contains and their total size without unpacking them, use the --preview option.
+    Only the headers of the archives are read where the format allows it. Nested archives are not included in the
+    totals. The --preview option implies --dry-run.
+
+    To also identify the files inside the archives and see the actions they would receive, use the --identify-members
+    option. Members of ZIP, TAR, and gzip archives are identified in place by Siegfried, and a summary of their actions
+    is shown for each archive. The --identify-members option implies --preview.
+
     Extracted filenames longer than 20 characters will be trimmed and partially prefixed with a unique hash based on the original name.
 
     Use the QUERY argument to specify which files should be unpacked. For details on the QUERY argument, see the edit command.
@@ -217,14 +547,66 @@ def cmd_extract(
         custom_signatures_file,
     )
 
-    with open_database(ctx, avid) as db:
-        log_file, log_stdout, _ = start_program(ctx, db, __version__, None, not dry_run, True, dry_run)
+    preview = preview or identify_members
+    dry_run = dry_run or preview
+
+    with open_database(ctx, avid, db_profile) as db:
+        log_file, log_stdout, _ = start_program_profile(ctx, db, __version__, db_profile, not dry_run, True, dry_run)
         errors: int = 0
-        offset: int = 0
+        preview_archives: int = 0
+        preview_unknown: int = 0
+        preview_files: int = 0
+        preview_size: int = 0
+        last_file: OriginalFile | None = None
+        queue: list[tuple[OriginalFile, int]] = []
+        upcoming: deque[tuple[OriginalFile, int]] = deque()
+        pending: dict[UUID, tuple[ExtractorBase, Future[list[tuple[Path, Path]]]]] = {}
+        # Archives already popped in this run, including those still matching the query after being skipped, and nested
+        # archives that the query fetches into upcoming while they are waiting in the queue
+        handled: set[UUID] = set()
+        executor: ThreadPoolExecutor | None = ThreadPoolExecutor(1) if prefetch and not dry_run else None
+        archives_query = CompiledQuery(db.original_files, [("action", "extract", "="), *query])
 
         with ExceptionManager(BaseException) as exception:
-            where, params = query_to_where([("action", "extract", "="), *query])
-            while archive_file := next_archive_file(db, where, params, offset):
+            while True:
+                if not queue and not upcoming and (next_file := next_archive_file(archives_query, last_file)):
+                    upcoming.append((next_file, archive_depth(db, next_file)))
+                    last_file = next_file
+
+                if queue:
+                    archive_file, depth = queue.pop()
+                elif upcoming:
+                    archive_file, depth = upcoming.popleft()
+                else:
+                    break
+
+                if archive_file.uuid in handled:
+                    continue
+                handled.add(archive_file.uuid)
+
+                if executor:
+                    # Unpack the next top-level archives while the current one is identified
+                    while len(upcoming) < prefetch and (next_file := next_archive_file(archives_query, last_file)):
+                        upcoming.append((next_file, archive_depth(db, next_file)))
+                        last_file = next_file
+                    checksums: set[str] = {archive_file.checksum, *(e.file.checksum for e, _ in pending.values())}
+                    for next_file, next_depth in upcoming:
+                        if next_file.uuid in pending or next_file.uuid in handled or next_file.checksum in checksums:
+                            continue
+                        if next_depth > max_depth:
+                            continue
+                        next_file.root = avid.path
+                        if not (next_extractor_cls := find_extractor(next_file)[0]):
+                            continue
+                        if dedup and find_extracted_duplicate(db, next_file):
+                            continue
+                        next_extractor = next_extractor_cls(next_file, avid.path, max_ratio or None, scratch_dir)
+                        pending[next_file.uuid] = (
+                            next_extractor,
+                            executor.submit(run_extractor, next_extractor, timeout, memory_limit),
+                        )
+                        checksums.add(next_file.checksum)
+
                 if archive_file.action != "extract":
                     Event.from_command(
                         ctx,
@@ -232,7 +614,6 @@ def cmd_extract(
                         (archive_file.uuid, "original"),
                         reason="Does not have extract action",
                     ).log(INFO, log_stdout, path=archive_file.relative_path)
-                    offset += 1
                     continue
                 archive_file.root = avid.path
                 extractor_cls, extractor_tool = find_extractor(archive_file)
@@ -244,7 +625,83 @@ def cmd_extract(
                         (archive_file.uuid, "original"),
                         reason="Tool not found",
                     ).log(WARNING, log_stdout, tool=extractor_tool, path=archive_file.relative_path)
-                    offset += 1
+                    continue
+
+                if depth > max_depth:
+                    Event.from_command(
+                        ctx,
+                        "skip",
+                        (archive_file.uuid, "original"),
+                        reason="Maximum depth reached",
+                    ).log(WARNING, log_stdout, depth=depth, path=archive_file.relative_path)
+                    continue
+
+                if preview:
+                    preview_archives += 1
+                    try:
+                        archive_preview = extractor_cls(archive_file, avid.path).preview()
+                    except ExtractError as err:
+                        Event.from_command(ctx, "error", (archive_file.uuid, "original"), None, err.msg).log(
+                            ERROR,
+                            log_stdout,
+                            show_args=["uuid"],
+                            error=err.__class__.__name__,
+                            path=archive_file.relative_path,
+                        )
+                        preview_unknown += 1
+                        continue
+
+                    if archive_preview is None:
+                        preview_unknown += 1
+                        Event.from_command(ctx, "preview", (archive_file.uuid, "original")).log(
+                            INFO,
+                            log_stdout,
+                            tool=extractor_tool,
+                            files="unknown",
+                            path=archive_file.relative_path,
+                        )
+                    else:
+                        preview_files += archive_preview[0]
+                        preview_size += archive_preview[1]
+                        Event.from_command(ctx, "preview", (archive_file.uuid, "original")).log(
+                            INFO,
+                            log_stdout,
+                            tool=extractor_tool,
+                            files=archive_preview[0],
+                            size=size_fmt(archive_preview[1]),
+                            path=archive_file.relative_path,
+                        )
+
+                    if identify_members:
+                        try:
+                            members = identify_archive_members(siegfried, actions, archive_file.get_absolute_path())
+                        except (IdentificationError, ValidationError) as err:
+                            Event.from_command(ctx, "error", (archive_file.uuid, "original"), None, repr(err)).log(
+                                ERROR,
+                                log_stdout,
+                                show_args=["uuid"],
+                                error=err.__class__.__name__,
+                                path=archive_file.relative_path,
+                            )
+                            continue
+
+                        for name, puid, action in members:
+                            Event.from_command(ctx, "member", (archive_file.uuid, "original")).log(
+                                INFO,
+                                log_stdout,
+                                puid=str(puid).ljust(10),
+                                action=str(action).ljust(7),
+                                path=f"{archive_file.relative_path}#{name}",
+                            )
+
+                        if members:
+                            Event.from_command(ctx, "members", (archive_file.uuid, "original")).log(
+                                INFO,
+                                log_stdout,
+                                files=len(members),
+                                actions=", ".join(f"{a}={n}" for a, n in Counter(a for _, _, a in members).items()),
+                                path=archive_file.relative_path,
+                            )
                     continue
 
                 if dry_run:
@@ -253,28 +710,49 @@ def cmd_extract(
                         "unpacked",
                         (archive_file.uuid, "original"),
                     ).log(INFO, log_stdout, tool=extractor_tool, path=archive_file.relative_path)
-                    offset += 1
                     continue
 
-                extractor = extractor_cls(archive_file, avid.path)
+                future: Future[list[tuple[Path, Path]]] | None = None
+                if archive_file.uuid in pending:
+                    extractor, future = pending.pop(archive_file.uuid)
+                else:
+                    extractor = extractor_cls(archive_file, avid.path, max_ratio or None, scratch_dir)
 
                 try:
-                    extracted_files_paths = extractor.extract()
+                    copied_files: list[OriginalFile] = []
+                    extracted_files_paths: list[tuple[Path, Path]] = []
+                    duplicate: OriginalFile | None = None
+                    if not future and dedup and (duplicate := find_extracted_duplicate(db, archive_file)):
+                        copied_files = copy_extracted_files(
+                            avid,
+                            db,
+                            duplicate,
+                            archive_file,
+                            extractor.extract_folder,
+                        )
+                    if not copied_files:
+                        duplicate = None
+                        extracted_files_paths = (
+                            future.result() if future else run_extractor(extractor, timeout, memory_limit)
+                        )
                     event = Event.from_command(
                         ctx,
                         "unpacked",
                         (archive_file.uuid, "original"),
-                        len(extracted_files_paths),
+                        len(extracted_files_paths) + len(copied_files),
+                        f"Copied from {duplicate.uuid}" if duplicate else None,
                     )
                     event.log(
                         INFO,
                         log_stdout,
                         show_args=["uuid"],
-                        files=len(extracted_files_paths),
+                        files=len(extracted_files_paths) + len(copied_files),
                         path=archive_file.relative_path,
+                        **({"copy": duplicate.uuid} if duplicate else {}),
                     )
                     db.log.insert(event)
                 except ExtractError as err:
+                    extractor.manifest.remove()
                     handle_extract_error(ctx, db, archive_file, err, log_stdout)
                     continue
                 except KeyboardInterrupt:
@@ -287,13 +765,21 @@ def cmd_extract(
                         None,
                         repr(err),
                     ).log(ERROR, log_stdout, show_args=["uuid"], error=repr(err), path=archive_file.relative_path)
-                    offset += 1
                     errors += 1
                     continue
                 finally:
                     if (folder := extractor.extract_folder).is_dir() and not next(folder.iterdir(), None):
                         rm_tree(folder)
 
+                for copied_file in copied_files:
+                    Event.from_command(ctx, "new", (copied_file.uuid, "original")).log(
+                        INFO,
+                        log_stdout,
+                        puid=str(copied_file.puid).ljust(10),
+                        action=str(copied_file.action).ljust(7),
+                        path=copied_file.relative_path,
+                    )
+
                 for path, original_path in extracted_files_paths:
                     identify_original_file(
                         ctx,
@@ -317,6 +803,28 @@ def cmd_extract(
 
                 db.original_files.update(archive_file)
                 db.commit()
+                extractor.manifest.remove()
+
+                queue.extend((child, depth + 1) for child in archive_children(db, archive_file))
+
+        archives_query.close()
+
+        if executor:
+            # Cancel the archives unpacked ahead without waiting for them, and remove their files once they stop
+            executor.shutdown(wait=False, cancel_futures=True)
+            for extractor, future in pending.values():
+                extractor.cancelled = True
+                future.add_done_callback(partial(discard_extraction, extractor))
+
+        if preview:
+            Event.from_command(ctx, "preview").log(
+                INFO,
+                log_stdout,
+                archives=preview_archives,
+                unknown=preview_unknown,
+                files=preview_files,
+                size=size_fmt(preview_size),
+            )
 
         if errors:
             Event.from_command(ctx, "errors").log(
@@ -1,10 +1,25 @@
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import Generator
+from contextlib import contextmanager
+from hashlib import sha256
+from json import dumps
+from json import loads
+from mmap import ACCESS_READ
+from mmap import mmap
+from os import fstat
 from pathlib import Path
+from pathlib import PurePosixPath
+from typing import BinaryIO
 from typing import ClassVar
+from typing import TextIO
 
 from acacore.exceptions.base import AcacoreError
 from acacore.models.file import BaseFile
+from acacore.utils.functions import find_files
+
+from digiarch.common import sanitize_filename
+from digiarch.common import sanitize_path
 
 
 class ExtractError(AcacoreError):
@@ -28,12 +43,144 @@ class NotPreservableFileError(ExtractError):
     """Archive file cannot be preserved."""
 
 
+class ExpansionRatioError(ExtractError):
+    """Extracted data exceeds the maximum allowed size."""
+
+
+class ExtractorLimitError(ExtractError):
+    """Extraction process exceeded its time or memory limit."""
+
+
+class ExtractCancelledError(ExtractError):
+    """Extraction was cancelled before it finished."""
+
+
+def member_relative_path(name: str) -> Path | None:
+    """Remove root, current, and parent directory references from an archive member name."""
+    parts: list[str] = [p for p in PurePosixPath(name.replace("\\", "/")).parts if p not in ("/", ".", "..")]
+    return Path(*parts) if parts else None
+
+
+def prepare_attachment_name(names: list[str], name: str, n: int) -> [tuple[str], str, str]:
+    """Deduplicate attachment name by attaching a prefix to the sanitized name with the index of that name if it has already been extracted."""
+    name = name.strip() or f"attachment-{n}"
+    name_sanitized: str = sanitize_filename(name, 20, True).strip("_") or f"attachment-{n}"
+    names.append(name_sanitized.lower())
+    if (count := names.count(name_sanitized.lower())) > 1:
+        name_sanitized = f"{count - 1}_{name_sanitized}"
+    return names, name, name_sanitized
+
+
+def copy_hashed(src: BinaryIO, dst: BinaryIO, chunk_size: int = 1 << 20) -> tuple[int, str]:
+    """Copy a stream in chunks, and return the size and SHA-256 checksum of the copied data."""
+    hasher = sha256()
+    size: int = 0
+    while chunk := src.read(chunk_size):
+        dst.write(chunk)
+        hasher.update(chunk)
+        size += len(chunk)
+    return size, hasher.hexdigest()
+
+
+class ExtractManifest:
+    """
+    Record of the archive members written to an extraction folder, used to resume interrupted extractions.
+
+    The manifest is stored as JSON lines, each containing the key of the member, the path of the written file and of
+    the original member relative to the extraction folder, the size of the file, and its SHA-256 checksum.
+    """
+
+    def __init__(self, path: Path, folder: Path) -> None:
+        self.path: Path = path
+        self.folder: Path = folder
+        self.members: dict[str, dict] = {}
+        self._fh: TextIO | None = None
+
+    def __enter__(self) -> "ExtractManifest":
+        """
+        Load the members of a previous extraction whose files are still intact.
+
+        If a manifest was loaded, files in the extraction folder that are not in it, like a partially written member,
+        are removed. Without a manifest, the folder is left untouched.
+        """
+        if self.path.is_file():
+            with self.path.open(encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        entry: dict = loads(line)
+                    except ValueError:
+                        continue
+                    file: Path = self.folder.joinpath(entry["path"])
+                    if file.is_file() and file.stat().st_size == entry["size"]:
+                        self.members[entry["member"]] = entry
+
+            if self.folder.is_dir():
+                written: set[Path] = {self.folder.joinpath(e["path"]) for e in self.members.values()}
+                for file in find_files(self.folder):
+                    if file not in written:
+                        file.unlink(missing_ok=True)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self.path.open("w", encoding="utf-8")
+        self._fh.writelines(dumps(e) + "\n" for e in self.members.values())
+        self._fh.flush()
+        return self
+
+    def __exit__(self, *_) -> None:
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+    def get(self, member: str) -> tuple[Path, Path] | None:
+        """Get the path of the written file and of the original member if the member has already been extracted."""
+        if (entry := self.members.get(member)) is None:
+            return None
+        return self.folder.joinpath(entry["path"]), self.folder.joinpath(entry["original"])
+
+    def add(self, member: str, path: Path, original: Path, size: int, checksum: str) -> None:
+        entry: dict = {
+            "member": member,
+            "path": path.relative_to(self.folder).as_posix(),
+            "original": original.relative_to(self.folder).as_posix(),
+            "size": size,
+            "checksum": checksum,
+        }
+        self.members[member] = entry
+        self._fh.write(dumps(entry) + "\n")
+        self._fh.flush()
+
+    def remove(self) -> None:
+        self.__exit__()
+        self.path.unlink(missing_ok=True)
+
+
+@contextmanager
+def map_file(path: Path) -> Generator[mmap | bytes, None, None]:
+    """Open a read-only memory-mapped view of a file. Empty files cannot be mapped and yield an empty bytes object."""
+    with path.open("rb") as fh:
+        if not fstat(fh.fileno()).st_size:
+            yield b""
+            return
+        with mmap(fh.fileno(), 0, access=ACCESS_READ) as buffer:
+            yield buffer
+
+
 class ExtractorBase(ABC):
     tool_names: ClassVar[list[str]]
 
-    def __init__(self, file: BaseFile, root: Path | None = None) -> None:
+    def __init__(
+        self,
+        file: BaseFile,
+        root: Path | None = None,
+        max_ratio: float | None = None,
+        scratch_dir: Path | None = None,
+    ) -> None:
         self.file: BaseFile = file
         self.file.root = root or self.file.root
+        self.max_ratio: float | None = max_ratio
+        self.scratch_dir: Path | None = scratch_dir
+        self.extracted_size: int = 0
+        self.cancelled: bool = False
 
     @property
     def extract_folder(self):
@@ -42,6 +189,85 @@ class ExtractorBase(ABC):
             path = path.with_name("_" + path.name)
         return path
 
+    @property
+    def manifest(self) -> ExtractManifest:
+        """The manifest of members written to the extraction folder, stored in the metadata folder of the AVID."""
+        return ExtractManifest(
+            self.file.root.joinpath("_metadata", "extract", f"{self.file.uuid.hex}.jsonl"),
+            self.extract_folder,
+        )
+
+    @property
+    def tmp_root(self) -> Path:
+        """The folder in which temporary folders are created, the scratch folder if set or the AVID root otherwise."""
+        return self.scratch_dir or self.file.root
+
+    @property
+    def max_size(self) -> int | None:
+        return int(self.file.size * self.max_ratio) if self.max_ratio else None
+
+    def check_cancelled(self) -> None:
+        """
+        Stop the extraction if it was cancelled from another thread.
+
+        :raise ExtractCancelledError: If ``cancelled`` is set.
+        """
+        if self.cancelled:
+            raise ExtractCancelledError(self.file, "Extraction cancelled")
+
+    def check_size(self, size: int) -> None:
+        """
+        Add to the total size of the extracted data and check it against the maximum expansion ratio.
+
+        :param size: The size of the data about to be written.
+        :raise ExpansionRatioError: If the total extracted size exceeds the size of the archive times ``max_ratio``.
+        :raise ExtractCancelledError: If the extraction was cancelled.
+        """
+        self.check_cancelled()
+        self.extracted_size += size
+        if (max_size := self.max_size) is not None and self.extracted_size > max_size:
+            raise ExpansionRatioError(
+                self.file,
+                f"Extracted size exceeds {self.max_ratio:g} times the archive size ({max_size} bytes)",
+            )
+
+    def copy(self, src: BinaryIO, dst: BinaryIO, chunk_size: int = 1 << 20) -> int:
+        """Copy a stream in chunks checking the extracted size before each write."""
+        written: int = 0
+        while chunk := src.read(chunk_size):
+            self.check_size(len(chunk))
+            dst.write(chunk)
+            written += len(chunk)
+        return written
+
+    def member_path(self, extract_folder: Path, name: Path) -> Path:
+        """Sanitize the path of an archive member within the extraction folder and create its parent folders."""
+        path_final: Path = extract_folder.joinpath(sanitize_path(name))
+        path_final = path_final.with_name(sanitize_filename(path_final.name, 20, True))
+        while path_final.exists():
+            path_final = path_final.with_name("_" + path_final.name)
+        path_final.parent.mkdir(parents=True, exist_ok=True)
+        return path_final
+
+    def write_buffer(self, buffer: mmap | bytes, start: int, end: int, path: Path, chunk_size: int = 1 << 20) -> Path:
+        """Write a slice of a buffer to a file in chunks checking the extracted size first."""
+        self.check_size(end - start)
+        with path.open("wb") as fh:
+            for offset in range(start, end, chunk_size):
+                fh.write(buffer[offset : min(offset + chunk_size, end)])
+        return path
+
+    def preview(self) -> tuple[int, int] | None:
+        """
+        Read the number of files in the archive and their total size without extracting them.
+
+        Only the headers and directories of the archive are read where the format allows it.
+
+        :return: A tuple containing the number of files and their total size, or ``None`` if the extractor cannot
+            preview the archive.
+        """
+        return None
+
     @abstractmethod
     def extract(self) -> list[tuple[Path, Path]]:
         """
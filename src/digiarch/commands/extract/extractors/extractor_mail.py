@@ -0,0 +1,189 @@
+from collections.abc import Generator
+from email.errors import MessageError
+from email.message import EmailMessage
+from email.parser import BytesHeaderParser
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from pathlib import Path
+from re import compile as re_compile
+from typing import BinaryIO
+from typing import ClassVar
+
+from digiarch.common import move_file
+from digiarch.common import TempDir
+
+from .base import ExtractError
+from .base import ExtractorBase
+from .base import prepare_attachment_name
+from .tools import EML_TOOLS
+from .tools import MBOX_TOOLS
+
+MAX_HEADER_SIZE: int = 1 << 16
+
+# Body lines starting with "From " are escaped with ">" in mbox files, and lines already escaped with another ">"
+escaped_from = re_compile(rb">+From ")
+
+
+def message_subject(headers: bytes) -> str:
+    try:
+        return str(BytesHeaderParser(policy=default_policy).parsebytes(headers).get("subject", "")).strip()
+    except (MessageError, ValueError, LookupError):
+        return ""
+
+
+def message_attachments(message: EmailMessage) -> Generator[EmailMessage, None, None]:
+    """
+    Find the attachments of a message, including named inline parts.
+
+    Attached messages are returned whole, without descending into their parts.
+    """
+    for part in message.iter_parts():
+        if (
+            part.get_content_type() == "message/rfc822"
+            or part.is_attachment()
+            or (part.get_filename() and not part.is_multipart())
+        ):
+            yield part
+        elif part.is_multipart():
+            yield from message_attachments(part)
+
+
+def attachment_data(part: EmailMessage) -> bytes:
+    if part.get_content_type() == "message/rfc822":
+        return b"".join(p.as_bytes() for p in part.iter_parts())
+    return part.get_payload(decode=True) or b""
+
+
+def attachment_name(part: EmailMessage) -> str:
+    if name := (part.get_filename() or "").strip():
+        return name
+    if part.get_content_type() == "message/rfc822":
+        return f"{next((str(p['subject'] or '') for p in part.iter_parts()), '').strip() or 'message'}.eml"
+    return ""
+
+
+class MboxExtractor(ExtractorBase):
+    tool_names: ClassVar[list[str]] = MBOX_TOOLS
+
+    @staticmethod
+    def name_message(tmp_dir: Path, n: int, headers: list[bytes], names: list[str]) -> tuple[list[str], str, str]:
+        subject: str = message_subject(b"".join(headers))
+        names, name, name_sanitized = prepare_attachment_name(names, f"{subject}.eml" if subject else "", n)
+        if name_sanitized == f"attachment-{n}":
+            name_sanitized = name = f"message-{n}.eml"
+        tmp_dir.joinpath(f"{n}.tmp").replace(tmp_dir.joinpath(name_sanitized))
+        return names, name, name_sanitized
+
+    def write_messages(self, fh: BinaryIO, tmp_dir: Path) -> list[tuple[str, str]]:
+        """
+        Split an mbox file into one EML file per message, reading it one line at a time.
+
+        Lines escaped with ``>From`` are unescaped by removing one ``>``.
+
+        :param fh: The mbox file opened in binary mode.
+        :param tmp_dir: The folder to write messages to.
+        :return: A list of tuples containing the sanitized and original names of the messages.
+        """
+        files: list[tuple[str, str]] = []
+        names: list[str] = []
+        message_fh: BinaryIO | None = None
+        headers: list[bytes] = []
+        in_headers: bool = False
+        previous_blank: bool = True
+
+        try:
+            for line in fh:
+                blank: bool = not line.strip()
+
+                if line.startswith(b"From ") and previous_blank:
+                    if message_fh:
+                        message_fh.close()
+                        names, name, name_sanitized = self.name_message(tmp_dir, len(files), headers, names)
+                        files.append((name_sanitized, name))
+                    message_fh = tmp_dir.joinpath(f"{len(files)}.tmp").open("wb")
+                    headers, in_headers, previous_blank = [], True, False
+                    continue
+
+                previous_blank = blank
+
+                if not message_fh:
+                    continue
+
+                if escaped_from.match(line):
+                    line = line[1:]
+
+                self.check_size(len(line))
+                message_fh.write(line)
+
+                if in_headers and (blank or sum(map(len, headers)) > MAX_HEADER_SIZE):
+                    in_headers = False
+                elif in_headers:
+                    headers.append(line)
+
+            if message_fh:
+                message_fh.close()
+                names, name, name_sanitized = self.name_message(tmp_dir, len(files), headers, names)
+                files.append((name_sanitized, name))
+        finally:
+            if message_fh and not message_fh.closed:
+                message_fh.close()
+
+        return files
+
+    def extract(self) -> list[tuple[Path, Path]]:
+        extract_folder: Path = self.extract_folder
+
+        with self.file.get_absolute_path().open("rb") as fh, TempDir(self.tmp_root) as tmp_dir:
+            if fh.read(5) != b"From ":
+                raise ExtractError(self.file, "Not an mbox file")
+            fh.seek(0)
+
+            files: list[tuple[str, str]] = self.write_messages(fh, tmp_dir)
+
+            if not files:
+                return []
+
+            extract_folder.mkdir(parents=True, exist_ok=True)
+
+            return [
+                (
+                    move_file(tmp_dir.joinpath(name_extracted), extract_folder.joinpath(name_extracted)),
+                    extract_folder.joinpath("_").with_name(name_original),
+                )
+                for name_extracted, name_original in files
+            ]
+
+
+class EmlExtractor(ExtractorBase):
+    tool_names: ClassVar[list[str]] = EML_TOOLS
+
+    def extract(self) -> list[tuple[Path, Path]]:
+        extract_folder: Path = self.extract_folder
+        files: list[tuple[str, str]] = []
+
+        with self.file.get_absolute_path().open("rb") as fh:
+            message: EmailMessage = BytesParser(policy=default_policy).parse(fh)
+
+        with TempDir(self.tmp_root) as tmp_dir:
+            names: list[str] = []
+            try:
+                for n, part in enumerate(message_attachments(message)):
+                    names, name, name_sanitized = prepare_attachment_name(names, attachment_name(part), n)
+                    data: bytes = attachment_data(part)
+                    self.write_buffer(data, 0, len(data), tmp_dir.joinpath(name_sanitized))
+                    files.append((name_sanitized, name))
+            except (MessageError, ValueError, LookupError) as err:
+                raise ExtractError(self.file, "Malformed message", repr(err))
+
+            if not files:
+                return []
+
+            extract_folder.mkdir(parents=True, exist_ok=True)
+
+            return [
+                (
+                    move_file(tmp_dir.joinpath(name_extracted), extract_folder.joinpath(name_extracted)),
+                    extract_folder.joinpath("_").with_name(name_original),
+                )
+                for name_extracted, name_original in files
+            ]
@@ -1,30 +1,36 @@
+from codecs import lookup as lookup_codec
 from contextlib import suppress
+from functools import cache
 from pathlib import Path
+from re import compile as re_compile
 from re import IGNORECASE
 from re import match
+from shutil import copyfileobj
 from typing import ClassVar
+from typing import IO
+from typing import NamedTuple
 
 import chardet
 from acacore.models.file import BaseFile
-from extract_msg import Attachment
-from extract_msg import AttachmentBase
 from extract_msg import Message
 from extract_msg import MSGFile
 from extract_msg import openMsg
-from extract_msg import SignedAttachment
 from extract_msg.exceptions import ExMsgBaseException
 from extract_msg.msg_classes import MessageBase
 from extract_msg.msg_classes import MessageSigned
+from olefile import MAGIC
 from olefile import MINIMAL_OLEFILE_SIZE
+from olefile import OleFileIO
 from RTFDE.exceptions import MalformedEncapsulatedRtf
 
-from digiarch.common import sanitize_filename
+from digiarch.common import move_file
 from digiarch.common import TempDir
 
-from .base import ExtractError
 from .base import ExtractorBase
 from .base import NotPreservableFileError
+from .base import prepare_attachment_name
 from .base import UnrecognizedFileError
+from .tools import MSG_TOOLS
 
 EXCLUDED_ATTACHMENTS: list[str] = [
     "tunnel_marking.txt",
@@ -33,12 +39,36 @@ EXCLUDED_ATTACHMENTS: list[str] = [
     "signature-*.txt",
     "smime.p7m",
 ]
+ATTACHMENT_STORAGE_PREFIX: str = "__attach_version1.0_#"
+ATTACHMENT_PROPERTIES_STREAM: str = "__properties_version1.0"
+ATTACHMENT_DATA_STREAM: str = "__substg1.0_37010102"
+ATTACHMENT_MSG_STORAGE: str = "__substg1.0_3701000D"
+ATTACHMENT_LONG_FILENAME: str = "3707"
+ATTACHMENT_SHORT_FILENAME: str = "3704"
+ATTACHMENT_DISPLAY_NAME: str = "3001"
+ATTACHMENT_CONTENT_ID: str = "3712"
+MESSAGE_SUBJECT: str = "0037"
+CHARSET_SAMPLE_SIZE: int = 64 * 1024
+CHARSET_CONFIDENCE: float = 0.9
+
+html_charset = re_compile(rb"<meta[^>]+charset\s*=\s*[\"']?([A-Za-z0-9_.:-]+)", IGNORECASE)
+rtf_charset = re_compile(rb"\\ansicpg(\d+)")
+
+
+class MsgAttachment(NamedTuple):
+    storage: str
+    name: str
+    cid: str | None
+    embedded: bool
+
+    @property
+    def stream(self) -> str:
+        return f"{self.storage}/{ATTACHMENT_DATA_STREAM}"
 
 
 def validate_msg(file: BaseFile) -> Message | MessageSigned:
     try:
         msg: MSGFile = openMsg(file.get_absolute_path(), delayAttachments=True)
-        _ = msg.attachments
     except (ExMsgBaseException, OSError) as e:
         raise UnrecognizedFileError(file, e.args[0] if e.args else "File cannot be opened as msg")
 
@@ -48,11 +78,74 @@ def validate_msg(file: BaseFile) -> Message | MessageSigned:
     return msg
 
 
+@cache
+def ascii_compatible(encoding: str) -> bool:
+    """Check whether an encoding leaves ASCII characters, like those used in content IDs, unchanged."""
+    try:
+        return lookup_codec(encoding).decode(b"cid:-_.@0aZ")[0] == "cid:-_.@0aZ"
+    except (LookupError, UnicodeDecodeError):
+        return False
+
+
+def declared_encoding(data: bytes) -> str | None:
+    """Read the encoding declared in the meta tags of an HTML body or the ansicpg control word of an RTF body."""
+    sample: bytes = data[:CHARSET_SAMPLE_SIZE]
+    if m := html_charset.search(sample):
+        encoding: str = m.group(1).decode("ascii")
+    elif m := rtf_charset.search(sample):
+        encoding: str = f"cp{m.group(1).decode('ascii')}"
+    else:
+        return None
+
+    try:
+        return lookup_codec(encoding).name
+    except LookupError:
+        return None
+
+
+def detect_encoding(data: bytes) -> str:
+    """
+    Detect the encoding of a message body.
+
+    The declared encoding is used if there is one. Otherwise, the encoding is detected on a sample of the data and
+    only detected on the whole data if the confidence of the sample is too low.
+    """
+    if encoding := declared_encoding(data):
+        return encoding
+
+    result = chardet.detect(data[:CHARSET_SAMPLE_SIZE])
+    if len(data) > CHARSET_SAMPLE_SIZE and (result.get("confidence") or 0) < CHARSET_CONFIDENCE:
+        result = chardet.detect(data)
+
+    return result.get("encoding") or "utf-8"
+
+
+def decode_body(data: bytes) -> str | bytes:
+    """
+    Decode a message body for matching content IDs.
+
+    Bodies that use an ASCII-compatible encoding are returned as bytes, as content IDs can be matched without decoding.
+    Bodies without null bytes in the sample cannot be UTF-16 or UTF-32 and are returned without running detection.
+    """
+    if b"\x00" not in data[:CHARSET_SAMPLE_SIZE]:
+        return data
+    encoding: str = detect_encoding(data)
+    return data if ascii_compatible(encoding) else data.decode(encoding)
+
+
+def body_contains(body: str | bytes | None, value: str) -> bool:
+    if not body:
+        return False
+    if isinstance(body, bytes):
+        return value.encode("utf-8") in body
+    return value in body
+
+
 # noinspection PyUnusedLocal
-def msg_body(msg: Message) -> tuple[str | None, str | None, str | None]:
+def msg_body(msg: Message) -> tuple[str | None, str | bytes | None, str | bytes | None]:
     body_txt: str | None = None
-    body_html: str | None = None
-    body_rtf: str | None = None
+    body_html: str | bytes | None = None
+    body_rtf: str | bytes | None = None
 
     with suppress(AttributeError, UnicodeDecodeError):
         body_txt = (msg.body or "").strip()
@@ -60,81 +153,198 @@ def msg_body(msg: Message) -> tuple[str | None, str | None, str | None]:
     with suppress(AttributeError, UnicodeDecodeError, MalformedEncapsulatedRtf):
         body_html_bytes: bytes | None = msg.htmlBody
         if body_html_bytes is not None:
-            encoding: str | None = chardet.detect(body_html_bytes).get("encoding") or "utf-8"
-            body_html = body_html_bytes.decode(encoding)
+            body_html = decode_body(body_html_bytes)
 
     with suppress(AttributeError, UnicodeDecodeError):
         body_rtf_bytes: bytes | None = msg.rtfBody
         if body_rtf_bytes is not None:
-            encoding: str | None = chardet.detect(body_rtf_bytes).get("encoding") or "utf-8"
-            body_rtf = body_rtf_bytes.decode(encoding)
+            body_rtf = decode_body(body_rtf_bytes)
 
     return body_txt, body_html, body_rtf
 
 
-def msg_attachment(attachment: AttachmentBase) -> MessageBase | None:
-    if not attachment.data:
+def msg_from_stream(stream: IO[bytes]) -> MessageBase | None:
+    try:
+        msg = openMsg(stream, delayAttachments=True)
+    except (ExMsgBaseException, OSError, ValueError):
         return None
 
-    if isinstance(attachment.data, MessageBase):
-        return attachment.data
+    return msg if isinstance(msg, MessageBase) else None
+
+
+def msg_embedded(msg: MSGFile, storage: str) -> MessageBase | None:
+    """
+    Open the message embedded in an attachment storage, sharing the file and settings of the parent message.
+
+    The message is opened with the same arguments ``EmbeddedMsgAttachment`` uses, without creating the attachment
+    objects of the parent message. The options of the parent are passed on without the arguments that place the
+    message in the file, which are set here.
+
+    :raise ExMsgBaseException: If the embedded message cannot be opened.
+    :raise OSError: If the storage of the embedded message cannot be read.
+    """
+    options: dict = {k: v for k, v in msg.kwargs.items() if k not in ("prefix", "parentMsg", "treePath")}
+    embedded = openMsg(
+        msg.path,
+        prefix=[*msg.prefixList, storage, ATTACHMENT_MSG_STORAGE],
+        parentMsg=msg,
+        treePath=msg.treePath,
+        **options,
+    )
+    return embedded if isinstance(embedded, MessageBase) else None
+
+
+def ole_string(ole: OleFileIO, storage: str, prop: str, encoding: str) -> str | None:
+    """Read a string property of a storage, preferring the Unicode stream over the 8-bit one."""
+    for stream_type, stream_encoding in (("001F", "utf-16-le"), ("001E", encoding)):
+        stream: str = f"{storage}/__substg1.0_{prop}{stream_type}"
+        if ole.exists(stream):
+            with ole.openstream(stream) as sh:
+                return sh.read().decode(stream_encoding, errors="replace").rstrip("\x00").strip() or None
+    return None
+
+
+def validate_msg_attachments(file: BaseFile, ole: OleFileIO) -> list[str]:
+    """
+    List the attachment storages of a message, checking that their properties can be read.
+
+    :param file: The message file.
+    :param ole: The OLE file of the message.
+    :return: The names of the attachment storages.
+    :raise UnrecognizedFileError: If an attachment storage is missing its properties or cannot be read.
+    """
+    try:
+        storages: list[str] = sorted(
+            {
+                entry[0]
+                for entry in ole.listdir(streams=False, storages=True)
+                if len(entry) == 1 and entry[0].startswith(ATTACHMENT_STORAGE_PREFIX)
+            }
+        )
+        for storage in storages:
+            if not ole.exists(f"{storage}/{ATTACHMENT_PROPERTIES_STREAM}"):
+                raise UnrecognizedFileError(file, f"Attachment {storage} has no properties")
+            with ole.openstream(f"{storage}/{ATTACHMENT_PROPERTIES_STREAM}") as sh:
+                sh.read()
+    except OSError as e:
+        raise UnrecognizedFileError(file, e.args[0] if e.args else "Attachments cannot be read")
+
+    return storages
 
-    if isinstance(attachment.data, bytes):
-        # noinspection PyTypeChecker
-        if len(attachment.data) < MINIMAL_OLEFILE_SIZE:
-            return None
 
-        try:
-            msg = openMsg(attachment.data, delayAttachments=True)
-        except (ExMsgBaseException, FileNotFoundError, ValueError):
-            return None
+def msg_attachments(
+    msg: Message,
+    storages: list[str],
+    body_html: str | bytes | None,
+    body_rtf: str | bytes | None,
+    ole: OleFileIO,
+) -> tuple[list[MsgAttachment], list[MsgAttachment]]:
+    """
+    Sort the attachments of a message into inline and regular attachments.
+
+    Attachments are read from the storages of the OLE file instead of ``Message.attachments``, which loads the data of
+    every attachment at once. Only the name and content ID properties are read here, the data is written from its
+    stream by ``MsgExtractor.write_stream`` or exported from the embedded message by ``MsgExtractor.write_embedded``.
+    """
+    inline_attachments: list[MsgAttachment] = []
+    attachments: list[MsgAttachment] = []
+    encoding: str = msg.stringEncoding
+
+    for storage in storages:
+        embedded: bool = ole.exists(f"{storage}/{ATTACHMENT_MSG_STORAGE}")
+        if not embedded and not ole.exists(f"{storage}/{ATTACHMENT_DATA_STREAM}"):
+            continue
 
-        return msg if isinstance(msg, MessageBase) else None
+        if embedded:
+            name: str = (
+                ole_string(ole, storage, ATTACHMENT_DISPLAY_NAME, encoding)
+                or ole_string(ole, f"{storage}/{ATTACHMENT_MSG_STORAGE}", MESSAGE_SUBJECT, encoding)
+                or ""
+            )
+        else:
+            name: str = (
+                ole_string(ole, storage, ATTACHMENT_LONG_FILENAME, encoding)
+                or ole_string(ole, storage, ATTACHMENT_SHORT_FILENAME, encoding)
+                or ""
+            )
+
+        attachment = MsgAttachment(storage, name, ole_string(ole, storage, ATTACHMENT_CONTENT_ID, encoding), embedded)
+
+        if attachment.cid and body_contains(body_html or body_rtf, attachment.cid):
+            inline_attachments.append(attachment)
+        elif embedded or not name or not any(match(p, name, flags=IGNORECASE) for p in EXCLUDED_ATTACHMENTS):
+            attachments.append(attachment)
 
-    raise TypeError(f"Unsupported attachment data type {type(attachment.data)}")
+    return inline_attachments, attachments
 
 
-def msg_attachments(
-    msg: Message,
-    body_html: str | None,
-    body_rtf: str | None,
-) -> tuple[list[AttachmentBase], list[AttachmentBase | SignedAttachment | Message | MessageSigned]]:
-    inline_attachments: list[AttachmentBase | SignedAttachment] = []
-    attachments: list[AttachmentBase | SignedAttachment | Message | MessageSigned] = []
+class MsgExtractor(ExtractorBase):
+    tool_names: ClassVar[list[str]] = MSG_TOOLS
 
-    for attachment in msg.attachments:
-        try:
-            if attachment.data is None:
-                continue
-            if (cid := getattr(attachment, "cid", None)) and cid in (body_html or body_rtf or ""):
-                inline_attachments.append(attachment)
-            elif attachment_msg := msg_attachment(attachment):
-                if isinstance(attachment_msg, Message | Message):
-                    # noinspection PyTypeChecker
-                    attachments.append(attachment_msg)
-            else:
-                name = attachment.longFilename if isinstance(attachment, SignedAttachment) else attachment.getFilename()
-                if name and any(match(pattern, name, flags=IGNORECASE) for pattern in EXCLUDED_ATTACHMENTS):
-                    continue
-                attachments.append(attachment)
-        except NotImplementedError:
-            continue
+    def preview(self) -> tuple[int, int] | None:
+        attachments: set[str] = set()
+        size: int = 0
 
-    return inline_attachments, attachments
+        try:
+            with OleFileIO(self.file.get_absolute_path()) as ole:
+                for entry in ole.listdir(streams=True, storages=False):
+                    if len(entry) < 2 or not entry[0].startswith(ATTACHMENT_STORAGE_PREFIX):
+                        continue
+                    if entry[1] == ATTACHMENT_DATA_STREAM or entry[1] == ATTACHMENT_MSG_STORAGE:
+                        attachments.add(entry[0])
+                        size += ole.get_size(entry)
+        except OSError as e:
+            raise UnrecognizedFileError(self.file, e.args[0] if e.args else "File cannot be opened as msg")
+
+        return len(attachments), size
+
+    def write_stream(self, ole: OleFileIO, stream: str, path: Path) -> bool:
+        """
+        Write the data stream of an attachment to a file in chunks, holding at most one attachment in memory.
+
+        :return: ``False`` if the attachment is a message of an unsupported type and was not written, ``True``
+            otherwise.
+        """
+        size: int = ole.get_size(stream)
+        self.check_size(size)
 
+        try:
+            sh = ole.openstream(stream)
+        except OSError as e:
+            raise UnrecognizedFileError(self.file, e.args[0] if e.args else "Attachment cannot be read")
+
+        with sh:
+            if size >= MINIMAL_OLEFILE_SIZE and sh.read(len(MAGIC)) == MAGIC:
+                sh.seek(0)
+                if (attachment_msg := msg_from_stream(sh)) and not isinstance(attachment_msg, Message):
+                    return False
+            sh.seek(0)
+            with path.open("wb") as fh:
+                copyfileobj(sh, fh)
+
+        return True
+
+    def write_embedded(self, msg: Message, storage: str, path: Path) -> MessageBase | None:
+        """
+        Export the message embedded in an attachment storage to a standalone MSG file.
+
+        :return: The embedded message if it was written, ``None`` if it is of an unsupported type.
+        """
+        try:
+            attachment_msg: MessageBase | None = msg_embedded(msg, storage)
+        except (ExMsgBaseException, OSError) as e:
+            raise UnrecognizedFileError(self.file, e.args[0] if e.args else "Embedded message cannot be opened")
 
-def prepare_attachment_name(names: list[str], name: str, n: int) -> [tuple[str], str, str]:
-    """Deduplicate attachment name by attaching a prefix to the sanitized name with the index of that name if it has already been extracted."""
-    name = name.strip() or f"attachment-{n}"
-    name_sanitized: str = sanitize_filename(name, 20, True).strip("_") or f"attachment-{n}"
-    names.append(name_sanitized.lower())
-    if (count := names.count(name_sanitized.lower())) > 1:
-        name_sanitized = f"{count - 1}_{name_sanitized}"
-    return names, name, name_sanitized
+        if attachment_msg is None:
+            return None
 
+        with attachment_msg:
+            if not isinstance(attachment_msg, Message):
+                return None
+            attachment_msg.export(path)
 
-class MsgExtractor(ExtractorBase):
-    tool_names: ClassVar[list[str]] = ["msg"]
+        self.check_size(path.stat().st_size)
+        return attachment_msg
 
     def extract(self) -> list[tuple[Path, Path]]:
         extract_folder: Path = self.extract_folder
@@ -142,36 +352,22 @@ class MsgExtractor(ExtractorBase):
 
         msg: Message | MessageSigned = validate_msg(self.file)
         _, body_html, body_rtf = msg_body(msg)
-        inline_attachments, attachments = msg_attachments(msg, body_html, body_rtf)
 
-        with TempDir(self.file.root) as tmp_dir:
+        with OleFileIO(self.file.get_absolute_path()) as ole, TempDir(self.tmp_root) as tmp_dir:
+            storages: list[str] = validate_msg_attachments(self.file, ole)
+            inline_attachments, attachments = msg_attachments(msg, storages, body_html, body_rtf, ole)
             names: list[str] = []
             for n, attachment in enumerate(inline_attachments + attachments):
-                if isinstance(attachment, Message | Message):
-                    name: str = (attachment.filename or "").strip() or (attachment.subject or "").strip()
-                    names, name, name_sanitized = prepare_attachment_name(names, name, n)
-                    if name.startswith("/"):
-                        name = name.lstrip("/")
-                    elif match(r"^[A-Za-z]:/.*", name):
-                        name = name.split("/", 1)[1].lstrip("/")
-                    attachment.export(tmp_dir / name_sanitized)
-                    files.append((name_sanitized, name))
-                elif isinstance(attachment.data, bytes):
-                    name: str = (
-                        attachment.getFilename()
-                        if isinstance(attachment, Attachment)
-                        else attachment.longFilename or ""
-                    )
-                    names, name, name_sanitized = prepare_attachment_name(names, name, n)
-                    if name.startswith("/"):
-                        name = name.lstrip("/")
-                    elif match("^[A-Za-z]:/.*", name):
-                        name = name.split("/", 1)[1].lstrip("/")
-                    with tmp_dir.joinpath(name_sanitized).open("wb") as fh:
-                        fh.write(attachment.data or b"")
+                names, name, name_sanitized = prepare_attachment_name(names, attachment.name, n)
+                if name.startswith("/"):
+                    name = name.lstrip("/")
+                elif match(r"^[A-Za-z]:/.*", name):
+                    name = name.split("/", 1)[1].lstrip("/")
+                if attachment.embedded:
+                    if self.write_embedded(msg, attachment.storage, tmp_dir / name_sanitized):
+                        files.append((name_sanitized, name))
+                elif self.write_stream(ole, attachment.stream, tmp_dir / name_sanitized):
                     files.append((name_sanitized, name))
-                elif attachment.data is not None:
-                    raise ExtractError(self.file, f"Cannot extract attachment of type {type(attachment.data)}")
 
             if not files:
                 return []
@@ -179,6 +375,9 @@ class MsgExtractor(ExtractorBase):
             extract_folder.mkdir(parents=True, exist_ok=True)
 
             return [
-                (tmp_dir.joinpath(name).replace(extract_folder.joinpath(name)), extract_folder.joinpath(name_original))
+                (
+                    move_file(tmp_dir.joinpath(name), extract_folder.joinpath(name)),
+                    extract_folder.joinpath(name_original),
+                )
                 for name, name_original in files
             ]
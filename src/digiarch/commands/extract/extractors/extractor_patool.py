@@ -1,10 +1,18 @@
+from contextlib import suppress
+from os import walk
 from pathlib import Path
+from subprocess import DEVNULL
+from subprocess import PIPE
+from subprocess import Popen
+from subprocess import TimeoutExpired
+from sys import executable
 from typing import ClassVar
 
 from acacore.utils.functions import find_files
 from patoolib import extract_archive
 from patoolib.util import PatoolError
 
+from digiarch.common import move_file
 from digiarch.common import sanitize_filename
 from digiarch.common import sanitize_path
 from digiarch.common import TempDir
@@ -12,54 +20,95 @@ from digiarch.common import TempDir
 from .base import ExtractError
 from .base import ExtractorBase
 from .base import PasswordProtectedError
+from .tools import PATOOL_TOOLS
+
+try:
+    from os import killpg
+    from signal import SIGKILL
+except ImportError:  # pragma: no cover
+    killpg = SIGKILL = None
+
+# Runs the patool command line in a child process, so it can be stopped together with the programs it calls
+PATOOL_SCRIPT: str = "import sys; from patoolib.cli import main; sys.exit(main())"
+
+# Seconds between checks of the size of the files written by patool
+WATCH_INTERVAL: float = 0.5
+
+
+def folder_size(folder: Path) -> int:
+    """Sum the size of the files in a folder, ignoring files that are removed while the folder is read."""
+    size: int = 0
+    for root, _, names in walk(folder):
+        for name in names:
+            with suppress(OSError):
+                size += Path(root, name).lstat().st_size
+    return size
 
 
 class PatoolExtractor(ExtractorBase):
-    # noinspection SpellCheckingInspection
-    tool_names: ClassVar[list[str]] = [
-        "patool",  # kept for backwards compatibility
-        "7z",
-        "ace",
-        "adf",
-        "alzip",
-        "ape",
-        "ar",
-        "arc",
-        "arj",
-        "bzip2",
-        "cab",
-        "chm",
-        "compress",
-        "cpio",
-        "deb",
-        "dms",
-        "flac",
-        "gzip",
-        "iso",
-        "lrzip",
-        "lzh",
-        "lzip",
-        "lzma",
-        "lzop",
-        "rar",
-        "rpm",
-        "rzip",
-        "shar",
-        "shn",
-        "tar",
-        "vhd",
-        "xz",
-        "zoo",
-        "zpaq",
-    ]
+    tool_names: ClassVar[list[str]] = PATOOL_TOOLS
+
+    def extract_watched(self, tmp_dir: Path, max_size: int) -> None:
+        """
+        Run patool in a separate process group, and stop it as soon as the files it has written exceed the maximum size.
+
+        :param tmp_dir: The folder to extract the archive to.
+        :param max_size: The maximum total size of the extracted files.
+        :raise ExpansionRatioError: If the extracted files exceed the maximum size.
+        :raise ExtractCancelledError: If the extraction is cancelled.
+        :raise PatoolError: If patool fails to extract the archive.
+        """
+        process = Popen(
+            [
+                executable,
+                "-c",
+                PATOOL_SCRIPT,
+                "--quiet",
+                "extract",
+                "--outdir",
+                str(tmp_dir),
+                str(self.file.get_absolute_path()),
+            ],
+            stdin=DEVNULL,
+            stdout=DEVNULL,
+            stderr=PIPE,
+            encoding="utf-8",
+            errors="replace",
+            start_new_session=True,
+        )
+
+        try:
+            while True:
+                try:
+                    _, stderr = process.communicate(timeout=WATCH_INTERVAL)
+                    break
+                except TimeoutExpired:
+                    self.check_cancelled()
+                    if (size := folder_size(tmp_dir)) > max_size:
+                        self.check_size(size)
+        finally:
+            if process.poll() is None:
+                if killpg:
+                    killpg(process.pid, SIGKILL)
+                else:  # pragma: no cover
+                    process.kill()
+                process.wait()
+
+        if process.returncode:
+            raise PatoolError(stderr.strip() or f"patool exited with code {process.returncode}")
 
     def extract(self) -> list[tuple[Path, Path]]:
         extract_folder: Path = self.extract_folder
         files: list[tuple[Path, Path]] = []
 
         try:
-            with TempDir(self.file.root) as tmp_dir:
-                extract_archive(str(self.file.get_absolute_path()), outdir=str(tmp_dir), verbosity=-1)
+            with TempDir(self.tmp_root) as tmp_dir:
+                if (max_size := self.max_size) is not None:
+                    self.extract_watched(tmp_dir, max_size)
+                else:
+                    extract_archive(str(self.file.get_absolute_path()), outdir=str(tmp_dir), verbosity=-1)
+
+                self.check_size(sum(path.stat().st_size for path in find_files(tmp_dir)))
 
                 for path in find_files(tmp_dir):
                     path_sanitized: Path = extract_folder / sanitize_path(path.relative_to(tmp_dir))
@@ -67,10 +116,10 @@ class PatoolExtractor(ExtractorBase):
                     while path_sanitized.exists():
                         path_sanitized = path_sanitized.with_name("_" + path_sanitized.name)
                     path_sanitized.parent.mkdir(parents=True, exist_ok=True)
-                    files.append((path.replace(path_sanitized), extract_folder.joinpath(path.relative_to(tmp_dir))))
+                    files.append((move_file(path, path_sanitized), extract_folder.joinpath(path.relative_to(tmp_dir))))
 
             return files
         except PatoolError as err:
             if any("encrypted" in str(arg) for arg in err.args):
                 raise PasswordProtectedError(self.file)
-            raise ExtractError(err.args[0] if err.args else repr(err))
+            raise ExtractError(self.file, err.args[0] if err.args else repr(err))
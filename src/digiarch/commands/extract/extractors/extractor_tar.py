@@ -0,0 +1,148 @@
+from bz2 import BZ2File
+from gzip import GzipFile
+from io import SEEK_END
+from lzma import LZMAError
+from lzma import LZMAFile
+from pathlib import Path
+from posixpath import dirname
+from posixpath import join
+from posixpath import normpath
+from tarfile import is_tarfile
+from tarfile import open as open_tar
+from tarfile import TarError
+from tarfile import TarInfo
+from typing import BinaryIO
+from typing import ClassVar
+from zlib import error as ZLibError
+
+from acacore.utils.functions import rm_tree
+
+from .base import copy_hashed
+from .base import ExtractError
+from .base import ExtractManifest
+from .base import ExtractorBase
+from .base import member_relative_path
+from .tools import TAR_TOOLS
+
+COMPRESSED_SUFFIXES: list[str] = [".gz", ".gzip", ".bz2", ".bzip2", ".xz", ".lzma"]
+# The maximum compression ratio of deflate
+DEFLATE_MAX_RATIO: int = 1032
+
+
+def open_compressed(path: Path) -> BinaryIO | None:
+    """Open a single-file compressed stream based on its magic bytes."""
+    with path.open("rb") as fh:
+        magic: bytes = fh.read(6)
+
+    if magic.startswith(b"\x1f\x8b"):
+        return GzipFile(path, "rb")
+    if magic.startswith(b"BZh"):
+        return BZ2File(path, "rb")
+    if magic.startswith((b"\xfd7zXZ\x00", b"\x5d\x00\x00")):
+        return LZMAFile(path, "rb")
+
+    return None
+
+
+class TarExtractor(ExtractorBase):
+    tool_names: ClassVar[list[str]] = TAR_TOOLS
+
+    @staticmethod
+    def link_target(member: TarInfo) -> str:
+        """Get the normalized name of the member a hard or symbolic link points to."""
+        if member.islnk():
+            return normpath(member.linkname)
+        return normpath(join(dirname(member.name), member.linkname))
+
+    def extract_tar(self, extract_folder: Path, manifest: ExtractManifest) -> list[tuple[Path, Path]]:
+        files: list[tuple[Path, Path]] = []
+        # Files written for each member, so links can be resolved to the members they point to
+        written: dict[str, Path] = {}
+
+        with open_tar(self.file.get_absolute_path(), "r|*") as tf:
+            for n, member in enumerate(tf):
+                if not member.isreg() and not member.islnk() and not member.issym():
+                    continue
+                if (path_original := member_relative_path(member.name)) is None:
+                    continue
+
+                if extracted := manifest.get(key := f"{n}:{member.name}"):
+                    self.check_size(extracted[0].stat().st_size)
+                    written[normpath(member.name)] = extracted[0]
+                    files.append(extracted)
+                    continue
+
+                if member.isreg():
+                    self.check_size(member.size)
+                    path_final: Path = self.member_path(extract_folder, path_original)
+                    with tf.extractfile(member) as src, path_final.open("wb") as dst:
+                        size, checksum = copy_hashed(src, dst)
+                # Links cannot be read from a tar stream, so the file of the member they point to is copied instead
+                elif (target := written.get(self.link_target(member))) and target.is_file():
+                    self.check_size(target.stat().st_size)
+                    path_final = self.member_path(extract_folder, path_original)
+                    with target.open("rb") as src, path_final.open("wb") as dst:
+                        size, checksum = copy_hashed(src, dst)
+                else:
+                    # Links to folders, to members outside the archive, or to members that come after them
+                    continue
+
+                written[normpath(member.name)] = path_final
+                manifest.add(key, path_final, extract_folder.joinpath(path_original), size, checksum)
+                files.append((path_final, extract_folder.joinpath(path_original)))
+
+        return files
+
+    def extract_compressed(self, extract_folder: Path) -> list[tuple[Path, Path]]:
+        path: Path = self.file.get_absolute_path()
+        name: str = path.stem if path.suffix.lower() in COMPRESSED_SUFFIXES else path.name
+
+        if (src := open_compressed(path)) is None:
+            raise ExtractError(self.file, "Unrecognized compression format")
+
+        path_final: Path = self.member_path(extract_folder, Path(name))
+
+        with src, path_final.open("wb") as dst:
+            self.copy(src, dst)
+
+        return [(path_final, extract_folder.joinpath(name))]
+
+    def preview(self) -> tuple[int, int] | None:
+        path: Path = self.file.get_absolute_path()
+
+        try:
+            if is_tarfile(path):
+                # Opened for random access, so the data of the members of uncompressed archives is skipped by seeking
+                with open_tar(path, "r:*") as tf:
+                    members = [m for m in tf if m.isreg() and member_relative_path(m.name)]
+                    return len(members), sum(m.size for m in members)
+
+            with path.open("rb") as fh:
+                if fh.read(2) != b"\x1f\x8b":
+                    return None
+                # The gzip trailer contains the size of the uncompressed data modulo 2^32, so it is only used if the
+                # compressed data is too small to reach 4 GiB even at the maximum compression ratio
+                if (fh.seek(-4, SEEK_END) + 4) * DEFLATE_MAX_RATIO >= 1 << 32:
+                    return None
+                return 1, int.from_bytes(fh.read(4), "little")
+        except (TarError, EOFError, OSError, LZMAError, ZLibError) as err:
+            raise ExtractError(self.file, repr(err))
+
+    def extract(self) -> list[tuple[Path, Path]]:
+        extract_folder: Path = self.extract_folder
+        manifest: ExtractManifest = self.manifest
+
+        try:
+            if is_tarfile(self.file.get_absolute_path()):
+                with manifest:
+                    return self.extract_tar(extract_folder, manifest)
+            return self.extract_compressed(extract_folder)
+        except (TarError, EOFError, OSError, LZMAError, ZLibError) as err:
+            manifest.remove()
+            rm_tree(extract_folder)
+            raise ExtractError(self.file, repr(err))
+        except Exception:
+            # Interruptions keep the files written so far, so the extraction can be resumed
+            manifest.remove()
+            rm_tree(extract_folder)
+            raise
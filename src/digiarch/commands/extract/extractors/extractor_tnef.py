@@ -1,34 +1,214 @@
+from codecs import lookup
+from collections.abc import Generator
+from mmap import mmap
 from pathlib import Path
+from struct import error as StructError
+from struct import unpack_from
 from typing import ClassVar
 
-from tnefparse import TNEF
+from tnefparse.mapi import IMESSAGE_SIG
 
+from digiarch.common import move_file
 from digiarch.common import TempDir
 
+from .base import ExtractError
 from .base import ExtractorBase
-from .extractor_msg import prepare_attachment_name
+from .base import map_file
+from .base import prepare_attachment_name
+from .tools import TNEF_TOOLS
+
+TNEF_SIGNATURE: int = 0x223E9F78
+TNEF_LEVEL_ATTACHMENT: int = 0x02
+TNEF_ATTACH_RENDDATA: int = 0x9002
+TNEF_ATTACH_TITLE: int = 0x8010
+TNEF_ATTACH_DATA: int = 0x800F
+TNEF_ATTACHMENT: int = 0x9005
+TNEF_OEM_CODEPAGE: int = 0x9007
+MAPI_DISPLAY_NAME: int = 0x3001
+MAPI_ATTACH_DATA_OBJ: int = 0x3701
+MAPI_ATTACH_FILENAME: int = 0x3704
+MAPI_ATTACH_LONG_FILENAME: int = 0x3707
+MAPI_MULTI_VALUE: int = 0x1000
+MAPI_NAMED_PROPERTY: int = 0x8000
+MAPI_OBJECT: int = 0x000D
+MAPI_STRING: int = 0x001E
+MAPI_UNICODE_STRING: int = 0x001F
+MAPI_FIXED_SIZES: dict[int, int] = {
+    0x0001: 0,  # null
+    0x0002: 2,  # short
+    0x0003: 4,  # integer
+    0x0004: 4,  # float
+    0x0005: 8,  # double
+    0x0006: 8,  # currency
+    0x0007: 8,  # application time
+    0x000A: 4,  # error
+    0x000B: 2,  # boolean
+    0x0014: 8,  # 8 byte integer
+    0x0040: 8,  # system time
+    0x0048: 16,  # GUID
+}
+MAPI_VARIABLE_TYPES: tuple[int, ...] = (0x0000, MAPI_OBJECT, MAPI_STRING, MAPI_UNICODE_STRING, 0x0102)
+# attachment name attributes and properties, in order of preference
+TNEF_NAMES: tuple[int, ...] = (MAPI_ATTACH_LONG_FILENAME, TNEF_ATTACH_TITLE, MAPI_ATTACH_FILENAME, MAPI_DISPLAY_NAME)
+
+
+def tnef_codepage(buffer: mmap | bytes, start: int) -> str:
+    codepage: str = f"cp{unpack_from('<I', buffer, start)[0]}"
+    try:
+        return lookup(codepage).name
+    except LookupError:
+        return "cp1252"
+
+
+def padded(length: int) -> int:
+    return length + (-length % 4)
+
+
+def tnef_mapi_properties(
+    buffer: mmap | bytes, start: int, end: int
+) -> Generator[tuple[int, int, int, int], None, None]:
+    """
+    Scan the MAPI properties of a TNEF attribute without copying their values.
+
+    :param buffer: The TNEF stream.
+    :param start: The offset of the attribute data.
+    :param end: The offset of the end of the attribute data.
+    :return: A generator of tuples containing the ID, type, and start and end offsets of each property value.
+    :raise ValueError: If a property has an unknown type or exceeds the attribute.
+    """
+    (count,) = unpack_from("<I", buffer, start)
+    offset: int = start + 4
+
+    for _ in range(count):
+        prop_type, prop_id = unpack_from("<HH", buffer, offset)
+        offset += 4
+
+        if prop_id >= MAPI_NAMED_PROPERTY:
+            (kind,) = unpack_from("<I", buffer, offset + 16)
+            offset += 20
+            if kind == 0:
+                offset += 4
+            else:
+                offset += 4 + padded(unpack_from("<I", buffer, offset)[0])
+
+        values: int | None = None
+        if prop_type & MAPI_MULTI_VALUE:
+            prop_type ^= MAPI_MULTI_VALUE
+            (values,) = unpack_from("<I", buffer, offset)
+            offset += 4
+
+        if prop_type in MAPI_FIXED_SIZES:
+            size: int = MAPI_FIXED_SIZES[prop_type]
+            for n in range(values or 1):
+                yield prop_id, prop_type, offset + n * size, offset + (n + 1) * size
+            offset += padded(size * (values or 1))
+        elif prop_type in MAPI_VARIABLE_TYPES:
+            if values is None:
+                (values,) = unpack_from("<I", buffer, offset)
+                offset += 4
+            for _ in range(values):
+                (length,) = unpack_from("<I", buffer, offset)
+                offset += 4
+                yield prop_id, prop_type, offset, offset + length
+                offset += padded(length)
+        else:
+            raise ValueError(f"Unknown MAPI property type {prop_type:#06x}")
+
+        if offset > end:
+            raise ValueError("Truncated MAPI property")
+
+
+def tnef_string(buffer: mmap | bytes, prop_type: int, start: int, end: int, codepage: str) -> str | None:
+    encoding: str = "utf-16-le" if prop_type == MAPI_UNICODE_STRING else codepage
+    return bytes(buffer[start:end]).decode(encoding, errors="replace").strip("\x00") or None
+
+
+def tnef_attachments(buffer: mmap | bytes) -> list[tuple[str, int, int]]:
+    """
+    Scan the attributes of a TNEF stream without copying attachment data.
+
+    The data of an attachment is read from the attAttachData attribute, or from the PR_ATTACH_DATA_OBJ property of the
+    attAttachment attribute if the former is missing. The name is taken from the first of the long filename, title,
+    filename, and display name properties.
+
+    :param buffer: The TNEF stream.
+    :return: A list of tuples containing the name of each attachment and the start and end offsets of its data.
+    :raise ValueError: If the stream is not a valid TNEF stream or an attachment has no data.
+    """
+    if len(buffer) < 6 or unpack_from("<I", buffer, 0)[0] != TNEF_SIGNATURE:
+        raise ValueError("Invalid TNEF signature")
+
+    codepage: str = "cp1252"
+    # names by attribute/property ID, data start, data end, data object start, data object end
+    attachments: list[list] = []
+    offset: int = 6
+
+    while offset + 9 <= len(buffer):
+        level, name, _, length = unpack_from("<BHHI", buffer, offset)
+        start, end = offset + 9, offset + 9 + length
+        if end + 2 > len(buffer):
+            raise ValueError("Truncated TNEF attribute")
+
+        if level == TNEF_LEVEL_ATTACHMENT:
+            if name == TNEF_ATTACH_RENDDATA or not attachments:
+                attachments.append([{}, None, None, None, None])
+            if name == TNEF_ATTACH_TITLE:
+                attachments[-1][0][name] = tnef_string(buffer, MAPI_STRING, start, end, codepage)
+            elif name == TNEF_ATTACH_DATA:
+                attachments[-1][1:3] = [start, end]
+            elif name == TNEF_ATTACHMENT:
+                for prop_id, prop_type, prop_start, prop_end in tnef_mapi_properties(buffer, start, end):
+                    if prop_id == MAPI_ATTACH_DATA_OBJ:
+                        if prop_type == MAPI_OBJECT and buffer[prop_start : prop_start + 16] == IMESSAGE_SIG:
+                            prop_start += len(IMESSAGE_SIG)
+                        attachments[-1][3:] = [prop_start, prop_end]
+                    elif prop_id in TNEF_NAMES and prop_type in (MAPI_STRING, MAPI_UNICODE_STRING):
+                        attachments[-1][0][prop_id] = tnef_string(buffer, prop_type, prop_start, prop_end, codepage)
+        elif name == TNEF_OEM_CODEPAGE and length >= 4:
+            codepage = tnef_codepage(buffer, start)
+
+        offset = end + 2
+
+    results: list[tuple[str, int, int]] = []
+
+    for names, data_start, data_end, object_start, object_end in attachments:
+        attachment_name: str = next((names[n] for n in TNEF_NAMES if names.get(n)), "")
+        if data_start is not None and (data_start < data_end or object_start is None):
+            results.append((attachment_name, data_start, data_end))
+        elif object_start is not None:
+            results.append((attachment_name, object_start, object_end))
+        else:
+            raise ValueError(f"Attachment {attachment_name or len(results) + 1} has no data")
+
+    return results
 
 
 class TNEFExtractor(ExtractorBase):
-    tool_names: ClassVar[list[str]] = [
-        "tnefparse",  # kept for backwards compatibility
-        "tnef",
-    ]
+    tool_names: ClassVar[list[str]] = TNEF_TOOLS
+
+    def preview(self) -> tuple[int, int] | None:
+        try:
+            with map_file(self.file.get_absolute_path()) as buffer:
+                attachments = tnef_attachments(buffer)
+        except (ValueError, StructError) as err:
+            raise ExtractError(self.file, "Malformed TNEF file", repr(err))
+
+        return len(attachments), sum(end - start for _, start, end in attachments)
 
     def extract(self) -> list[tuple[Path, Path]]:
         extract_folder: Path = self.extract_folder
         files: list[tuple[str, str]] = []
 
-        with self.file.get_absolute_path().open("rb") as fh:
-            tnef = TNEF(fh.read())
+        with map_file(self.file.get_absolute_path()) as buffer, TempDir(self.tmp_root) as tmp_dir:
+            try:
+                attachments = tnef_attachments(buffer)
+            except (ValueError, StructError) as err:
+                raise ExtractError(self.file, "Malformed TNEF file", repr(err))
 
-        with TempDir(self.file.root) as tmp_dir:
             names: list[str] = []
-            for n, attachment in enumerate(tnef.attachments):
-                name: str = attachment.long_filename() or attachment.name
+            for n, (name, start, end) in enumerate(attachments):
                 names, name, name_sanitized = prepare_attachment_name(names, name, n)
-                with tmp_dir.joinpath(name_sanitized).open("wb") as oh:
-                    oh.write(attachment.data)
+                self.write_buffer(buffer, start, end, tmp_dir.joinpath(name_sanitized))
                 files.append((name_sanitized, name))
 
             if not files:
@@ -38,7 +218,7 @@ class TNEFExtractor(ExtractorBase):
 
             return [
                 (
-                    tmp_dir.joinpath(name_extracted).replace(extract_folder.joinpath(name_extracted)),
+                    move_file(tmp_dir.joinpath(name_extracted), extract_folder.joinpath(name_extracted)),
                     extract_folder.joinpath("_").with_name(name_original),
                 )
                 for name_extracted, name_original in files
@@ -1,34 +1,86 @@
+from io import BytesIO
+from mmap import mmap
 from pathlib import Path
-from plistlib import load as load_plist
+from plistlib import _BinaryPlistParser
+from plistlib import _undefined
+from plistlib import InvalidFileException
+from plistlib import loads as loads_plist
 from typing import ClassVar
+from typing import NamedTuple
 from urllib.parse import urlparse
 
 from acacore.utils.functions import find_files
 
 from digiarch.commands.extract.extractors.base import ExtractError
 from digiarch.commands.extract.extractors.base import ExtractorBase
+from digiarch.commands.extract.extractors.base import map_file
+from digiarch.commands.extract.extractors.tools import WEBARCHIVE_TOOLS
+from digiarch.common import move_file
 from digiarch.common import TempDir
 
 
+class DataSlice(NamedTuple):
+    start: int
+    end: int
+
+
+class MappedPlistParser(_BinaryPlistParser):
+    """
+    Binary plist parser that returns the offsets of data objects instead of reading them into memory.
+
+    The parser extends the private binary parser of ``plistlib``, so its results are compared with ``plistlib.loads``
+    by ``tests/test_extract.py::test_webarchive_parser`` to catch changes between Python versions.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(dict_type=dict)
+
+    def _read_object(self, ref: int):
+        if self._objects[ref] is not _undefined:
+            return self._objects[ref]
+
+        self._fp.seek(self._object_offsets[ref])
+        token: int = self._fp.read(1)[0]
+        if token & 0xF0 != 0x40:
+            return super()._read_object(ref)
+
+        size: int = self._get_size(token & 0x0F)
+        start: int = self._fp.tell()
+        self._objects[ref] = DataSlice(start, start + size)
+        return self._objects[ref]
+
+
+def load_webarchive(buffer: mmap | bytes) -> dict:
+    """Load a webarchive plist, leaving the resource data of binary plists in the buffer."""
+    if buffer[:8] == b"bplist00":
+        return MappedPlistParser().parse(buffer if isinstance(buffer, mmap) else BytesIO(buffer))
+    return loads_plist(bytes(buffer))
+
+
 class WebarchiveExtractor(ExtractorBase):
-    tool_names: ClassVar[list[str]] = ["webarchive"]
+    tool_names: ClassVar[list[str]] = WEBARCHIVE_TOOLS
+
+    def write_resource(self, buffer: mmap | bytes, data: DataSlice | bytes, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, DataSlice):
+            return self.write_buffer(buffer, data.start, data.end, path)
+        return self.write_buffer(data, 0, len(data), path)
 
     def extract(self) -> list[tuple[Path, Path]]:
         extract_folder: Path = self.extract_folder
         files: list[tuple[Path, Path]] = []
 
         try:
-            with self.file.get_absolute_path().open("rb") as fh:
-                archive: dict = load_plist(fh)
+            with map_file(self.file.get_absolute_path()) as buffer, TempDir(self.tmp_root) as tmp_dir:
+                archive: dict = load_webarchive(buffer)
 
-            url_scheme: str = urlparse(archive["WebMainResource"]["WebResourceURL"]).scheme
-            url_domain: str = urlparse(archive["WebMainResource"]["WebResourceURL"]).hostname
-            url_prefix: str = f"{url_scheme}://{url_domain}/"
-            archive["WebSubresources"] = archive.get("WebSubresources", [])
+                url_scheme: str = urlparse(archive["WebMainResource"]["WebResourceURL"]).scheme
+                url_domain: str = urlparse(archive["WebMainResource"]["WebResourceURL"]).hostname
+                url_prefix: str = f"{url_scheme}://{url_domain}/"
+                archive["WebSubresources"] = archive.get("WebSubresources", [])
 
-            with TempDir(self.file.root) as tmp_dir:
                 index_file: Path = tmp_dir.joinpath("index.html")
-                index_file.write_bytes(archive["WebMainResource"]["WebResourceData"])
+                self.write_resource(buffer, archive["WebMainResource"]["WebResourceData"], index_file)
 
                 for subframe in archive.get("WebSubframeArchives", []):
                     if not subframe["WebMainResource"]["WebResourceURL"].startswith(url_prefix):
@@ -37,22 +89,22 @@ class WebarchiveExtractor(ExtractorBase):
                         subframe["WebMainResource"]["WebResourceURL"].removeprefix(url_prefix)
                     )
 
-                    subframe_index.parent.mkdir(parents=True, exist_ok=True)
-                    subframe_index.write_bytes(subframe["WebMainResource"]["WebResourceData"])
+                    self.write_resource(buffer, subframe["WebMainResource"]["WebResourceData"], subframe_index)
                     archive["WebSubresources"].extend(subframe["WebSubresources"])
 
                 for resource in archive["WebSubresources"]:
                     if not resource["WebResourceURL"].startswith(url_prefix):
                         continue
                     resource_file: Path = tmp_dir.joinpath(resource["WebResourceURL"].removeprefix(url_prefix))
-                    resource_file.parent.mkdir(parents=True, exist_ok=True)
-                    resource_file.write_bytes(resource["WebResourceData"])
+                    self.write_resource(buffer, resource["WebResourceData"], resource_file)
 
                 for file in find_files(tmp_dir):
                     file_new: Path = extract_folder.joinpath(file.relative_to(tmp_dir))
                     file_new.parent.mkdir(parents=True, exist_ok=True)
-                    files.append((file.replace(file_new), file_new))
+                    files.append((move_file(file, file_new), file_new))
 
             return files
         except KeyError as e:
             raise ExtractError(self.file, "Malformed plist, KeyError", *e.args)
+        except InvalidFileException as e:
+            raise ExtractError(self.file, "Malformed plist", *e.args)
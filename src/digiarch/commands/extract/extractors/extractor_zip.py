@@ -3,55 +3,65 @@ from typing import ClassVar
 from zipfile import BadZipFile
 from zipfile import LargeZipFile
 from zipfile import ZipFile
+from zipfile import ZipInfo
 
-from digiarch.common import sanitize_filename
-from digiarch.common import sanitize_path
-from digiarch.common import TempDir
+from acacore.utils.functions import rm_tree
 
+from .base import copy_hashed
 from .base import ExtractError
+from .base import ExtractManifest
 from .base import ExtractorBase
+from .base import member_relative_path
 from .base import PasswordProtectedError
+from .tools import ZIP_TOOLS
 
 
 class ZipExtractor(ExtractorBase):
-    tool_names: ClassVar[list[str]] = [
-        "zip",
-        "kmz",
-    ]
+    tool_names: ClassVar[list[str]] = ZIP_TOOLS
+
+    def preview(self) -> tuple[int, int] | None:
+        try:
+            with ZipFile(self.file.get_absolute_path()) as zf:
+                members = [m for m in zf.infolist() if not m.is_dir()]
+                return len(members), sum(m.file_size for m in members)
+        except (BadZipFile, LargeZipFile) as e:
+            raise ExtractError(self.file, repr(e))
 
     def extract(self) -> list[tuple[Path, Path]]:
         extract_folder: Path = self.extract_folder
+        manifest: ExtractManifest = self.manifest
         files: list[tuple[Path, Path]] = []
-        files_tmp: list[tuple[Path, Path]] = []
 
         try:
-            with (
-                TempDir(self.file.root) as tmp_extract,
-                TempDir(self.file.root) as tmp_final,
-            ):
-                with ZipFile(self.file.get_absolute_path()) as zf:
-                    for member in zf.infolist():
-                        if member.is_dir():
-                            continue
-                        if member.flag_bits & 0b1:
-                            raise PasswordProtectedError(self.file)
-
-                        path_original: Path = Path(zf.extract(member, tmp_extract))
-                        path_final: Path = tmp_final.joinpath(sanitize_path(path_original.relative_to(tmp_extract)))
-                        path_final = path_final.with_name(sanitize_filename(path_final.name, 20, True))
-                        while path_final.exists():
-                            path_final = path_final.with_name("_" + path_final.name)
-
-                        path_final.parent.mkdir(parents=True, exist_ok=True)
-                        path_original.replace(path_final)
-
-                        files_tmp.append((path_final.relative_to(tmp_final), path_original.relative_to(tmp_extract)))
-
-                for path_extracted, path_original in files_tmp:
-                    extract_folder.joinpath(path_extracted).parent.mkdir(parents=True, exist_ok=True)
-                    tmp_final.joinpath(path_extracted).replace(extract_folder.joinpath(path_extracted))
-                    files.append((extract_folder.joinpath(path_extracted), extract_folder.joinpath(path_original)))
-
-                return files
+            with ZipFile(self.file.get_absolute_path()) as zf, manifest:
+                members: list[ZipInfo] = [m for m in zf.infolist() if not m.is_dir()]
+                self.check_size(sum(m.file_size for m in members))
+
+                if any(m.flag_bits & 0b1 for m in members):
+                    raise PasswordProtectedError(self.file)
+
+                for n, member in enumerate(members):
+                    if (path_original := member_relative_path(member.filename)) is None:
+                        continue
+                    if extracted := manifest.get(key := f"{n}:{member.filename}"):
+                        files.append(extracted)
+                        continue
+
+                    path_final: Path = self.member_path(extract_folder, path_original)
+
+                    with zf.open(member) as src, path_final.open("wb") as dst:
+                        size, checksum = copy_hashed(src, dst)
+
+                    manifest.add(key, path_final, extract_folder.joinpath(path_original), size, checksum)
+                    files.append((path_final, extract_folder.joinpath(path_original)))
+
+            return files
         except (BadZipFile, LargeZipFile) as e:
+            manifest.remove()
+            rm_tree(extract_folder)
             raise ExtractError(self.file, repr(e))
+        except Exception:
+            # Interruptions keep the files written so far, so the extraction can be resumed
+            manifest.remove()
+            rm_tree(extract_folder)
+            raise
@@ -0,0 +1,59 @@
+from functools import cache
+from importlib import import_module
+from importlib.metadata import entry_points
+
+from .base import ExtractorBase
+from .tools import EML_TOOLS
+from .tools import MBOX_TOOLS
+from .tools import MSG_TOOLS
+from .tools import PATOOL_TOOLS
+from .tools import TAR_TOOLS
+from .tools import TNEF_TOOLS
+from .tools import WEBARCHIVE_TOOLS
+from .tools import ZIP_TOOLS
+
+ENTRY_POINT_GROUP: str = "digiarch.extractors"
+
+# Built-in extractors in order of priority and the tools they support
+BUILTIN_EXTRACTORS: list[tuple[str, list[str]]] = [
+    ("digiarch.commands.extract.extractors.extractor_zip:ZipExtractor", ZIP_TOOLS),
+    ("digiarch.commands.extract.extractors.extractor_tnef:TNEFExtractor", TNEF_TOOLS),
+    ("digiarch.commands.extract.extractors.extractor_msg:MsgExtractor", MSG_TOOLS),
+    ("digiarch.commands.extract.extractors.extractor_tar:TarExtractor", TAR_TOOLS),
+    ("digiarch.commands.extract.extractors.extractor_patool:PatoolExtractor", PATOOL_TOOLS),
+    ("digiarch.commands.extract.extractors.extractor_webarchive:WebarchiveExtractor", WEBARCHIVE_TOOLS),
+    ("digiarch.commands.extract.extractors.extractor_mail:MboxExtractor", MBOX_TOOLS),
+    ("digiarch.commands.extract.extractors.extractor_mail:EmlExtractor", EML_TOOLS),
+]
+
+
+@cache
+def extractor_registry() -> dict[str, str]:
+    """
+    Map tool names to the import paths of the extractors that support them.
+
+    Built-in extractors are registered first, followed by extractors installed by other packages under the
+    ``digiarch.extractors`` entry point group, with the tool name as the entry point name. The first extractor
+    registered for a tool takes priority.
+    :return: A dictionary of tool names and extractor import paths in the format ``module:class``.
+    """
+    registry: dict[str, str] = {}
+
+    for target, tools in BUILTIN_EXTRACTORS:
+        for tool in tools:
+            registry.setdefault(tool, target)
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        registry.setdefault(entry_point.name, entry_point.value)
+
+    return registry
+
+
+@cache
+def load_extractor(target: str) -> type[ExtractorBase]:
+    """Import an extractor class from its import path in the format ``module:class``."""
+    module_name, _, class_name = target.partition(":")
+    extractor: type[ExtractorBase] = getattr(import_module(module_name), class_name)
+    if not isinstance(extractor, type) or not issubclass(extractor, ExtractorBase):
+        raise TypeError(f"{target} is not a subclass of ExtractorBase")
+    return extractor
@@ -0,0 +1,113 @@
+from multiprocessing import get_all_start_methods
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from pathlib import Path
+from time import monotonic
+
+from acacore.utils.functions import rm_tree
+from acacore.utils.io import size_fmt
+
+from digiarch.common import TempDir
+
+from .base import ExtractCancelledError
+from .base import ExtractError
+from .base import ExtractorBase
+from .base import ExtractorLimitError
+
+try:
+    from resource import RLIMIT_AS
+    from resource import setrlimit
+except ImportError:  # pragma: no cover
+    RLIMIT_AS = setrlimit = None
+
+# extractions are started from the prefetch thread, and forking a process with threads can deadlock the child
+START_METHOD: str = "forkserver" if "forkserver" in get_all_start_methods() else "spawn"
+
+# Seconds between checks for cancellation while waiting for the child process
+POLL_INTERVAL: float = 0.5
+
+
+def extract_process(extractor: ExtractorBase, memory_limit: int | None, conn: Connection) -> None:
+    if memory_limit and setrlimit:
+        setrlimit(RLIMIT_AS, (memory_limit, memory_limit))
+
+    try:
+        conn.send(("ok", extractor.extract()))
+    except ExtractError as err:
+        conn.send(("extract", (err.__class__, err.msg)))
+    except MemoryError:
+        conn.send(("memory", None))
+    except Exception as err:
+        conn.send(("error", repr(err)))
+    finally:
+        conn.close()
+
+
+def extract_sandboxed(
+    extractor: ExtractorBase,
+    timeout: float | None = None,
+    memory_limit: int | None = None,
+) -> list[tuple[Path, Path]]:
+    """
+    Run the extractor in a child process with a wall-clock and an address space limit.
+
+    Temporary folders of the extractor are created inside a folder owned by the parent process, so they are removed
+    even if the child process is killed. The child process is not forked from the calling process, so the extractor
+    must be picklable.
+
+    :param extractor: The extractor to run.
+    :param timeout: The maximum number of seconds the extraction may take, or ``None`` for no limit.
+    :param memory_limit: The maximum size in bytes of the address space of the child process, or ``None`` for no
+        limit. Ignored on platforms without the ``resource`` module.
+    :raise ExtractorLimitError: If the child process exceeds one of the limits or is terminated.
+    :raise ExtractCancelledError: If the extractor is cancelled while the child process is running.
+    :raise ExtractError: If the extractor raises an ``ExtractError``.
+    :raise RuntimeError: If the extractor raises an unexpected exception.
+    :return: The list of extracted files returned by ``ExtractorBase.extract``.
+    """
+    context = get_context(START_METHOD)
+    scratch_dir: Path | None = extractor.scratch_dir
+
+    with TempDir(extractor.tmp_root) as sandbox_dir:
+        extractor.scratch_dir = sandbox_dir
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=extract_process, args=(extractor, memory_limit, sender), daemon=True)
+        process.start()
+
+        try:
+            sender.close()
+            deadline: float | None = monotonic() + timeout if timeout else None
+            status, value = "cancelled", None
+            while not extractor.cancelled:
+                wait: float = POLL_INTERVAL if deadline is None else min(POLL_INTERVAL, deadline - monotonic())
+                if receiver.poll(max(wait, 0)):
+                    status, value = receiver.recv()
+                    break
+                if deadline is not None and monotonic() >= deadline:
+                    status, value = "timeout", None
+                    break
+        except EOFError:
+            status, value = "terminated", None
+        finally:
+            if process.is_alive():
+                process.kill()
+            process.join()
+            receiver.close()
+            extractor.scratch_dir = scratch_dir
+
+    if status == "ok":
+        return value
+
+    rm_tree(extractor.extract_folder)
+
+    if status == "extract":
+        raise value[0](extractor.file, value[1])
+    if status == "cancelled":
+        raise ExtractCancelledError(extractor.file, "Extraction cancelled")
+    if status == "timeout":
+        raise ExtractorLimitError(extractor.file, f"Extraction exceeded the time limit of {timeout:g} seconds")
+    if status == "memory":
+        raise ExtractorLimitError(extractor.file, f"Extraction exceeded the memory limit of {size_fmt(memory_limit)}")
+    if status == "terminated":
+        raise ExtractorLimitError(extractor.file, f"Extraction process terminated with code {process.exitcode}")
+    raise RuntimeError(value)
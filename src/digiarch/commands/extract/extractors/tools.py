@@ -0,0 +1,69 @@
+"""
+Tool names supported by the built-in extractors.
+
+The lists are kept in this module so the registry can map tools to extractors without importing them.
+"""
+
+ZIP_TOOLS: list[str] = [
+    "zip",
+    "kmz",
+]
+
+TNEF_TOOLS: list[str] = [
+    "tnefparse",  # kept for backwards compatibility
+    "tnef",
+]
+
+MSG_TOOLS: list[str] = ["msg"]
+
+TAR_TOOLS: list[str] = [
+    "tar",
+    "gzip",
+    "bzip2",
+    "xz",
+    "lzma",
+]
+
+# noinspection SpellCheckingInspection
+PATOOL_TOOLS: list[str] = [
+    "patool",  # kept for backwards compatibility
+    "7z",
+    "ace",
+    "adf",
+    "alzip",
+    "ape",
+    "ar",
+    "arc",
+    "arj",
+    "bzip2",
+    "cab",
+    "chm",
+    "compress",
+    "cpio",
+    "deb",
+    "dms",
+    "flac",
+    "gzip",
+    "iso",
+    "lrzip",
+    "lzh",
+    "lzip",
+    "lzma",
+    "lzop",
+    "rar",
+    "rpm",
+    "rzip",
+    "shar",
+    "shn",
+    "tar",
+    "vhd",
+    "xz",
+    "zoo",
+    "zpaq",
+]
+
+WEBARCHIVE_TOOLS: list[str] = ["webarchive"]
+
+MBOX_TOOLS: list[str] = ["mbox"]
+
+EML_TOOLS: list[str] = ["eml"]
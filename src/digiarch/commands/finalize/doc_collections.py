@@ -7,7 +7,6 @@ from acacore.database import FilesDB
 from acacore.models.event import Event
 from acacore.models.file import ConvertedFile
 from acacore.utils.click import end_program
-from acacore.utils.click import start_program
 from acacore.utils.functions import rm_tree
 from acacore.utils.helpers import ExceptionManager
 from click import command
@@ -19,7 +18,10 @@ from click import pass_context
 from digiarch.__version__ import __version__
 from digiarch.common import get_avid
 from digiarch.common import open_database
+from digiarch.common import option_db_profile
 from digiarch.common import option_dry_run
+from digiarch.common import start_program_profile
+from digiarch.database import rebuild_fts
 
 
 def safe_copy(src: Path, dst: Path):
@@ -48,9 +50,10 @@ def gis_xsd(database: FilesDB, file: ConvertedFile) -> ConvertedFile:
     help="The maximum number of documents to put in each docCollection.",
 )
 @option("--resume/--no-resume", is_flag=True, default=False, help="Resume a previously interrupted rearrangement.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
-def cmd_doc_collections(ctx: Context, docs_in_collection: int, resume: bool, dry_run: bool):
+def cmd_doc_collections(ctx: Context, docs_in_collection: int, resume: bool, db_profile: str, dry_run: bool):
     """
     Rearrange files in Documents using docCollections.
 
@@ -64,8 +67,8 @@ def cmd_doc_collections(ctx: Context, docs_in_collection: int, resume: bool, dry
     """
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
-        _, log_stdout, _ = start_program(ctx, database, __version__, None, False, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        _, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, False, True, dry_run)
 
         with ExceptionManager() as exception:
             temp_dir: Path = avid.dirs.documents.joinpath("_metadata", "docCollections")
@@ -188,6 +191,8 @@ def cmd_doc_collections(ctx: Context, docs_in_collection: int, resume: bool, dry
                     rm_tree(avid.dirs.documents.joinpath("_metadata"))
                 database.commit()
                 database.execute("vacuum")
+                rebuild_fts(database.connection)
+                database.commit()
                 Event.from_command(ctx, "cleanup:end").log(INFO, log_stdout)
 
         end_program(ctx, database, exception, dry_run, log_stdout)
@@ -7,7 +7,6 @@ from xml.sax.saxutils import escape
 from acacore.models.event import Event
 from acacore.utils.click import ctx_params
 from acacore.utils.click import end_program
-from acacore.utils.click import start_program
 from acacore.utils.helpers import ExceptionManager
 from click import BadParameter
 from click import command
@@ -21,6 +20,8 @@ from pydantic import UUID4
 from digiarch.__version__ import __version__
 from digiarch.common import get_avid
 from digiarch.common import open_database
+from digiarch.common import option_db_profile
+from digiarch.common import start_program_profile
 
 
 class DocIndexFile(BaseModel):
@@ -49,8 +50,15 @@ class DocIndexFile(BaseModel):
     show_default=True,
     help="The maximum number of documents to put in each mediaID collection.",
 )
+@option_db_profile()
 @pass_context
-def cmd_doc_index(ctx: Context, media_id: str | None, docs_in_collection: int, docs_in_media: int | None):
+def cmd_doc_index(
+    ctx: Context,
+    media_id: str | None,
+    docs_in_collection: int,
+    docs_in_media: int | None,
+    db_profile: str,
+):
     """
     Create the docIndex.xml file from statutory files.
 
@@ -68,8 +76,8 @@ def cmd_doc_index(ctx: Context, media_id: str | None, docs_in_collection: int, d
     else:
         raise BadParameter(f"{media_id!r} not in format AVID.ABCD.1234.1.", ctx, ctx_params(ctx)["media_id"])
 
-    with open_database(ctx, avid) as database:
-        _, log_stdout, _ = start_program(ctx, database, __version__, None, False, True, False)
+    with open_database(ctx, avid, db_profile) as database:
+        _, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, False, True, False)
 
         with ExceptionManager(BaseException) as exception:
             Event.from_command(ctx, "compiling").log(INFO, log_stdout)
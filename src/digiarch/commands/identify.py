@@ -29,7 +29,6 @@ from acacore.siegfried.siegfried import SiegfriedFile
 from acacore.siegfried.siegfried import TSignaturesProvider
 from acacore.utils.click import ctx_params
 from acacore.utils.click import end_program
-from acacore.utils.click import start_program
 from acacore.utils.functions import find_files
 from acacore.utils.helpers import ExceptionManager
 from click import BadParameter
@@ -50,9 +49,11 @@ from digiarch.common import fetch_actions_master
 from digiarch.common import fetch_custom_signatures
 from digiarch.common import get_avid
 from digiarch.common import open_database
+from digiarch.common import option_db_profile
 from digiarch.common import option_dry_run
+from digiarch.common import start_program_profile
 from digiarch.query import argument_query
-from digiarch.query import query_to_where
+from digiarch.query import CompiledQuery
 from digiarch.query import TQuery
 
 
@@ -119,21 +120,9 @@ def find_files_query(
     query: TQuery,
     batch_size: int,
 ) -> Generator[Path, None, None]:
-    where, parameters = query_to_where(query)
-    offset: int = 0
-
-    while batch := table.select(
-        where,
-        parameters,
-        order_by=[("lower(relative_path)", "asc")],
-        limit=batch_size,
-        offset=offset,
-    ).fetchall():
-        offset += len(batch)
+    for batch in CompiledQuery(table, query).pages(batch_size):
         yield from (avid.path / f.relative_path for f in batch)
 
-    yield from ()
-
 
 def identify_original_file(
     ctx: Context,
@@ -335,7 +324,11 @@ def grp_identify():
 
 
 @grp_identify.command("original", short_help="Identify original files.")
-@argument_query(False, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed", "lock"])
+@argument_query(
+    False,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "action", "action_data", "warning", "processed", "lock"],
+)
 @option(
     "--siegfried-path",
     type=ClickPath(exists=True, dir_okay=False, resolve_path=True),
@@ -381,6 +374,7 @@ def grp_identify():
 @option("--exclude", type=str, multiple=True, help="File and folder names to exclude.  [multiple]")
 @option("--batch-size", type=IntRange(1), default=100, show_default=True, help="Amount of files to identify at a time.")
 @option("--ignore-lock", is_flag=True, default=False, show_default=True, help="Re-identify locked files.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_identify_original(
@@ -394,6 +388,7 @@ def cmd_identify_original(
     exclude: tuple[str, ...],
     batch_size: int | None,
     ignore_lock: bool,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -417,8 +412,8 @@ def cmd_identify_original(
         custom_signatures_file,
     )
 
-    with open_database(ctx, avid) as db:
-        log_file, log_stdout, _ = start_program(ctx, db, __version__, None, not dry_run, True, dry_run)
+    with open_database(ctx, avid, db_profile) as db:
+        log_file, log_stdout, _ = start_program_profile(ctx, db, __version__, db_profile, not dry_run, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             if query:
@@ -451,7 +446,11 @@ def cmd_identify_original(
 
 
 @grp_identify.command("master", short_help="Identify master files.")
-@argument_query(False, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning", "processed", "lock"])
+@argument_query(
+    False,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "action", "warning", "processed", "lock"],
+)
 @option(
     "--siegfried-path",
     type=ClickPath(exists=True, dir_okay=False, resolve_path=True),
@@ -495,6 +494,7 @@ def cmd_identify_original(
     help="Path to a YAML file containing custom signature specifications.",
 )
 @option("--batch-size", type=IntRange(1), default=100, show_default=True, help="Amount of files to identify at a time.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_identify_master(
@@ -506,6 +506,7 @@ def cmd_identify_master(
     actions_file: str | None,
     custom_signatures_file: str | None,
     batch_size: int | None,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -529,8 +530,8 @@ def cmd_identify_master(
         custom_signatures_file,
     )
 
-    with open_database(ctx, avid) as db:
-        log_file, log_stdout, _ = start_program(ctx, db, __version__, None, not dry_run, True, dry_run)
+    with open_database(ctx, avid, db_profile) as db:
+        log_file, log_stdout, _ = start_program_profile(ctx, db, __version__, db_profile, not dry_run, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             files = find_files_query(avid, db.master_files, query, batch_size)
@@ -546,7 +547,7 @@ def cmd_identify_master(
 
 # noinspection DuplicatedCode
 @grp_identify.command("access", short_help="Identify access files.")
-@argument_query(False, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning"])
+@argument_query(False, "uuid", ["uuid", "checksum", "puid", "relative_path", "size", "action", "warning"])
 @option(
     "--siegfried-path",
     type=ClickPath(exists=True, dir_okay=False, resolve_path=True),
@@ -572,6 +573,7 @@ def cmd_identify_master(
     help="The signature file to use with Siegfried.",
 )
 @option("--batch-size", type=IntRange(1), default=100, show_default=True, help="Amount of files to identify at a time.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_identify_access(
@@ -581,6 +583,7 @@ def cmd_identify_access(
     siegfried_signature: str,
     siegfried_home: str | None,
     batch_size: int | None,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -606,8 +609,8 @@ def cmd_identify_access(
         print(err)
         raise BadParameter("Invalid binary or signature file.", ctx, ctx_params(ctx)["siegfried_path"])
 
-    with open_database(ctx, avid) as db:
-        log_file, log_stdout, _ = start_program(ctx, db, __version__, None, not dry_run, True, dry_run)
+    with open_database(ctx, avid, db_profile) as db:
+        log_file, log_stdout, _ = start_program_profile(ctx, db, __version__, db_profile, not dry_run, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             files = find_files_query(avid, db.access_files, query, batch_size)
@@ -623,7 +626,7 @@ def cmd_identify_access(
 
 # noinspection DuplicatedCode
 @grp_identify.command("statutory", short_help="Identify statutory files.")
-@argument_query(False, "uuid", ["uuid", "checksum", "puid", "relative_path", "action", "warning"])
+@argument_query(False, "uuid", ["uuid", "checksum", "puid", "relative_path", "size", "action", "warning"])
 @option(
     "--siegfried-path",
     type=ClickPath(exists=True, dir_okay=False, resolve_path=True),
@@ -649,6 +652,7 @@ def cmd_identify_access(
     help="The signature file to use with Siegfried.",
 )
 @option("--batch-size", type=IntRange(1), default=100, show_default=True, help="Amount of files to identify at a time.")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_identify_statutory(
@@ -658,6 +662,7 @@ def cmd_identify_statutory(
     siegfried_signature: str,
     siegfried_home: str | None,
     batch_size: int | None,
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -683,8 +688,8 @@ def cmd_identify_statutory(
         print(err)
         raise BadParameter("Invalid binary or signature file.", ctx, ctx_params(ctx)["siegfried_path"])
 
-    with open_database(ctx, avid) as db:
-        log_file, log_stdout, _ = start_program(ctx, db, __version__, None, not dry_run, True, dry_run)
+    with open_database(ctx, avid, db_profile) as db:
+        log_file, log_stdout, _ = start_program_profile(ctx, db, __version__, db_profile, not dry_run, True, dry_run)
 
         with ExceptionManager(BaseException) as exception:
             files = find_files_query(avid, db.statutory_files, query, batch_size)
@@ -60,7 +60,7 @@ def cmd_info(ctx: Context):
     """Display information about the database."""
     avid = get_avid(ctx)
 
-    with open_database(ctx, avid) as database:
+    with open_database(ctx, avid, query_only=True) as database:
         lazy_print("initialized: ", lambda: database.log.select(order_by=[("time", "asc")], limit=1).fetchone().time)
 
         print("\nfiles:")
@@ -31,6 +31,8 @@ from orjson import loads
 
 from digiarch.__version__ import __version__
 from digiarch.common import AVID
+from digiarch.database import create_indices
+from digiarch.database import enable_wal
 
 
 def root_callback(ctx: Context, param: Parameter, value: str) -> AVID:
@@ -292,7 +294,10 @@ def cmd_init(ctx: Context, avid: AVID, import_db_path: str | None):
                 is_latest(db.connection, raise_on_difference=True)
                 Event.from_command(ctx, "initialized").log(INFO, log_stdout, version=db.version())
             else:
+                db.execute("pragma auto_vacuum = incremental")
+                enable_wal(db.connection)
                 db.init()
+                create_indices(db.connection)
                 db.log.insert(event_start)
                 db.commit()
 
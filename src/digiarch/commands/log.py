@@ -41,7 +41,7 @@ def cmd_log(ctx: Context, runs_only: bool, order: str, limit: int):
     if runs_only:
         query = [("operation", "%:start", "like"), ("operation", "%:end", "like")]
 
-    with open_database(ctx, get_avid(ctx)) as database:
+    with open_database(ctx, get_avid(ctx), query_only=True) as database:
         events: list[Event] = list(query_table(database.log, query, [("time", order)], limit))
 
     runs: int = reduce(
@@ -12,7 +12,6 @@ from acacore.models.file import MasterFile
 from acacore.models.file import OriginalFile
 from acacore.utils.click import ctx_params
 from acacore.utils.click import end_program
-from acacore.utils.click import start_program
 from acacore.utils.functions import find_files
 from acacore.utils.helpers import ExceptionManager
 from click import argument
@@ -28,7 +27,9 @@ from click import Path as ClickPath
 from digiarch.__version__ import __version__
 from digiarch.common import get_avid
 from digiarch.common import open_database
+from digiarch.common import option_db_profile
 from digiarch.common import option_dry_run
+from digiarch.common import start_program_profile
 
 
 def callback_uuid(ctx: Context, param: Parameter, value: str | None) -> UUID | None:
@@ -56,6 +57,7 @@ def grp_manual():
     required=True,
 )
 @option("--exclude", type=str, multiple=True, help="File and folder names to exclude.  [multiple]")
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_manual_extract(
@@ -63,6 +65,7 @@ def cmd_manual_extract(
     parent: UUID,
     files: tuple[str | Path, ...],
     exclude: tuple[str, ...],
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -89,8 +92,8 @@ def cmd_manual_extract(
     if any(f == avid.dirs.original_documents or not f.is_relative_to(avid.dirs.original_documents) for f in files):
         raise BadParameter("Files not in OriginalDocuments.", ctx, ctx_params(ctx)["files"])
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
 
         with ExceptionManager() as exception:
             parent_file = database.original_files[{"uuid": str(parent)}]
@@ -146,6 +149,7 @@ def cmd_manual_extract(
     nargs=-1,
     required=True,
 )
+@option_db_profile()
 @option_dry_run()
 @pass_context
 def cmd_manual_convert(
@@ -153,6 +157,7 @@ def cmd_manual_convert(
     original: UUID,
     target: Literal["master", "access", "statutory"],
     files: tuple[str | Path, ...],
+    db_profile: str,
     dry_run: bool,
 ):
     """
@@ -188,8 +193,8 @@ def cmd_manual_convert(
     if any(Path(f) == target_dir or not Path(f).is_relative_to(target_dir) for f in files):
         raise BadParameter(f"Files not in {target_dir.name}.", ctx, ctx_params(ctx)["files"])
 
-    with open_database(ctx, avid) as database:
-        log_file, log_stdout, _ = start_program(ctx, database, __version__, None, True, True, dry_run)
+    with open_database(ctx, avid, db_profile) as database:
+        log_file, log_stdout, _ = start_program_profile(ctx, database, __version__, db_profile, True, True, dry_run)
         parent_table: Table[BaseFile]
         target_table: Table[ConvertedFile]
         target_class: type[ConvertedFile]
@@ -52,7 +52,9 @@ def grp_search():
         "checksum",
         "puid",
         "relative_path",
+        "size",
         "action",
+        "action_data",
         "warning",
         "is_binary",
         "processed",
@@ -79,7 +81,9 @@ def grp_search():
             "checksum",
             "puid",
             "relative_path",
+            "size",
             "action",
+            "action_data",
             "warning",
             "is_binary",
             "processed",
@@ -98,7 +102,7 @@ def cmd_search_original(ctx: Context, query: TQuery, sort: str, order: str, limi
 
     For details on the QUERY argument, see the edit command.
     """  # noqa: D301
-    with open_database(ctx, get_avid(ctx)) as database:
+    with open_database(ctx, get_avid(ctx), query_only=True) as database:
         search_table(database.original_files, query, sort, order, limit, offset)
 
 
@@ -106,7 +110,7 @@ def cmd_search_original(ctx: Context, query: TQuery, sort: str, order: str, limi
 @argument_query(
     False,
     "uuid",
-    ["uuid", "checksum", "puid", "relative_path", "warning", "is_binary", "processed", "original_uuid"],
+    ["uuid", "checksum", "puid", "relative_path", "size", "warning", "is_binary", "processed", "original_uuid"],
 )
 @option(
     "--sort",
@@ -122,7 +126,17 @@ def cmd_search_original(ctx: Context, query: TQuery, sort: str, order: str, limi
 @docstring_format(
     fields="\n".join(
         f"* {f}"
-        for f in ["uuid", "checksum", "puid", "relative_path", "warning", "is_binary", "processed", "original_uuid"]
+        for f in [
+            "uuid",
+            "checksum",
+            "puid",
+            "relative_path",
+            "size",
+            "warning",
+            "is_binary",
+            "processed",
+            "original_uuid",
+        ]
     )
 )
 def cmd_search_master(ctx: Context, query: TQuery, sort: str, order: str, limit: int, offset: int):
@@ -135,12 +149,16 @@ def cmd_search_master(ctx: Context, query: TQuery, sort: str, order: str, limit:
 
     For details on the QUERY argument, see the edit command.
     """  # noqa: D301
-    with open_database(ctx, get_avid(ctx)) as database:
+    with open_database(ctx, get_avid(ctx), query_only=True) as database:
         search_table(database.master_files, query, sort, order, limit, offset)
 
 
 @grp_search.command("access", no_args_is_help=True, short_help="Search access files.")
-@argument_query(False, "uuid", ["uuid", "checksum", "puid", "relative_path", "warning", "is_binary", "original_uuid"])
+@argument_query(
+    False,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "warning", "is_binary", "original_uuid"],
+)
 @option(
     "--sort",
     type=Choice(["relative_path", "puid", "checksum"]),
@@ -154,7 +172,7 @@ def cmd_search_master(ctx: Context, query: TQuery, sort: str, order: str, limit:
 @pass_context
 @docstring_format(
     fields="\n".join(
-        f"* {f}" for f in ["uuid", "checksum", "puid", "relative_path", "warning", "is_binary", "original_uuid"]
+        f"* {f}" for f in ["uuid", "checksum", "puid", "relative_path", "size", "warning", "is_binary", "original_uuid"]
     )
 )
 def cmd_search_access(ctx: Context, query: TQuery, sort: str, order: str, limit: int, offset: int):
@@ -167,12 +185,16 @@ def cmd_search_access(ctx: Context, query: TQuery, sort: str, order: str, limit:
 
     For details on the QUERY argument, see the edit command.
     """  # noqa: D301
-    with open_database(ctx, get_avid(ctx)) as database:
+    with open_database(ctx, get_avid(ctx), query_only=True) as database:
         search_table(database.access_files, query, sort, order, limit, offset)
 
 
 @grp_search.command("statutory", no_args_is_help=True, short_help="Search statutory files.")
-@argument_query(False, "uuid", ["uuid", "checksum", "puid", "relative_path", "warning", "is_binary", "original_uuid"])
+@argument_query(
+    False,
+    "uuid",
+    ["uuid", "checksum", "puid", "relative_path", "size", "warning", "is_binary", "original_uuid"],
+)
 @option(
     "--sort",
     type=Choice(["relative_path", "puid", "checksum"]),
@@ -186,7 +208,7 @@ def cmd_search_access(ctx: Context, query: TQuery, sort: str, order: str, limit:
 @pass_context
 @docstring_format(
     fields="\n".join(
-        f"* {f}" for f in ["uuid", "checksum", "puid", "relative_path", "warning", "is_binary", "original_uuid"]
+        f"* {f}" for f in ["uuid", "checksum", "puid", "relative_path", "size", "warning", "is_binary", "original_uuid"]
     )
 )
 def cmd_search_statutory(ctx: Context, query: TQuery, sort: str, order: str, limit: int, offset: int):
@@ -199,5 +221,5 @@ def cmd_search_statutory(ctx: Context, query: TQuery, sort: str, order: str, lim
 
     For details on the QUERY argument, see the edit command.
     """  # noqa: D301
-    with open_database(ctx, get_avid(ctx)) as database:
+    with open_database(ctx, get_avid(ctx), query_only=True) as database:
         search_table(database.statutory_files, query, sort, order, limit, offset)
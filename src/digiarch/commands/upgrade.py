@@ -1,5 +1,4 @@
 from logging import INFO
-from shutil import copy2
 
 from acacore.database import FilesDB
 from acacore.database.upgrade import is_latest
@@ -17,6 +16,11 @@ from click import pass_context
 from digiarch.__version__ import __version__
 from digiarch.common import ctx_params
 from digiarch.common import get_avid
+from digiarch.common import snapshot_progress
+from digiarch.database import create_indices
+from digiarch.database import enable_wal
+from digiarch.database import snapshot_database
+from digiarch.database import SNAPSHOT_STEP_PAGES
 
 
 @command("upgrade", short_help="Upgrade the database.")
@@ -32,8 +36,13 @@ def cmd_upgrade(ctx: Context, backup: bool):
     """
     Upgrade the database.
 
+    Indices that are missing from the database are created, and the database is switched to WAL journal mode, even if
+    it is already at the latest version.
+
     When using --backup, a copy of the current database version will be created in the same folder with the name
-    "avid-{version}.db". The copy will not be created if the database is already at the latest version.
+    "avid-{version}.db". The copy will not be created if the database is already at the latest version. The copy is
+    made with the SQLite backup API like the "db snapshot" command, so it is consistent even if other commands are
+    using the database.
     """
     avid = get_avid(ctx)
     with FilesDB(avid.database_path, check_initialisation=True, check_version=False) as database:
@@ -50,7 +59,8 @@ def cmd_upgrade(ctx: Context, backup: bool):
                             ctx,
                             ctx_params(ctx)["backup"],
                         )
-                    copy2(database.path, backup_path)
+                    progress = snapshot_progress(ctx, log_stdout)
+                    snapshot_database(database.connection, backup_path, SNAPSHOT_STEP_PAGES, progress=progress)
                 current_version = database.metadata.get().version
                 event = Event.from_command(ctx, "update")
                 database.upgrade()
@@ -68,4 +78,22 @@ def cmd_upgrade(ctx: Context, backup: bool):
                     reason="Database is already at the latest version",
                 ).log(INFO, log_stdout)
 
+            if indices := create_indices(database.connection):
+                if not updated:
+                    database.log.insert(start_event)
+                event = Event.from_command(ctx, "index", data=indices)
+                database.log.insert(event)
+                event.log(INFO, log_stdout, show_args=False, created=len(indices))
+                updated = True
+
+            database.commit()
+
+            if journal_mode := enable_wal(database.connection):
+                if not updated:
+                    database.log.insert(start_event)
+                event = Event.from_command(ctx, "journal-mode", data=[journal_mode, "wal"])
+                database.log.insert(event)
+                event.log(INFO, log_stdout, show_args=False, old=journal_mode, new="wal")
+                updated = True
+
         end_program(ctx, database, exception, not updated, log_file, log_stdout)
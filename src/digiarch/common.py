@@ -1,9 +1,13 @@
 from collections.abc import Callable
+from errno import EXDEV
 from functools import reduce
 from hashlib import sha256
+from logging import INFO
+from logging import Logger
 from os import PathLike
 from pathlib import Path
 from re import match
+from shutil import copy2
 from sqlite3 import DatabaseError
 from tempfile import TemporaryDirectory
 from typing import TypeVar
@@ -19,8 +23,10 @@ from acacore.reference_files import get_actions
 from acacore.reference_files import get_custom_signatures
 from acacore.reference_files import get_master_actions
 from acacore.utils.click import ctx_params
+from acacore.utils.click import start_program
 from acacore.utils.functions import is_valid_suffix
 from click import BadParameter
+from click import Choice
 from click import Command
 from click import Context
 from click import Group
@@ -31,6 +37,20 @@ from pydantic import TypeAdapter
 _invalid_characters: str = '\\/%&${}[]<>*?":|' + bytes(range(32)).decode("ascii") + "\x7f"
 T = TypeVar("T")
 
+# Milliseconds to wait for other connections to release their locks on the database
+DB_BUSY_TIMEOUT: int = 60_000
+
+# SQLite pragmas set by each performance profile, the default profile keeps the defaults of SQLite
+DB_PROFILES: dict[str, dict[str, str | int]] = {
+    "default": {},
+    "bulk": {
+        "synchronous": "normal",
+        "cache_size": -256 * 1024,  # KiB
+        "mmap_size": 1024**3,
+        "temp_store": "memory",
+    },
+}
+
 
 # noinspection PyPep8Naming
 class AVIDIndices:
@@ -213,6 +233,18 @@ class TempDir(TemporaryDirectory):
         return Path(self.name)
 
 
+def move_file(src: Path, dst: Path) -> Path:
+    """Move a file, copying it and removing the source when the destination is on a different device."""
+    try:
+        return src.replace(dst)
+    except OSError as err:
+        if err.errno != EXDEV:
+            raise
+    copy2(src, dst)
+    src.unlink()
+    return dst
+
+
 _RH = Callable[[Context, AVID, FilesDB, Event, BaseFile | None], list[Event] | None]
 
 
@@ -256,12 +288,106 @@ def option_dry_run():
     return option("--dry-run", is_flag=True, default=False, help="Show changes without committing them.")
 
 
-def open_database(ctx: Context, avid: AVID) -> FilesDB:
+def option_db_profile():
+    return option(
+        "--db-profile",
+        type=Choice(list(DB_PROFILES)),
+        default="default",
+        envvar="DIGIARCH_DB_PROFILE",
+        show_envvar=True,
+        show_default=True,
+        help="The SQLite performance profile. Use bulk for long runs.",
+    )
+
+
+def apply_db_profile(database: FilesDB, profile: str) -> None:
+    for pragma, value in DB_PROFILES[profile].items():
+        database.execute(f"pragma {pragma} = {value}")
+
+
+def db_pragmas(database: FilesDB) -> dict[str, str | int]:
+    """Get the current values of the pragmas set by the performance profiles."""
+    return {pragma: database.execute(f"pragma {pragma}").fetchone()[0] for pragma in DB_PROFILES["bulk"]}
+
+
+def start_program_profile(
+    ctx: Context,
+    database: FilesDB,
+    version: str,
+    profile: str,
+    log_file: bool,
+    log_stdout: bool,
+    dry_run: bool,
+) -> tuple[Logger | None, Logger | None, Event]:
+    """
+    Start a command like ``start_program``, recording the performance profile in the start event.
+
+    :param ctx: The context of the command.
+    :param database: The database opened with the profile.
+    :param version: The version of the program.
+    :param profile: The name of the performance profile.
+    :param log_file: Whether to log to the log file of the AVID directory.
+    :param log_stdout: Whether to log to the standard output.
+    :param dry_run: Whether to skip saving the start event to the database.
+    :return: The file and standard output loggers, and the start event with the profile and the resulting pragma
+        values as its data.
+    """
+    file_logger, stdout_logger, event = start_program(ctx, database, version, None, log_file, log_stdout, True)
+    event.data = {"profile": profile, **db_pragmas(database)}
+    if not dry_run:
+        database.log.insert(event)
+        database.commit()
+    return file_logger, stdout_logger, event
+
+
+def open_database(ctx: Context, avid: AVID, profile: str = "default", query_only: bool = False) -> FilesDB:
+    """
+    Open the database of an AVID directory.
+
+    :param ctx: The context of the command.
+    :param avid: The AVID directory.
+    :param profile: The name of the performance profile to use.
+    :param query_only: Whether to refuse changes to the database. The file is still opened for writing, but in WAL
+        journal mode connections that only read neither block nor wait for the connections that write to it.
+    :raise UsageError: If the database cannot be opened or is not initialized and at the latest version.
+    :return: The opened ``FilesDB``.
+    """
     try:
-        return FilesDB(avid.database_path, check_initialisation=True, check_version=True)
+        database = FilesDB(avid.database_path, check_initialisation=True, check_version=True)
     except DatabaseError as e:
         raise UsageError(e.args[0], ctx)
 
+    database.execute(f"pragma busy_timeout = {DB_BUSY_TIMEOUT}")
+    apply_db_profile(database, profile)
+
+    if query_only:
+        database.execute("pragma query_only = on")
+
+    return database
+
+
+def snapshot_progress(ctx: Context, *loggers: Logger) -> Callable[[int, int], None]:
+    """
+    Create a progress function for ``snapshot_database`` that logs every 10% of copied pages.
+
+    :param ctx: The context of the command.
+    :param loggers: The loggers to log the progress with.
+    :return: The progress function.
+    """
+    last: int = 0
+
+    def progress(copied: int, total: int):
+        nonlocal last
+        percent: int = copied * 100 // total if total else 100
+        if percent < last:
+            # The copy restarted
+            last = 0
+        if percent >= last + 10 or copied == total:
+            last = percent
+            Event.from_command(ctx, "progress").log(INFO, *loggers, show_args=False, pages=f"{copied}/{total}")
+
+    return progress
+
 
 def trim_stem(name: str, length: int):
     name_path: Path = Path(name)
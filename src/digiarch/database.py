@@ -0,0 +1,298 @@
+from collections.abc import Callable
+from contextlib import closing
+from gzip import GzipFile
+from pathlib import Path
+from shutil import copyfileobj
+from sqlite3 import connect
+from sqlite3 import Connection
+from time import sleep
+from uuid import uuid4
+
+# Pages copied in each step of a database snapshot
+SNAPSHOT_STEP_PAGES: int = 1024
+# Seconds to wait between the steps of a snapshot, so other connections can write to the database
+SNAPSHOT_STEP_SLEEP: float = 0.05
+# Times a snapshot may restart because the database was changed by another connection before it fails
+SNAPSHOT_MAX_RESTARTS: int = 10
+
+FILES_TABLES: list[str] = ["files_original", "files_master", "files_access", "files_statutory"]
+
+# Tables that support a trigram index and the path columns that are indexed
+FTS_TABLES: dict[str, list[str]] = {
+    "files_original": ["relative_path", "original_path"],
+    "files_master": ["relative_path"],
+    "files_access": ["relative_path"],
+    "files_statutory": ["relative_path"],
+}
+
+# Paths inside action_data that are indexed, matching the <column>.<path> query fields
+ACTION_DATA_INDEXED_PATHS: list[str] = ["convert.tool", "convert.output", "extract.tool", "ignore.template"]
+
+# Indices on the files tables, as name, table, and indexed expressions
+# Filtered columns are followed by the sort order of paged queries, so their matches can be read without sorting
+INDICES: list[tuple[str, str, str]] = [
+    *((f"idx_{t}_relative_path_lower", t, "lower(relative_path), relative_path") for t in FILES_TABLES),
+    *((f"idx_{t}_checksum", t, "checksum") for t in FILES_TABLES),
+    *((f"idx_{t}_puid", t, "puid, lower(relative_path), relative_path") for t in FILES_TABLES),
+    ("idx_files_original_action", "files_original", "action"),
+    (
+        "idx_files_original_action_relative_path_lower",
+        "files_original",
+        "action, lower(relative_path), relative_path",
+    ),
+    ("idx_files_original_parent", "files_original", "parent"),
+    *((f"idx_{t}_warning", t, "warning") for t in FILES_TABLES),
+    *((f"idx_{t}_size", t, "size") for t in FILES_TABLES),
+    *(
+        (
+            f"idx_files_original_action_data_{p.replace('.', '_')}",
+            "files_original",
+            f"json_extract(action_data, '$.{p}')",
+        )
+        for p in ACTION_DATA_INDEXED_PATHS
+    ),
+    *((f"idx_{t}_original_uuid", t, "original_uuid") for t in FILES_TABLES if t != "files_original"),
+]
+
+
+def temp_table_name(prefix: str) -> str:
+    """
+    Generate a unique name for a temporary table.
+
+    :param prefix: The prefix of the name.
+    :return: The unqualified name of the table, to be created in the ``temp`` schema.
+    """
+    return f"_{prefix}_{uuid4().hex}"
+
+
+def create_indices(connection: Connection) -> list[str]:
+    """
+    Create the indices of the files tables that are missing from the database.
+
+    :param connection: The database connection.
+    :return: The names of the created indices.
+    """
+    existing: set[str] = {n for [n] in connection.execute("select name from sqlite_master where type = 'index'")}
+    created: list[str] = []
+
+    for name, table, expression in INDICES:
+        if name not in existing:
+            connection.execute(f"create index {name} on {table} ({expression})")
+            created.append(name)
+
+    return created
+
+
+def enable_wal(connection: Connection) -> str | None:
+    """
+    Switch the database to WAL journal mode, so readers and writers do not block each other.
+
+    Must be run outside a transaction.
+    :param connection: The database connection.
+    :return: The previous journal mode if it was changed, ``None`` if the database was already in WAL mode.
+    """
+    journal_mode: str = connection.execute("pragma journal_mode").fetchone()[0]
+    if journal_mode.lower() == "wal":
+        return None
+    connection.execute("pragma journal_mode = wal")
+    return journal_mode
+
+
+def fts_table_name(table: str) -> str:
+    return f"{table}_fts"
+
+
+def fts_columns(connection: Connection, table: str) -> list[str]:
+    """
+    Get the columns covered by the trigram index of a table.
+
+    :param connection: The database connection.
+    :param table: The name of the indexed table.
+    :return: The list of indexed columns, empty if the table has no trigram index.
+    """
+    return [c for [c] in connection.execute("select name from pragma_table_info(?)", [fts_table_name(table)])]
+
+
+def create_fts(connection: Connection, table: str) -> str:
+    """
+    Create a trigram index for the path columns of a table.
+
+    The index is an external content FTS5 table that stores only the index itself, and it is kept in sync with the
+    table by insert, update, and delete triggers. Existing rows are indexed when the index is created.
+    :param connection: The database connection.
+    :param table: The name of the table to index.
+    :return: The name of the FTS5 table.
+    """
+    fts: str = fts_table_name(table)
+    columns: list[str] = FTS_TABLES[table]
+    new_values: str = ", ".join(f"new.{c}" for c in columns)
+    old_values: str = ", ".join(f"old.{c}" for c in columns)
+
+    connection.execute(
+        f"create virtual table if not exists {fts} using fts5"
+        f"({', '.join(columns)}, content='{table}', content_rowid='rowid', tokenize='trigram')"
+    )
+    connection.execute(
+        f"create trigger if not exists {fts}_insert after insert on {table} begin"
+        f" insert into {fts} (rowid, {', '.join(columns)}) values (new.rowid, {new_values});"
+        " end"
+    )
+    connection.execute(
+        f"create trigger if not exists {fts}_delete after delete on {table} begin"
+        f" insert into {fts} ({fts}, rowid, {', '.join(columns)}) values ('delete', old.rowid, {old_values});"
+        " end"
+    )
+    connection.execute(
+        f"create trigger if not exists {fts}_update after update of {', '.join(columns)} on {table} begin"
+        f" insert into {fts} ({fts}, rowid, {', '.join(columns)}) values ('delete', old.rowid, {old_values});"
+        f" insert into {fts} (rowid, {', '.join(columns)}) values (new.rowid, {new_values});"
+        " end"
+    )
+    connection.execute(f"insert into {fts} ({fts}) values ('rebuild')")
+
+    return fts
+
+
+def drop_fts(connection: Connection, table: str) -> str:
+    """
+    Remove the trigram index of a table and its triggers.
+
+    :param connection: The database connection.
+    :param table: The name of the indexed table.
+    :return: The name of the removed FTS5 table.
+    """
+    fts: str = fts_table_name(table)
+
+    for trigger in ("insert", "delete", "update"):
+        connection.execute(f"drop trigger if exists {fts}_{trigger}")
+    connection.execute(f"drop table if exists {fts}")
+
+    return fts
+
+
+def rebuild_fts(connection: Connection) -> list[str]:
+    """
+    Rebuild all the trigram indices in the database.
+
+    Must be run after a ``VACUUM``, as it may change the rowids of the indexed tables.
+    :param connection: The database connection.
+    :return: The names of the rebuilt FTS5 tables.
+    """
+    rebuilt: list[str] = []
+
+    for table in FTS_TABLES:
+        if fts_columns(connection, table):
+            fts: str = fts_table_name(table)
+            connection.execute(f"insert into {fts} ({fts}) values ('rebuild')")
+            rebuilt.append(fts)
+
+    return rebuilt
+
+
+def database_tables(connection: Connection) -> list[str]:
+    """
+    List the ordinary tables of the database.
+
+    Virtual tables, the shadow tables of the trigram indices, and SQLite's internal tables (e.g., ``sqlite_stat1``) are
+    excluded.
+
+    :param connection: The database connection.
+    :return: The names of the tables, sorted by name.
+    """
+    return [
+        n
+        for [n] in connection.execute(
+            "select name from pragma_table_list where schema = 'main' and type = 'table' and name not like 'sqlite%' "
+            "order by name"
+        )
+    ]
+
+
+def integrity_check(connection: Connection, table: str) -> list[str]:
+    """
+    Check the integrity of a single table and its indices.
+
+    :param connection: The database connection.
+    :param table: The name of the table to check.
+    :return: The list of errors found, empty if the table is intact.
+    """
+    return [r for [r] in connection.execute(f'pragma integrity_check("{table}")') if r != "ok"]
+
+
+def incremental_vacuum(connection: Connection, pages: int) -> int:
+    """
+    Remove up to a number of free pages from a database that uses incremental auto-vacuum.
+
+    :param connection: The database connection.
+    :param pages: The maximum number of pages to remove.
+    :return: The number of pages removed.
+    """
+    free_before: int = connection.execute("pragma freelist_count").fetchone()[0]
+    # The pragma removes one page for each row it returns
+    connection.execute(f"pragma incremental_vacuum({pages})").fetchall()
+    return free_before - connection.execute("pragma freelist_count").fetchone()[0]
+
+
+class SnapshotRestartError(Exception):
+    """The database was changed by other connections too many times for a snapshot to complete."""
+
+
+def snapshot_database(
+    connection: Connection,
+    path: Path,
+    pages: int = -1,
+    compress: bool = False,
+    progress: Callable[[int, int], None] | None = None,
+    step_sleep: float = SNAPSHOT_STEP_SLEEP,
+    max_restarts: int = SNAPSHOT_MAX_RESTARTS,
+) -> Path:
+    """
+    Copy a consistent snapshot of the database with the SQLite online backup API.
+
+    The database is copied in steps of a number of pages, waiting between steps so other connections can keep reading
+    and writing. If another connection changes the database, SQLite restarts the copy from the first page; after too
+    many restarts the snapshot is abandoned. The snapshot is written to a temporary file next to the destination,
+    which is replaced only once the copy is complete.
+    :param connection: The connection of the database to copy.
+    :param path: The destination of the snapshot.
+    :param pages: The number of pages to copy in each step, or all pages at once if less than 1.
+    :param compress: Whether to compress the snapshot with gzip.
+    :param progress: A function called after each step with the number of copied pages and the total number of pages.
+    :param step_sleep: The number of seconds to wait between steps.
+    :param max_restarts: The number of times the copy may restart.
+    :raise SnapshotRestartError: If the copy restarts more than ``max_restarts`` times.
+    :return: The path of the snapshot.
+    """
+    tmp_path: Path = path.with_name(f".{path.name}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    copied: int = 0
+    restarts: int = 0
+
+    def step(_status: int, remaining: int, total: int) -> None:
+        nonlocal copied, restarts
+        if copied and total - remaining <= copied:
+            restarts += 1
+            if restarts > max_restarts:
+                raise SnapshotRestartError(
+                    f"The database was changed during the snapshot, which restarted more than {max_restarts} times"
+                )
+        copied = total - remaining
+        if progress:
+            progress(copied, total)
+        if remaining and step_sleep > 0:
+            sleep(step_sleep)
+
+    try:
+        with closing(connect(tmp_path)) as target:
+            connection.backup(target, pages=pages, progress=step)
+
+        if compress:
+            with tmp_path.open("rb") as fi, GzipFile(path, "wb") as fo:
+                copyfileobj(fi, fo)
+            tmp_path.unlink()
+        else:
+            tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    return path
@@ -1,10 +1,16 @@
 from collections.abc import Callable
 from collections.abc import Generator
+from json import dumps
 from re import compile as re_compile
+from re import IGNORECASE
+from re import split as re_split
+from sqlite3 import Connection
 from typing import Any
+from typing import Generic
 from typing import TypeVar
 
 from acacore.database.table import Table
+from acacore.models.file import BaseFile
 from click import argument
 from click import BadParameter
 from click import ClickException
@@ -13,51 +19,192 @@ from click import MissingParameter
 from click import Parameter
 from pydantic import BaseModel
 
+from digiarch.database import fts_columns
+from digiarch.database import fts_table_name
+from digiarch.database import temp_table_name
+
 M = TypeVar("M", bound=BaseModel)
+F = TypeVar("F", bound=BaseFile)
 FC = TypeVar("FC", bound=Callable[..., Any])
-TQuery = list[tuple[str, str | bool | type[Ellipsis] | list[str] | None, str]]  # field name, value(s), operation
+# field name, value(s), operation
+TQuery = list[tuple[str, str | int | bool | type[Ellipsis] | list[str] | list[int] | None, str]]
+
+# Sort order of paged queries, relative_path breaks ties between paths that only differ in case
+QUERY_PATH_ORDER: list[tuple[str, str]] = [("lower(relative_path)", "asc"), ("relative_path", "asc")]
+
+# Lists of values longer than this are stored in a temporary table instead of being bound as parameters
+QUERY_VALUES_TABLE_THRESHOLD: int = 500
+
+# Trigram indices can only match substrings of at least three characters
+FTS_MIN_LENGTH: int = 3
+
+# Fields whose values are integers that can be compared with >, >=, <, <=, and start..end ranges
+QUERY_NUMERIC_FIELDS: list[str] = ["size"]
+# Multipliers of the unit suffixes of numeric values
+QUERY_NUMERIC_UNITS: dict[str, int] = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+# Columns containing JSON objects whose values can be queried with <column>.<path> fields
+QUERY_JSON_FIELDS: list[str] = ["action_data"]
 
 token_quotes = re_compile(r'(?<!\\)"((?:[^"]|(?<=\\)")*)"')
 # noinspection RegExpUnnecessaryNonCapturingGroup
 token_expr = re_compile(r"(?:\x00([^\x00]+)\x00|(?<!\\)\s+)")
+token_json_path = re_compile(r"[a-z_][a-z0-9_]*(\.[a-z_][a-z0-9_]*)*")
+token_number = re_compile(r"(\d+)([kmgt]?)(?:i?b)?", IGNORECASE)
+
+
+def query_values_table(connection: Connection, values: list[str]) -> str:
+    """
+    Store a list of query values in an indexed temporary table.
+
+    The table is created and filled by a single statement, so a rollback removes it entirely instead of leaving it
+    empty. Each call creates a new table, which should be dropped with ``drop_query_values_tables`` when the query is
+    done.
+    :param connection: The database connection.
+    :param values: The values to store.
+    :return: The name of the temporary table, qualified with the ``temp`` schema.
+    """
+    name: str = temp_table_name("query_values")
+    connection.execute(f"create temporary table {name} as select distinct value from json_each(?)", [dumps(values)])
+    connection.execute(f"create unique index temp.{name}_value on {name} (value)")
+    return f"temp.{name}"
+
+
+def drop_query_values_tables(connection: Connection, tables: list[str]) -> None:
+    """
+    Drop the temporary tables created by ``query_values_table``.
+
+    :param connection: The database connection the tables were created with.
+    :param tables: The qualified names of the tables.
+    """
+    for name in tables:
+        connection.execute(f"drop table if exists {name}")
+    tables.clear()
 
 
-def query_to_where(query: TQuery) -> tuple[str, list[str]]:
+def query_fts_pattern(value: str, op: str) -> str | None:
+    """
+    Get the LIKE pattern to search a trigram index with for a substring match.
+
+    :param value: The value of the query token.
+    :param op: The operation of the query token.
+    :return: The LIKE pattern, or ``None`` if the match cannot use the index.
+    """
+    if op == "like" and value.startswith("%"):
+        if max(map(len, re_split(r"[%_]", value))) >= FTS_MIN_LENGTH:
+            return value
+    elif op == "in" and len(value) >= FTS_MIN_LENGTH and "%" not in value and "_" not in value:
+        return f"%{value}%"
+    return None
+
+
+def query_field_allowed(field: str, allowed_fields: list[str]) -> bool:
+    column, _, path = field.partition(".")
+    if not path:
+        return field in allowed_fields
+    return column in allowed_fields and column in QUERY_JSON_FIELDS and bool(token_json_path.fullmatch(path))
+
+
+def query_field_column(field: str) -> str:
+    """Get the column expression of a query field, extracting the value of ``<column>.<path>`` fields from JSON."""
+    column, _, path = field.partition(".")
+    return f"json_extract({column}, '$.{path}')" if path else column
+
+
+def query_to_where(
+    query: TQuery,
+    connection: Connection | None = None,
+    table: str | None = None,
+    values_tables: list[str] | None = None,
+) -> tuple[str, list[str]]:
+    """
+    Convert a tokenized query to a WHERE clause and its parameters.
+
+    Lists of values longer than ``QUERY_VALUES_TABLE_THRESHOLD`` are stored in a temporary table when a connection is
+    given and writable and the ``values_tables`` list is given to collect the names of the tables, or passed as a
+    single JSON array otherwise, so they do not exceed the maximum number of parameters.
+
+    Values of ``has`` operations are matched against the members of a JSON array column. When the table is given, the
+    distinct values of the column are expanded first, so the matching rows can be found with the column's index.
+
+    When the table has a trigram index, LIKE patterns starting with a wildcard and substring matches on the indexed
+    columns first select the candidate rows from the index, then apply the original condition to them.
+    :param query: The tokenized query.
+    :param connection: The database connection to create temporary tables with, if any.
+    :param table: The name of the queried table, if any.
+    :param values_tables: A list to add the names of the temporary tables created for the query to, if any.
+    :return: The WHERE clause and the list of parameters.
+    """
     query_fields: dict[str, list[tuple[str, bool]]] = {}
     where: list[str] = []
     parameters: list[str] = []
+    fts: list[str] = fts_columns(connection, table) if connection and table else []
+    # Temporary tables cannot be created by query-only connections
+    temp_tables: bool = (
+        values_tables is not None
+        and connection is not None
+        and not connection.execute("pragma query_only").fetchone()[0]
+    )
 
     for field, value, like in query:
         query_fields[field] = [*query_fields.get(field, []), (value, like)]
 
     for field, values in query_fields.items():
         where_field: list[str] = []
+        column: str = query_field_column(field)
 
         for value, op in values:
             match (value, op):
                 case None, "is":
-                    where_field.append(f"{field} is null")
+                    where_field.append(f"{column} is null")
                 case None, "is not":
-                    where_field.append(f"{field} is not null")
+                    where_field.append(f"{column} is not null")
                 case True, "is":
-                    where_field.append(f"{field} is true")
+                    where_field.append(f"{column} is true")
                 case True, "is not":
-                    where_field.append(f"{field} is false")
+                    where_field.append(f"{column} is false")
                 case False, "is":
-                    where_field.append(f"{field} is false")
+                    where_field.append(f"{column} is false")
                 case False, "is not":
-                    where_field.append(f"{field} is true")
+                    where_field.append(f"{column} is true")
+                case _, "in" if isinstance(value, list) and len(value) > QUERY_VALUES_TABLE_THRESHOLD and temp_tables:
+                    values_tables.append(query_values_table(connection, value))
+                    where_field.append(f"{column} in {values_tables[-1]}")
+                case _, "in" if isinstance(value, list) and len(value) > QUERY_VALUES_TABLE_THRESHOLD:
+                    where_field.append(f"{column} in (select value from json_each(?))")
+                    parameters.append(dumps(value))
                 case _, "in" if isinstance(value, list):
-                    where_field.append(f"{field} in ({','.join(['?'] * len(value))})")
+                    where_field.append(f"{column} in ({','.join(['?'] * len(value))})")
                     parameters.extend(value)
+                case _, "in" | "like" if field in fts and isinstance(value, str) and query_fts_pattern(value, op):
+                    condition: str = f"{column} like ?" if op == "like" else f"instr({column}, ?) != 0"
+                    where_field.append(
+                        f"(rowid in (select rowid from {fts_table_name(table)} where {column} like ?) and {condition})"
+                    )
+                    parameters.extend([query_fts_pattern(value, op), value])
                 case _, "in" if isinstance(value, str):
-                    where_field.append(f"instr({field}, ?) != 0")
+                    where_field.append(f"instr({column}, ?) != 0")
+                    parameters.append(value)
+                case _, "has" if table:
+                    where_field.append(
+                        f"{column} in (select w.v from (select distinct {column} as v from {table}"
+                        f" where {column} is not null) w, json_each(w.v) j where j.value = ?)"
+                    )
+                    parameters.append(value)
+                case _, "has":
+                    where_field.append(f"exists (select 1 from json_each({column}) where value = ?)")
+                    parameters.append(value)
+                case [start, end], "between":
+                    where_field.append(f"{column} between ? and ?")
+                    parameters.extend([start, end])
+                case _, ">" | ">=" | "<" | "<=":
+                    where_field.append(f"{column} {op} ?")
                     parameters.append(value)
                 case _, "=":
-                    where_field.append(f"{field} = ?")
+                    where_field.append(f"{column} = ?")
                     parameters.append(value)
                 case _, "like":
-                    where_field.append(f"{field} like ?")
+                    where_field.append(f"{column} like ?")
                     parameters.append(value)
 
         where.append(f"({' or '.join(where_field)})")
@@ -65,11 +212,43 @@ def query_to_where(query: TQuery) -> tuple[str, list[str]]:
     return " and ".join(where), parameters
 
 
+def tokenize_number(token: str) -> int:
+    if not (match := token_number.fullmatch(token.strip())):
+        raise ValueError(f"Invalid number {token}")
+    return int(match.group(1)) * QUERY_NUMERIC_UNITS[match.group(2).lower()]
+
+
+def tokenize_range(token: str) -> tuple[int | list[int], str]:
+    """
+    Parse a numeric query value into a value and an operation.
+
+    Values can be prefixed with a comparison operator (>, >=, <, <=) or given as an inclusive range in the format
+    ``start..end``, where either end can be omitted. Numbers can have a K, M, G, or T suffix for multiples of 1024.
+    :param token: The query value.
+    :return: A tuple containing the number, or the start and end of the range, and the operation.
+    :raise ValueError: If the value is not a valid number or range.
+    """
+    for op in (">=", "<=", ">", "<"):
+        if token.startswith(op):
+            return tokenize_number(token.removeprefix(op)), op
+
+    if ".." in token:
+        start, _, end = token.partition("..")
+        if start and end:
+            return [tokenize_number(start), tokenize_number(end)], "between"
+        if start:
+            return tokenize_number(start), ">="
+        return tokenize_number(end), "<="
+
+    return tokenize_number(token), "="
+
+
 def tokenize_query(query_string: str, default_field: str, allowed_fields: list[str]) -> TQuery:
     query_string = token_quotes.sub(r"\0\1\0", query_string)
     tokens: list[str] = [t for t in token_expr.split(query_string) if t]
     field: str = default_field
     like: bool = False
+    has: bool = False
     from_file: bool = False
 
     query_tokens: TQuery = []
@@ -84,19 +263,24 @@ def tokenize_query(query_string: str, default_field: str, allowed_fields: list[s
         elif token == "@false":
             query_tokens.append((field, True, "is not"))
         elif token == "@like":
-            like = True
+            like, has = True, False
+        elif token == "@has":
+            like, has = False, True
         elif token == "@file":
             from_file = True
         elif token.startswith("@"):
-            if (field := token.removeprefix("@")) not in allowed_fields:
+            if not query_field_allowed(field := token.removeprefix("@"), allowed_fields):
                 raise ValueError(f"Invalid field name {field}")
             like = False
+            has = False
             from_file = False
         elif from_file:
             with open(token) as fh:
                 query_tokens.append((field, [line for l in fh.readlines() if (line := l.rstrip("\r\n"))], "in"))
+        elif field in QUERY_NUMERIC_FIELDS and not like and not has:
+            query_tokens.append((field, *tokenize_range(token)))
         else:
-            query_tokens.append((field, token, "like" if like else "="))
+            query_tokens.append((field, token, "has" if has else "like" if like else "="))
 
     return query_tokens
 
@@ -132,5 +316,73 @@ def query_table(
     limit: int | None = None,
     offset: int | None = None,
 ) -> Generator[M, None, None]:
-    where, parameters = query_to_where(query)
-    yield from table.select(where, parameters, order_by, limit, offset)
+    values_tables: list[str] = []
+    where, parameters = query_to_where(query, table.database.connection, table.name, values_tables)
+    try:
+        yield from table.select(where, parameters, order_by, limit, offset)
+    finally:
+        drop_query_values_tables(table.database.connection, values_tables)
+
+
+class CompiledQuery(Generic[F]):
+    """
+    A query converted to SQL once and reused to fetch its results one page at a time, sorted by relative path.
+
+    Each page starts after the path of the last file of the previous page instead of using an offset. The SQL text is
+    the same for every page, so its prepared statement is reused from the statement cache of the connection, and
+    files that are changed or removed between pages do not shift the results.
+
+    Long lists of values are stored in temporary tables that are dropped when the query is closed, either explicitly,
+    at the end of a ``with`` block, or when ``pages`` is exhausted.
+    """
+
+    def __init__(self, table: Table[F], query: TQuery) -> None:
+        self.table: Table[F] = table
+        self.values_tables: list[str] = []
+        self.where, self.parameters = query_to_where(query, table.database.connection, table.name, self.values_tables)
+        # The first condition is redundant, but lets SQLite use it as a range on the lower(relative_path) indices
+        self.where_after: str = (
+            "lower(relative_path) >= lower(?) and (lower(relative_path), relative_path) > (lower(?), ?)"
+        )
+        if self.where:
+            self.where_after = f"({self.where}) and {self.where_after}"
+
+    def page(self, limit: int, after: F | None = None) -> list[F]:
+        """
+        Fetch a page of results.
+
+        :param limit: The maximum number of files in the page.
+        :param after: The last file of the previous page, if any.
+        :return: The list of files in the page.
+        """
+        if after is None:
+            return self.table.select(self.where, self.parameters, QUERY_PATH_ORDER, limit).fetchall()
+        parameters: list = [*self.parameters, *[str(after.relative_path)] * 3]
+        return self.table.select(self.where_after, parameters, QUERY_PATH_ORDER, limit).fetchall()
+
+    def pages(self, limit: int) -> Generator[list[F], None, None]:
+        """
+        Fetch all the results one page at a time.
+
+        The next page is fetched when the previous one has been consumed, so files can be changed in the meantime.
+        :param limit: The maximum number of files in each page.
+        :return: A generator of pages.
+        """
+        after: F | None = None
+
+        try:
+            while page := self.page(limit, after):
+                yield page
+                after = page[-1]
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Drop the temporary tables of the query."""
+        drop_query_values_tables(self.table.database.connection, self.values_tables)
+
+    def __enter__(self) -> "CompiledQuery[F]":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
@@ -0,0 +1,97 @@
+"""
+Compare offset and keyset paging of files queries on a large synthetic database.
+
+Run with ``python -m tests.benchmark_query [--rows ROWS] [--batch-size BATCH_SIZE]``.
+"""
+
+from argparse import ArgumentParser
+from collections.abc import Callable
+from json import dumps
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from uuid import uuid4
+
+from acacore.database import FilesDB
+
+from digiarch.database import create_indices
+from digiarch.query import CompiledQuery
+from digiarch.query import query_table
+from digiarch.query import TQuery
+
+
+def populate(database: FilesDB, rows: int) -> None:
+    actions: list[str] = ["convert", "extract", "ignore", "manual"]
+    extensions: list[str] = ["pdf", "DOCX", "txt"]
+    database.connection.executemany(
+        f"insert into {database.original_files.name}"
+        " (uuid, checksum, relative_path, is_binary, size, puid, signature, warning, action, action_data, parent,"
+        " processed, lock, original_path)"
+        " values (?, ?, ?, 1, ?, ?, null, null, ?, ?, null, 0, 0, ?)",
+        (
+            (
+                str(uuid4()),
+                f"{n:064x}",
+                path := f"OriginalDocuments/docCollection{n // 10_000}/{n % 1000}/File{n}.{extensions[n % 3]}",
+                n * 37 % 10_000_000,
+                f"fmt/{n % 500}",
+                actions[n % len(actions)],
+                dumps({actions[n % len(actions)]: {}}),
+                path,
+            )
+            for n in range(rows)
+        ),
+    )
+    create_indices(database.connection)
+    database.execute("analyze")
+    database.commit()
+
+
+def paged_offset(database: FilesDB, query: TQuery, batch_size: int) -> int:
+    offset: int = 0
+    order_by: list[tuple[str, str]] = [("lower(relative_path)", "asc")]
+    while files := list(query_table(database.original_files, query, order_by, batch_size, offset)):
+        offset += len(files)
+    return offset
+
+
+def paged_keyset(database: FilesDB, query: TQuery, batch_size: int) -> int:
+    return sum(len(files) for files in CompiledQuery(database.original_files, query).pages(batch_size))
+
+
+def benchmark(name: str, function: Callable[[], int]) -> None:
+    start: float = perf_counter()
+    count: int = function()
+    print(f"  {name:<8} {count:>10,} files {perf_counter() - start:>10.3f}s")
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    queries: dict[str, TQuery] = {
+        "all": [],
+        "action": [("action", "convert", "=")],
+        "puid": [("puid", "fmt/18", "=")],
+        "size": [("size", 5_000_000, ">=")],
+    }
+
+    with (
+        TemporaryDirectory() as tmp_dir,
+        FilesDB(Path(tmp_dir, "avid.db"), check_initialisation=False, check_version=False) as database,
+    ):
+        database.init()
+        start: float = perf_counter()
+        populate(database, args.rows)
+        print(f"populated {args.rows:,} files in {perf_counter() - start:.3f}s")
+
+        for name, query in queries.items():
+            print(f"{name}:")
+            benchmark("offset", lambda q=query: paged_offset(database, q, args.batch_size))
+            benchmark("keyset", lambda q=query: paged_keyset(database, q, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
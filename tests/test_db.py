@@ -0,0 +1,189 @@
+from gzip import GzipFile
+from pathlib import Path
+from shutil import copyfileobj
+from sqlite3 import connect
+
+import pytest
+from acacore.database import FilesDB
+
+from digiarch.cli import app
+from digiarch.common import AVID
+from digiarch.database import database_tables
+from digiarch.database import fts_columns
+from digiarch.database import fts_table_name
+from digiarch.database import INDICES
+from digiarch.database import snapshot_database
+from digiarch.database import SnapshotRestartError
+from digiarch.query import query_table
+from digiarch.query import query_to_where
+from tests.conftest import run_click
+
+
+def test_db_fts(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        base_file = database.original_files.select(order_by=[("random()", "asc")], limit=1).fetchone()
+        assert base_file is not None
+        substring: str = base_file.relative_path.name[-5:]
+        query = [("relative_path", f"%{substring}", "like"), ("relative_path", substring, "in")]
+        query_suffix = [("relative_path", "%.pdf", "like")]
+        files_scan = {f.uuid for f in query_table(database.original_files, query)}
+        assert base_file.uuid in files_scan
+
+    run_click(avid.path, app, "db", "fts")
+
+    with FilesDB(avid.database_path) as database:
+        assert fts_columns(database.connection, database.original_files.name) == ["relative_path", "original_path"]
+        assert fts_columns(database.connection, database.master_files.name) == ["relative_path"]
+
+        where, _ = query_to_where(query_suffix, database.connection, database.original_files.name)
+        assert "files_original_fts" in where
+        assert {f.uuid for f in query_table(database.original_files, query)} == files_scan
+
+        base_file.relative_path = base_file.relative_path.with_name("trigram-test.txt")
+        database.original_files.update(base_file)
+        database.commit()
+        files_fts = list(query_table(database.original_files, [("relative_path", "%trigram-test%", "like")]))
+        assert [f.uuid for f in files_fts] == [base_file.uuid]
+
+    run_click(avid.path, app, "db", "fts", "--drop")
+
+    with FilesDB(avid.database_path) as database:
+        assert not fts_columns(database.connection, database.original_files.name)
+        where, _ = query_to_where(query_suffix, database.connection, database.original_files.name)
+        assert "files_original_fts" not in where
+
+
+def query_plan(database: FilesDB, sql: str, *parameters: str | int) -> str:
+    return "\n".join(row[-1] for row in database.execute(f"explain query plan {sql}", parameters).fetchall())
+
+
+def test_db_indices(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        indices: set[str] = {n for [n] in database.execute("select name from sqlite_master where type = 'index'")}
+        assert {name for name, _, _ in INDICES} <= indices
+
+        for table in (database.original_files, database.master_files, database.access_files, database.statutory_files):
+            plan = query_plan(database, f"select * from {table.name} order by lower(relative_path) asc limit 100")
+            assert f"USING INDEX idx_{table.name}_relative_path_lower" in plan
+            assert "TEMP B-TREE" not in plan
+
+            plan = query_plan(
+                database,
+                f"select * from {table.name} where puid = ? order by lower(relative_path) asc limit 100",
+                "fmt/18",
+            )
+            assert f"USING INDEX idx_{table.name}_puid" in plan
+            assert "TEMP B-TREE" not in plan
+
+            plan = query_plan(database, f"select * from {table.name} where checksum = ?", "0" * 64)
+            assert f"USING INDEX idx_{table.name}_checksum" in plan
+
+            if table.name != database.original_files.name:
+                plan = query_plan(database, f"select * from {table.name} where original_uuid = ?", "uuid")
+                assert f"USING INDEX idx_{table.name}_original_uuid" in plan
+
+        plan = query_plan(
+            database,
+            "select * from files_original where action = ? order by lower(relative_path) asc limit 1",
+            "extract",
+        )
+        assert "USING INDEX idx_files_original_action_relative_path_lower" in plan
+        assert "TEMP B-TREE" not in plan
+
+        plan = query_plan(database, "select * from files_original where parent = ?", "uuid")
+        assert "USING INDEX idx_files_original_parent" in plan
+
+        where, parameters = query_to_where([("action_data.convert.tool", "libreoffice", "=")])
+        plan = query_plan(database, f"select * from files_original where {where}", *parameters)
+        assert "USING INDEX idx_files_original_action_data_convert_tool" in plan
+
+        where, parameters = query_to_where([("size", 1024**3, ">")])
+        plan = query_plan(database, f"select * from files_original where {where}", *parameters)
+        assert "USING INDEX idx_files_original_size" in plan
+
+        where, parameters = query_to_where([("warning", "extension mismatch", "has")], table="files_original")
+        plan = query_plan(database, f"select * from files_original where {where}", *parameters)
+        assert "USING INDEX idx_files_original_warning" in plan
+
+
+def test_db_maintain(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    run_click(avid.path, app, "db", "maintain", "--full")
+
+    with FilesDB(avid.database_path) as database:
+        assert database.execute("pragma auto_vacuum").fetchone()[0] == 2
+        assert database.execute("select 1 from sqlite_master where name = 'sqlite_stat1'").fetchone()
+        tables: list[str] = database_tables(database.connection)
+        assert "files_original" in tables
+        assert not [t for t in tables if t.startswith(("sqlite", fts_table_name("files_original")))]
+        database.execute(
+            "create table filler as with recursive n(i) as (select 1 union all select i + 1 from n where i < 100)"
+            " select randomblob(4096) as data from n"
+        )
+        database.execute("drop table filler")
+        database.commit()
+        free: int = database.execute("pragma freelist_count").fetchone()[0]
+        assert free >= 100
+
+    run_click(avid.path, app, "db", "maintain", "--no-check", "--vacuum-step", 10, "--vacuum-limit", 50)
+
+    with FilesDB(avid.database_path) as database:
+        assert database.execute("pragma freelist_count").fetchone()[0] == free - 50
+
+    run_click(avid.path, app, "db", "maintain")
+
+    with FilesDB(avid.database_path) as database:
+        assert database.execute("pragma freelist_count").fetchone()[0] == 0
+
+
+def test_db_snapshot(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+    snapshot_path: Path = avid.metadata_dir / "snapshot.db"
+    snapshot_gzip_path: Path = avid.metadata_dir / "snapshot.db.gz"
+    snapshot_unzipped_path: Path = avid.metadata_dir / "snapshot-unzipped.db"
+
+    with FilesDB(avid.database_path) as database:
+        files: list[str] = [str(f.uuid) for f in database.original_files.select(order_by=[("uuid", "asc")])]
+
+    writer = connect(avid.database_path, isolation_level=None)
+    try:
+        writer.execute("begin immediate")
+        writer.execute("update files_original set lock = lock")
+        run_click(avid.path, app, "db", "snapshot", snapshot_path, "--pages", 1)
+        run_click(avid.path, app, "db", "snapshot", snapshot_gzip_path, "--compress")
+        writer.execute("commit")
+    finally:
+        writer.close()
+
+    with GzipFile(snapshot_gzip_path, "rb") as fi, snapshot_unzipped_path.open("wb") as fo:
+        copyfileobj(fi, fo)
+
+    for path in (snapshot_path, snapshot_unzipped_path):
+        with FilesDB(path) as database:
+            assert database.execute("pragma integrity_check").fetchone()[0] == "ok"
+            assert [str(f.uuid) for f in database.original_files.select(order_by=[("uuid", "asc")])] == files
+
+
+def test_db_snapshot_restarts(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+    snapshot_path: Path = avid.metadata_dir / "snapshot.db"
+    reader = connect(avid.database_path)
+    writer = connect(avid.database_path, isolation_level=None)
+
+    def write(_copied: int, _total: int):
+        writer.execute("update files_original set lock = not lock")
+
+    try:
+        with pytest.raises(SnapshotRestartError):
+            snapshot_database(reader, snapshot_path, 1, progress=write, step_sleep=0, max_restarts=2)
+    finally:
+        reader.close()
+        writer.close()
+
+    assert not snapshot_path.exists()
+    assert not snapshot_path.with_name(f".{snapshot_path.name}.tmp").exists()
@@ -1,4 +1,5 @@
 from pathlib import Path
+from uuid import uuid4
 
 from acacore.database import FilesDB
 from acacore.models.event import Event
@@ -320,6 +321,27 @@ def test_edit_original_lock(avid_folder_copy: Path):
         assert event.data == [base_file.lock, test_file.lock]
 
 
+def test_edit_original_lock_db_profile(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        base_file = database.original_files.select(order_by=[("random()", "asc")], limit=1).fetchone()
+        assert base_file is not None
+
+    run_click(avid.path, app, "edit", "original", "lock", f"@uuid {base_file.uuid}", "lock", "--db-profile", "bulk")
+
+    with FilesDB(avid.database_path) as database:
+        event = database.log.select(
+            "operation = ?",
+            [f"{app.name}.edit.original.lock:start"],
+            [("time", "desc")],
+            1,
+        ).fetchone()
+        assert event is not None
+        assert event.data["profile"] == "bulk"
+        assert event.data["temp_store"] == 2
+
+
 # noinspection DuplicatedCode
 def test_edit_original_lock_file_query(avid_folder_copy: Path):
     avid = AVID(avid_folder_copy)
@@ -348,6 +370,27 @@ def test_edit_original_lock_file_query(avid_folder_copy: Path):
             assert event.data == [base_file.lock, test_file.lock]
 
 
+# noinspection DuplicatedCode
+def test_edit_original_lock_file_query_large(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+    reason: str = "lock file"
+
+    with FilesDB(avid.database_path) as database:
+        base_files = database.original_files.select(order_by=[("random()", "asc")], limit=2).fetchmany(2)
+        assert base_files
+
+    uuids: list[str] = [str(uuid4()) for _ in range(100_000)] + [str(f.uuid) for f in base_files]
+    avid.path.joinpath("uuids.txt").write_text("\n".join(uuids))
+
+    run_click(avid.path, app, "edit", "original", "lock", "@uuid @file uuids.txt", reason, "--lock")
+
+    with FilesDB(avid.database_path) as database:
+        for base_file in base_files:
+            test_file = database.original_files[{"uuid": str(base_file.uuid)}]
+            assert test_file is not None
+            assert test_file.lock
+
+
 # noinspection DuplicatedCode
 def test_edit_original_processed(avid_folder_copy: Path):
     avid = AVID(avid_folder_copy)
@@ -1,13 +1,88 @@
+from errno import EXDEV
+from gzip import compress as gzip_compress
+from io import BytesIO
+from lzma import compress as lzma_compress
+from os import strerror
+from os import urandom
 from pathlib import Path
+from plistlib import dumps as dumps_plist
+from plistlib import FMT_BINARY
+from plistlib import loads as loads_plist
+from shutil import copy2
+from struct import pack
+from tarfile import LNKTYPE
+from tarfile import open as open_tar
+from tarfile import TarInfo
+from uuid import uuid4
+from zipfile import ZipFile
 
+import pytest
 from acacore.database import FilesDB
 from acacore.models.file import OriginalFile
+from acacore.models.reference_files import ExtractAction
+from extract_msg import openMsg
+from tnefparse import TNEF
 
 from digiarch.cli import app
+from digiarch.commands.extract.extractors.extractor_msg import body_contains
+from digiarch.commands.extract.extractors.extractor_msg import declared_encoding
+from digiarch.commands.extract.extractors.extractor_msg import decode_body
+from digiarch.commands.extract.extractors.extractor_tar import TarExtractor
+from digiarch.commands.extract.extractors.extractor_webarchive import DataSlice
+from digiarch.commands.extract.extractors.extractor_webarchive import load_webarchive
+from digiarch.commands.extract.extractors.registry import BUILTIN_EXTRACTORS
+from digiarch.commands.extract.extractors.registry import extractor_registry
+from digiarch.commands.extract.extractors.registry import load_extractor
 from digiarch.common import AVID
 from tests.conftest import run_click
 
 
+def test_extractor_registry():
+    registry: dict[str, str] = extractor_registry()
+    for target, tools in BUILTIN_EXTRACTORS:
+        assert load_extractor(target).tool_names is tools
+        for tool in tools:
+            assert tool in load_extractor(registry[tool]).tool_names
+
+
+def test_webarchive_parser():
+    resources: list[dict] = [
+        {"WebResourceURL": f"https://example.com/{size}.bin", "WebResourceData": bytes(n % 256 for n in range(size))}
+        for size in (0, 1, 15, 16, 300, 70000)
+    ]
+    archive: dict = {
+        "WebMainResource": {"WebResourceURL": "https://example.com/", "WebResourceData": b"<html></html>"},
+        "WebSubresources": [*resources, {**resources[-1], "WebResourceURL": "https://example.com/copy.bin"}],
+    }
+    buffer: bytes = dumps_plist(archive, fmt=FMT_BINARY)
+
+    def resolve(obj: object) -> object:
+        if isinstance(obj, DataSlice):
+            return buffer[obj.start : obj.end]
+        if isinstance(obj, dict):
+            return {k: resolve(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [resolve(v) for v in obj]
+        return obj
+
+    assert resolve(load_webarchive(buffer)) == loads_plist(buffer)
+
+
+def test_msg_body_encoding():
+    html: bytes = b'<html><head><meta http-equiv="Content-Type" content="text/html; charset=windows-1252"></head>'
+    assert declared_encoding(html) == "cp1252"
+    assert declared_encoding(b"{\\rtf1\\ansi\\ansicpg1251\\deff0{\\fonttbl{\\f0 Arial;}}}") == "cp1251"
+
+    undeclared: bytes = '<p>Æblegrød med flødeskum</p><img src="cid:image001.png@01D0">'.encode("cp1252")
+    assert declared_encoding(undeclared) is None
+    assert decode_body(undeclared) == undeclared
+    assert body_contains(decode_body(undeclared), "image001.png@01D0")
+
+    utf16: bytes = '<p>Æblegrød med flødeskum</p><img src="cid:image001.png@01D0">'.encode("utf-16")
+    assert isinstance(decode_body(utf16), str)
+    assert body_contains(decode_body(utf16), "image001.png@01D0")
+
+
 def test_extract(reference_files: Path, avid_folder_copy: Path):
     avid = AVID(avid_folder_copy)
 
@@ -40,3 +115,558 @@ def test_extract(reference_files: Path, avid_folder_copy: Path):
                 assert child_file.puid
                 assert child_file.action
                 assert child_file.relative_path.relative_to(test_file.relative_path.parent)
+
+
+def test_extract_msg(reference_files: Path, avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        msg_file = database.original_files.select("relative_path = ?", ["OriginalDocuments/message3.msg"]).fetchone()
+        assert msg_file is not None
+
+    run_click(avid_folder_copy, app, "extract", f"@uuid {msg_file.uuid}", "--siegfried-home", reference_files)
+
+    with FilesDB(avid.database_path) as database:
+        attachments: dict[str, OriginalFile] = {
+            f.original_path.name: f
+            for f in database.original_files.select("parent = ?", [str(msg_file.uuid)]).fetchall()
+        }
+
+    assert sorted(attachments) == [
+        "Høring af kommunen - j.nr.  33-00815.pdf",
+        "Klage vedr.journal nr. 2192.11-0003",
+        "image001.gif",
+    ]
+
+    with openMsg(msg_file.get_absolute_path(avid.path)) as msg:
+        for attachment in msg.attachments:
+            if isinstance(attachment.data, bytes):
+                assert (
+                    attachments[attachment.getFilename()].get_absolute_path(avid.path).read_bytes() == attachment.data
+                )
+
+    with openMsg(attachments["Klage vedr.journal nr. 2192.11-0003"].get_absolute_path(avid.path)) as embedded:
+        assert embedded.subject == "Klage vedr.journal nr. 2192.11-0003"
+        assert [a.getFilename() for a in embedded.attachments] == ["Klage vedr. Egevangen 47, 8355 Solbjerg.docx"]
+
+
+def test_extract_scratch_dir(reference_files: Path, avid_folder_copy: Path, tmp_path: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        msg_file = database.original_files.select("relative_path = ?", ["OriginalDocuments/message3.msg"]).fetchone()
+        assert msg_file is not None
+
+    run_click(
+        avid_folder_copy,
+        app,
+        "extract",
+        f"@uuid {msg_file.uuid}",
+        "--siegfried-home",
+        reference_files,
+        "--scratch-dir",
+        tmp_path,
+    )
+
+    with FilesDB(avid.database_path) as database:
+        extracted_files = database.original_files.select("parent = ?", [str(msg_file.uuid)]).fetchall()
+        assert len(extracted_files) == 3
+        assert all(f.get_absolute_path(avid.path).is_file() for f in extracted_files)
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_extract_scratch_dir_cross_device(
+    reference_files: Path,
+    avid_folder_copy: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    avid = AVID(avid_folder_copy)
+    path_replace = Path.replace
+
+    # Files cannot be renamed from the scratch folder to the AVID directory, as if they were on different devices
+    def replace(self: Path, target: Path) -> Path:
+        if self.is_relative_to(tmp_path) and not Path(target).is_relative_to(tmp_path):
+            raise OSError(EXDEV, strerror(EXDEV))
+        return path_replace(self, target)
+
+    monkeypatch.setattr(Path, "replace", replace)
+
+    with FilesDB(avid.database_path) as database:
+        msg_file = database.original_files.select("relative_path = ?", ["OriginalDocuments/message3.msg"]).fetchone()
+        assert msg_file is not None
+
+    run_click(
+        avid_folder_copy,
+        app,
+        "extract",
+        f"@uuid {msg_file.uuid}",
+        "--siegfried-home",
+        reference_files,
+        "--scratch-dir",
+        tmp_path,
+    )
+
+    with FilesDB(avid.database_path) as database:
+        extracted_files = database.original_files.select("parent = ?", [str(msg_file.uuid)]).fetchall()
+        assert sorted(f.original_path.name for f in extracted_files) == [
+            "Høring af kommunen - j.nr.  33-00815.pdf",
+            "Klage vedr.journal nr. 2192.11-0003",
+            "image001.gif",
+        ]
+        assert all(f.get_absolute_path(avid.path).is_file() for f in extracted_files)
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_extract_tnef(reference_files: Path, avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    def attribute(level: int, name: int, data: bytes) -> bytes:
+        return pack("<BHHI", level, name, 6, len(data)) + data + pack("<H", sum(data) & 0xFFFF)
+
+    def mapi_property(prop_type: int, prop_id: int, value: bytes, named: bytes = b"") -> bytes:
+        return pack("<HH", prop_type, prop_id) + named + pack("<II", 1, len(value)) + value + b"\0" * (-len(value) % 4)
+
+    def mapi_properties(*properties: bytes) -> bytes:
+        return pack("<I", len(properties)) + b"".join(properties)
+
+    # named property with a string name, followed by the data object and an 8-bit name in the OEM codepage
+    named: bytes = b"\1" * 16 + pack("<II", 1, 8) + "tag\0".encode("utf-16-le")
+    tnef: bytes = pack("<IH", 0x223E9F78, 0)
+    tnef += attribute(1, 0x9007, pack("<II", 1251, 0))
+    tnef += attribute(2, 0x9002, b"\0" * 14)
+    tnef += attribute(2, 0x8010, b"note.txt\0")
+    tnef += attribute(2, 0x800F, b"Note")
+    tnef += attribute(
+        2,
+        0x9005,
+        mapi_properties(mapi_property(0x001F, 0x3707, "Заметка.txt\0".encode("utf-16-le")), pack("<HHI", 3, 0x0E20, 4)),
+    )
+    tnef += attribute(2, 0x9002, b"\0" * 14)
+    tnef += attribute(
+        2,
+        0x9005,
+        mapi_properties(
+            mapi_property(0x001F, 0x8000, "value\0".encode("utf-16-le"), named),
+            mapi_property(0x0102, 0x3701, b"Report"),
+            mapi_property(0x001E, 0x3707, "Отчет.bin\0".encode("cp1251")),
+        ),
+    )
+    avid.dirs.original_documents.joinpath("winmail.dat").write_bytes(tnef)
+
+    with FilesDB(avid.database_path) as database:
+        tnef_file = OriginalFile.from_file(avid.dirs.original_documents.joinpath("winmail.dat"), avid.path)
+        tnef_file.action = "extract"
+        tnef_file.action_data.extract = ExtractAction(tool="tnef")
+        database.original_files.insert(tnef_file)
+        database.commit()
+
+    run_click(avid_folder_copy, app, "extract", f"@uuid {tnef_file.uuid}", "--siegfried-home", reference_files)
+
+    with FilesDB(avid.database_path) as database:
+        attachments: dict[str, bytes] = {
+            f.original_path.name: f.get_absolute_path(avid.path).read_bytes()
+            for f in database.original_files.select("parent = ?", [str(tnef_file.uuid)]).fetchall()
+        }
+
+    assert attachments == {a.long_filename(): a.data for a in TNEF(tnef).attachments}
+    assert attachments == {"Заметка.txt": b"Note", "Отчет.bin": b"Report"}
+
+
+def test_extract_mbox(reference_files: Path, avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+    mbox_path: Path = avid.dirs.original_documents.joinpath("mailbox.mbox")
+    mbox_path.write_bytes(
+        b"From sender@example.com Mon Jan  1 00:00:00 2024\n"
+        b"Subject: First\n"
+        b"MIME-Version: 1.0\n"
+        b'Content-Type: multipart/mixed; boundary="b"\n'
+        b"\n"
+        b"--b\n"
+        b"Content-Type: text/plain\n"
+        b"\n"
+        b"Body\n"
+        b"--b\n"
+        b'Content-Type: text/plain; name="note.txt"\n'
+        b'Content-Disposition: attachment; filename="note.txt"\n'
+        b"\n"
+        b"Attachment\n"
+        b"--b\n"
+        b'Content-Type: image/png; name="image.png"\n'
+        b"Content-ID: <image>\n"
+        b"\n"
+        b"Image\n"
+        b"--b\n"
+        b"Content-Type: message/rfc822\n"
+        b"\n"
+        b"Subject: Forwarded\n"
+        b"MIME-Version: 1.0\n"
+        b'Content-Type: multipart/mixed; boundary="f"\n'
+        b"\n"
+        b"--f\n"
+        b'Content-Type: text/plain; name="forwarded.txt"\n'
+        b'Content-Disposition: attachment; filename="forwarded.txt"\n'
+        b"\n"
+        b"Forwarded attachment\n"
+        b"--f--\n"
+        b"--b--\n"
+        b"\n"
+        b"From sender@example.com Mon Jan  1 00:00:01 2024\n"
+        b"Subject: Second\n"
+        b"\n"
+        b">From the start\n"
+        b">>From the end\n"
+    )
+
+    with FilesDB(avid.database_path) as database:
+        mbox_file = OriginalFile.from_file(mbox_path, avid.path)
+        mbox_file.action = "extract"
+        mbox_file.action_data.extract = ExtractAction(tool="mbox")
+        database.original_files.insert(mbox_file)
+        database.commit()
+
+    run_click(avid_folder_copy, app, "extract", f"@uuid {mbox_file.uuid}", "--siegfried-home", reference_files)
+
+    with FilesDB(avid.database_path) as database:
+        messages = database.original_files.select("parent = ?", [str(mbox_file.uuid)]).fetchall()
+        assert sorted(m.original_path.name for m in messages) == ["First.eml", "Second.eml"]
+        second = next(m for m in messages if m.original_path.name == "Second.eml")
+        assert second.get_absolute_path(avid.path).read_bytes().endswith(b"\nFrom the start\n>From the end\n")
+
+        for message in messages:
+            message.action = "extract"
+            message.action_data.extract = ExtractAction(tool="eml")
+            database.original_files.update(message)
+        database.commit()
+
+    run_click(avid_folder_copy, app, "extract", "@relative_path @like %.eml", "--siegfried-home", reference_files)
+
+    with FilesDB(avid.database_path) as database:
+        first = next(m for m in messages if m.original_path.name == "First.eml")
+        attachments = database.original_files.select("parent = ?", [str(first.uuid)]).fetchall()
+        assert sorted(a.original_path.name for a in attachments) == ["Forwarded.eml", "image.png", "note.txt"]
+        note = next(a for a in attachments if a.original_path.name == "note.txt")
+        assert note.get_absolute_path(avid.path).read_bytes() == b"Attachment"
+
+
+def test_extract_tar(reference_files: Path, avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+    tar_path: Path = avid.dirs.original_documents.joinpath("links.tar")
+
+    with open_tar(tar_path, "w") as tf:
+        member = TarInfo("folder/file.txt")
+        member.size = len(b"Content")
+        tf.addfile(member, BytesIO(b"Content"))
+        link = TarInfo("folder/link.txt")
+        link.type = LNKTYPE
+        link.linkname = "folder/file.txt"
+        tf.addfile(link)
+
+    avid.dirs.original_documents.joinpath("single.txt.gz").write_bytes(gzip_compress(b"gzip"))
+    avid.dirs.original_documents.joinpath("single.txt.xz").write_bytes(lzma_compress(b"xz"))
+
+    archives: dict[str, OriginalFile] = {}
+
+    with FilesDB(avid.database_path) as database:
+        for name, tool in (("links.tar", "tar"), ("single.txt.gz", "gzip"), ("single.txt.xz", "xz")):
+            archive = OriginalFile.from_file(avid.dirs.original_documents.joinpath(name), avid.path)
+            archive.action = "extract"
+            archive.action_data.extract = ExtractAction(tool=tool)
+            database.original_files.insert(archive)
+            archives[name] = archive
+        database.commit()
+
+    run_click(
+        avid_folder_copy,
+        app,
+        "extract",
+        f"@uuid {' '.join(str(a.uuid) for a in archives.values())}",
+        "--siegfried-home",
+        reference_files,
+    )
+
+    with FilesDB(avid.database_path) as database:
+        children = {
+            name: {
+                f.original_path.name: f.get_absolute_path(avid.path).read_bytes()
+                for f in database.original_files.select("parent = ?", [str(archive.uuid)])
+            }
+            for name, archive in archives.items()
+        }
+
+    assert children["links.tar"] == {"file.txt": b"Content", "link.txt": b"Content"}
+    assert children["single.txt.gz"] == {"single.txt": b"gzip"}
+    assert children["single.txt.xz"] == {"single.txt": b"xz"}
+
+
+def test_extract_max_depth(reference_files: Path, avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+    inner_path: Path = avid.dirs.original_documents.joinpath("inner.zip")
+    outer_path: Path = avid.dirs.original_documents.joinpath("outer.zip")
+
+    with ZipFile(inner_path, "w") as zf:
+        zf.writestr("file.txt", "Content")
+    with ZipFile(outer_path, "w") as zf:
+        zf.write(inner_path, "inner.zip")
+    inner_path.unlink()
+
+    with FilesDB(avid.database_path) as database:
+        outer_file = OriginalFile.from_file(outer_path, avid.path)
+        outer_file.action = "extract"
+        outer_file.action_data.extract = ExtractAction(tool="zip")
+        database.original_files.insert(outer_file)
+        database.commit()
+
+    run_click(
+        avid_folder_copy,
+        app,
+        "extract",
+        f"@uuid {outer_file.uuid}",
+        "--siegfried-home",
+        reference_files,
+        "--max-depth",
+        0,
+    )
+
+    with FilesDB(avid.database_path) as database:
+        [inner_file] = database.original_files.select("parent = ?", [str(outer_file.uuid)]).fetchall()
+        assert inner_file.action == "extract"
+
+    # Archives extracted by previous runs keep their depth
+    query: str = f"@uuid {inner_file.uuid}"
+    run_click(avid_folder_copy, app, "extract", query, "--siegfried-home", reference_files, "--max-depth", 0)
+
+    with FilesDB(avid.database_path) as database:
+        assert database.original_files[inner_file].action == "extract"
+        assert not database.original_files.select("parent = ?", [str(inner_file.uuid)]).fetchall()
+
+    run_click(avid_folder_copy, app, "extract", query, "--siegfried-home", reference_files, "--max-depth", 1)
+
+    with FilesDB(avid.database_path) as database:
+        assert database.original_files[inner_file].action != "extract"
+        assert database.original_files.select("parent = ?", [str(inner_file.uuid)]).fetchall()
+
+
+def test_extract_max_ratio(reference_files: Path, avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        base_files: list[OriginalFile] = database.original_files.select(
+            "action = 'extract' and relative_path like '%.tar'"
+        ).fetchall()
+
+    assert base_files
+
+    run_click(
+        avid_folder_copy,
+        app,
+        "extract",
+        "@relative_path @like %.tar",
+        "--siegfried-home",
+        reference_files,
+        "--max-ratio",
+        0.01,
+    )
+
+    with FilesDB(avid.database_path) as database:
+        for base_file in base_files:
+            test_file = database.original_files[base_file]
+            assert test_file.action == "manual"
+            assert test_file.action_data.manual.reason.startswith("Extracted size exceeds")
+            assert not database.original_files.select("parent = ?", [str(test_file.uuid)]).fetchall()
+
+
+def test_extract_prefetch(reference_files: Path, avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        base_files: list[OriginalFile] = database.original_files.select("action = 'extract'").fetchall()
+
+    run_click(avid_folder_copy, app, "extract", "--siegfried-home", reference_files, "--prefetch", 3)
+
+    with FilesDB(avid.database_path) as database:
+        for base_file in base_files:
+            test_file = database.original_files[base_file]
+            assert test_file.action != "extract"
+            if test_file.action == "ignore" and test_file.action_data.ignore.template == "extracted-archive":
+                assert database.original_files.select("parent = ?", [str(test_file.uuid)]).fetchall()
+        assert not list(avid.path.glob(".tmp_digiarch_*"))
+
+
+def test_extract_prefetch_nested(reference_files: Path, avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+    inner_path: Path = avid.dirs.original_documents.joinpath("inner.zip")
+    # Sorts before the extraction folder, so the nested archive is fetched by the query while it is in the queue
+    outer_path: Path = avid.dirs.original_documents.joinpath("0outer.zip")
+
+    with ZipFile(inner_path, "w") as zf:
+        zf.writestr("file.txt", "Content")
+    with ZipFile(outer_path, "w") as zf:
+        zf.write(inner_path, "inner.zip")
+    inner_path.unlink()
+
+    with FilesDB(avid.database_path) as database:
+        outer_file = OriginalFile.from_file(outer_path, avid.path)
+        outer_file.action = "extract"
+        outer_file.action_data.extract = ExtractAction(tool="zip")
+        database.original_files.insert(outer_file)
+        database.commit()
+
+    run_click(avid_folder_copy, app, "extract", "--siegfried-home", reference_files, "--prefetch", 3)
+
+    with FilesDB(avid.database_path) as database:
+        [inner_file] = database.original_files.select("parent = ?", [str(outer_file.uuid)]).fetchall()
+        assert inner_file.action != "extract"
+        assert len(database.original_files.select("parent = ?", [str(inner_file.uuid)]).fetchall()) == 1
+
+
+def test_extract_sandboxed(reference_files: Path, avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        base_files: list[OriginalFile] = database.original_files.select(
+            "action = 'extract' and relative_path like '%.zip' and relative_path not like '%-encrypted%'"
+        ).fetchall()
+
+    assert base_files
+
+    run_click(
+        avid_folder_copy,
+        app,
+        "extract",
+        "@relative_path @like %.zip",
+        "--siegfried-home",
+        reference_files,
+        "--timeout",
+        600,
+        "--memory-limit",
+        4096,
+    )
+
+    with FilesDB(avid.database_path) as database:
+        for base_file in base_files:
+            test_file = database.original_files[base_file]
+            assert test_file.action != "manual"
+            assert database.original_files.select("parent = ?", [str(test_file.uuid)]).fetchall()
+        assert not list(avid.path.glob(".tmp_digiarch_*"))
+
+
+def test_extract_resume(reference_files: Path, avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        base_file: OriginalFile = database.original_files.select(
+            "action = 'extract' and relative_path like '%.tar'"
+        ).fetchone()
+
+    assert base_file
+
+    extract_folder: Path = base_file.get_absolute_path(avid.path).parent.joinpath(f"_{base_file.uuid.hex}")
+    extract_folder.mkdir(parents=True)
+    extract_folder.joinpath("partial.bin").write_bytes(b"partial")
+    manifest: Path = avid.metadata_dir.joinpath("extract", f"{base_file.uuid.hex}.jsonl")
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    manifest.write_text('{"member": "0:missing", "path": "missing", "original": "missing", "size": 1}\n')
+
+    run_click(avid_folder_copy, app, "extract", f"@uuid {base_file.uuid}", "--siegfried-home", reference_files)
+
+    with FilesDB(avid.database_path) as database:
+        test_file = database.original_files[base_file]
+        assert test_file.action != "extract"
+        extracted_files = database.original_files.select("parent = ?", [str(test_file.uuid)]).fetchall()
+        assert extracted_files
+        assert all(f.get_absolute_path(avid.path).is_file() for f in extracted_files)
+
+    assert not extract_folder.joinpath("partial.bin").exists()
+    assert not manifest.exists()
+
+
+def test_extract_preview(reference_files: Path, avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        base_files: list[OriginalFile] = database.original_files.select("action = 'extract'").fetchall()
+
+    run_click(avid_folder_copy, app, "extract", "--siegfried-home", reference_files, "--preview")
+
+    with FilesDB(avid.database_path) as database:
+        for base_file in base_files:
+            assert database.original_files[base_file].action == "extract"
+        assert not database.original_files.select("parent is not null").fetchall()
+
+
+def test_extract_preview_tar(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+    tar_path: Path = avid.dirs.original_documents.joinpath("preview.tar")
+
+    with open_tar(tar_path, "w") as tf:
+        for name, data in (("a.txt", b"a" * 1000), ("folder/b.txt", b"b" * 100_000)):
+            member = TarInfo(name)
+            member.size = len(data)
+            tf.addfile(member, BytesIO(data))
+
+    avid.dirs.original_documents.joinpath("small.txt.gz").write_bytes(gzip_compress(b"gzip" * 1000))
+    # Too large for the size in the gzip trailer to be reliable
+    avid.dirs.original_documents.joinpath("large.bin.gz").write_bytes(gzip_compress(urandom(5 << 20), 1))
+
+    def preview(name: str) -> tuple[int, int] | None:
+        file = OriginalFile.from_file(avid.dirs.original_documents.joinpath(name), avid.path)
+        return TarExtractor(file, avid.path).preview()
+
+    assert preview("preview.tar") == (2, 101_000)
+    assert preview("small.txt.gz") == (1, 4000)
+    assert preview("large.bin.gz") is None
+
+
+def test_extract_identify_members(reference_files: Path, avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        base_files: list[OriginalFile] = database.original_files.select("action = 'extract'").fetchall()
+
+    run_click(avid_folder_copy, app, "extract", "--siegfried-home", reference_files, "--identify-members")
+
+    with FilesDB(avid.database_path) as database:
+        for base_file in base_files:
+            assert database.original_files[base_file].action == "extract"
+            assert not base_file.get_absolute_path(avid.path).parent.joinpath(f"_{base_file.uuid.hex}").exists()
+        assert not database.original_files.select("parent is not null").fetchall()
+
+
+def test_extract_dedup(reference_files: Path, avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        base_file: OriginalFile = database.original_files.select(
+            "action = 'extract' and relative_path = 'OriginalDocuments/extract.zip'"
+        ).fetchone()
+
+    run_click(avid_folder_copy, app, "extract", f"@uuid {base_file.uuid}", "--siegfried-home", reference_files)
+
+    duplicate_file = base_file.model_copy(deep=True)
+    duplicate_file.uuid = uuid4()
+    duplicate_file.relative_path = duplicate_file.relative_path.with_name("extract-duplicate.zip")
+    duplicate_file.original_path = duplicate_file.relative_path
+    copy2(base_file.get_absolute_path(avid.path), duplicate_file.get_absolute_path(avid.path))
+
+    with FilesDB(avid.database_path) as database:
+        database.original_files.insert(duplicate_file)
+        database.commit()
+
+    run_click(avid_folder_copy, app, "extract", f"@uuid {duplicate_file.uuid}", "--siegfried-home", reference_files)
+
+    with FilesDB(avid.database_path) as database:
+        base_children = database.original_files.select("parent = ?", [str(base_file.uuid)]).fetchall()
+        duplicate_children = database.original_files.select("parent = ?", [str(duplicate_file.uuid)]).fetchall()
+
+        assert database.original_files[duplicate_file].action != "extract"
+        assert len(base_children) == len(duplicate_children)
+        assert {(f.checksum, f.puid, f.action) for f in base_children} == {
+            (f.checksum, f.puid, f.action) for f in duplicate_children
+        }
+
+        for child_file in duplicate_children:
+            assert {c.uuid for c in base_children}.isdisjoint({child_file.uuid})
+            assert child_file.get_absolute_path(avid.path).is_file()
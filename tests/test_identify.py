@@ -1,6 +1,7 @@
 from pathlib import Path
 from uuid import UUID
 
+import pytest
 from acacore.database import FilesDB
 from acacore.models.file import OriginalFile
 from acacore.models.reference_files import ActionData
@@ -36,6 +37,20 @@ def test_identify_original(reference_files: Path, avid_folder: Path, avid_folder
             assert base_file.original_path == test_file.original_path
 
 
+def test_identify_original_db_profile(reference_files: Path, avid_folder_copy: Path, monkeypatch: pytest.MonkeyPatch):
+    avid = AVID(avid_folder_copy)
+    monkeypatch.setenv("DIGIARCH_DB_PROFILE", "bulk")
+
+    run_click(avid.path, app, "identify", "original", "@uuid @null", "--siegfried-home", reference_files)
+
+    with FilesDB(avid.database_path) as database:
+        event = database.log.select("operation like ?", ["%:start"], [("time", "desc")], 1).fetchone()
+        assert event is not None
+        assert event.data["profile"] == "bulk"
+        assert event.data["synchronous"] == 1
+        assert event.data["temp_store"] == 2
+
+
 # noinspection DuplicatedCode
 def test_identify_master(reference_files: Path, avid_folder: Path, avid_folder_copy: Path):
     avid = AVID(avid_folder)
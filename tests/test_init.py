@@ -41,6 +41,8 @@ def test_init(avid_folder_copy: Path):
         assert events[2].operation == f"{app.name}.init:end"
         assert events[2].data is None
         assert events[2].reason is None
+        assert db.execute("pragma journal_mode").fetchone()[0] == "wal"
+        assert db.execute("pragma auto_vacuum").fetchone()[0] == 2
 
 
 def test_init_import(avid_folder_copy: Path):
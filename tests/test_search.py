@@ -1,7 +1,15 @@
 from pathlib import Path
+from sqlite3 import connect
+
+from acacore.database import FilesDB
 
 from digiarch.cli import app
 from digiarch.common import AVID
+from digiarch.query import CompiledQuery
+from digiarch.query import QUERY_PATH_ORDER
+from digiarch.query import query_table
+from digiarch.query import QUERY_VALUES_TABLE_THRESHOLD
+from digiarch.query import tokenize_query
 from tests.conftest import run_click
 
 
@@ -12,3 +20,112 @@ def test_search(avid_folder_copy: Path):
     run_click(avid.path, app, "search", "master", "@relative_path %")
     run_click(avid.path, app, "search", "access", "@relative_path %")
     run_click(avid.path, app, "search", "statutory", "@relative_path %")
+
+
+def test_search_concurrent_write(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+    run_click(avid.path, app, "upgrade")
+
+    writer = connect(avid.database_path, isolation_level=None)
+    try:
+        writer.execute("begin exclusive")
+        writer.execute("update files_original set lock = lock")
+        run_click(avid.path, app, "search", "original", "@relative_path %")
+        run_click(avid.path, app, "info")
+        writer.execute("commit")
+    finally:
+        writer.close()
+
+
+def test_search_json(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+    fields: list[str] = ["uuid", "action", "action_data", "warning"]
+
+    run_click(avid.path, app, "search", "original", '@action_data.extract.tool zip @warning @has "extension mismatch"')
+
+    with FilesDB(avid.database_path) as database:
+        files = list(database.original_files.select())
+
+        query = tokenize_query("@action_data.extract.tool zip tar", "uuid", fields)
+        assert {f.uuid for f in query_table(database.original_files, query)} == {
+            f.uuid for f in files if f.action_data.extract and f.action_data.extract.tool in ("zip", "tar")
+        }
+
+        query = tokenize_query('@warning @has "extension mismatch"', "uuid", fields)
+        assert {f.uuid for f in query_table(database.original_files, query)} == {
+            f.uuid for f in files if "extension mismatch" in (f.warning or [])
+        }
+
+
+def test_search_size(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+    fields: list[str] = ["uuid", "size"]
+
+    run_click(avid.path, app, "search", "original", "@size >1K")
+
+    with FilesDB(avid.database_path) as database:
+        files = list(database.original_files.select())
+
+        query = tokenize_query("@size 0 >=1k", "uuid", fields)
+        assert query == [("size", 0, "="), ("size", 1024, ">=")]
+        assert {f.uuid for f in query_table(database.original_files, query)} == {
+            f.uuid for f in files if f.size == 0 or f.size >= 1024
+        }
+
+        query = tokenize_query("@size 10..2KiB", "uuid", fields)
+        assert query == [("size", [10, 2048], "between")]
+        assert {f.uuid for f in query_table(database.original_files, query)} == {
+            f.uuid for f in files if 10 <= f.size <= 2048
+        }
+
+
+def test_compiled_query_pages(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        for query in ([], [("action", "extract", "=")]):
+            files = list(query_table(database.original_files, query, QUERY_PATH_ORDER))
+            assert files
+            pages = list(CompiledQuery(database.original_files, query).pages(2))
+            assert all(0 < len(page) <= 2 for page in pages)
+            assert [f.uuid for page in pages for f in page] == [f.uuid for f in files]
+
+        compiled_query = CompiledQuery(database.original_files, [])
+        first_page = compiled_query.page(2)
+        database.original_files.delete(first_page[-1])
+        assert [f.uuid for f in compiled_query.page(1, first_page[-1])] == [
+            f.uuid for f in compiled_query.page(1, first_page[0])
+        ]
+
+
+def test_query_values_table(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        files = list(database.original_files.select(order_by=QUERY_PATH_ORDER))
+        padding: list[str] = [f"missing-{n}" for n in range(QUERY_VALUES_TABLE_THRESHOLD)]
+        query = [("uuid", [*padding, *(str(f.uuid) for f in files)], "in")]
+
+        def temp_tables() -> list[str]:
+            return [n for [n] in database.execute("select name from sqlite_temp_master where type = 'table'")]
+
+        # Tables created inside a transaction are removed by a rollback, and are not reused empty afterwards
+        database.execute("update files_original set lock = true where uuid = ?", [str(files[0].uuid)])
+        assert [f.uuid for f in query_table(database.original_files, query, QUERY_PATH_ORDER)] == [
+            f.uuid for f in files
+        ]
+        database.connection.rollback()
+        assert [f.uuid for f in query_table(database.original_files, query, QUERY_PATH_ORDER)] == [
+            f.uuid for f in files
+        ]
+        assert not temp_tables()
+
+        with CompiledQuery(database.original_files, query) as compiled_query:
+            assert len(temp_tables()) == 1
+            assert [f.uuid for f in compiled_query.page(len(files))] == [f.uuid for f in files]
+        assert not temp_tables()
+
+        assert [f.uuid for page in CompiledQuery(database.original_files, query).pages(2) for f in page] == [
+            f.uuid for f in files
+        ]
+        assert not temp_tables()
@@ -1,5 +1,7 @@
 from pathlib import Path
 
+from acacore.database import FilesDB
+
 from digiarch.cli import app
 from digiarch.common import AVID
 from tests.conftest import run_click
@@ -7,6 +9,8 @@ from tests.conftest import run_click
 
 def test_upgrade(avid_folder_copy: Path):
     avid = AVID(avid_folder_copy)
+    # The fixture uses the rollback journal, so the first upgrade only switches it to WAL journal mode
+    run_click(avid.path, app, "upgrade")
     size: int = avid.database_path.stat().st_size
     m_time: float = avid.database_path.stat().st_mtime
 
@@ -14,3 +18,31 @@ def test_upgrade(avid_folder_copy: Path):
 
     assert avid.database_path.stat().st_size == size
     assert avid.database_path.stat().st_mtime == m_time
+
+
+def test_upgrade_indices(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        database.execute("drop index idx_files_original_relative_path_lower")
+        database.commit()
+
+    run_click(avid.path, app, "upgrade")
+
+    with FilesDB(avid.database_path) as database:
+        assert database.execute(
+            "select 1 from sqlite_master where type = 'index' and name = 'idx_files_original_relative_path_lower'"
+        ).fetchone()
+
+
+def test_upgrade_wal(avid_folder_copy: Path):
+    avid = AVID(avid_folder_copy)
+
+    with FilesDB(avid.database_path) as database:
+        assert database.execute("pragma journal_mode").fetchone()[0] == "delete"
+
+    run_click(avid.path, app, "upgrade")
+
+    with FilesDB(avid.database_path) as database:
+        assert database.execute("pragma journal_mode").fetchone()[0] == "wal"
+        assert database.log.select("operation = ?", [f"{app.name}.upgrade:journal-mode"]).fetchone()